@@ -1,28 +1,86 @@
+import importlib
 import logging
+import sys
+import time
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
 import homeassistant.helpers.config_validation as cv
 from .const import DOMAIN
+from .models import get_runtime_data
+from .services import async_setup_services
+from .storage import async_get_membership_store
+from .websocket_api import async_setup_websocket_api
 
 _LOGGER = logging.getLogger(__name__)
 
 CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
-PLATFORMS = ["sensor"]
+PLATFORMS = ["sensor", "binary_sensor"]
+
+# Modules every zone needs, imported (and timed) once before the first entry
+# is set up.  Dependencies come first so each time covers a single module.
+PROFILED_MODULES = ("estimators", "accumulator", "sampling", "rules", "sensor")
+
+
+def _import_modules() -> dict[str, float | None]:
+    """Import the zone modules; return their import times (None: already imported)."""
+    timings = {}
+    for module in PROFILED_MODULES:
+        name = f"{__name__}.{module}"
+        if name in sys.modules:
+            timings[module] = None
+            continue
+        started = time.monotonic()
+        importlib.import_module(name)
+        timings[module] = time.monotonic() - started
+    return timings
 
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     """Set up the energy_power_monitor component."""
+    startup = get_runtime_data(hass).startup
+    startup.started = time.monotonic()
+    startup.imports.update(await hass.async_add_import_executor_job(_import_modules))
+    async_setup_services(hass)
+    async_setup_websocket_api(hass)
     return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up a config entry for Energy and Power Monitor."""
     _LOGGER.debug("Setting up Energy and Power Monitor for entry: %s", entry.title)
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    startup = get_runtime_data(hass).startup
+    startup.entry_setup_started(entry.entry_id)
+    membership = await async_get_membership_store(hass)
+    await membership.async_import_entry(entry)
+    # One platform after the other: the overload alert looks up its zone
+    # sensor in the entity registry
+    for platform in PLATFORMS:
+        await hass.config_entries.async_forward_entry_setups(entry, [platform])
+    if hass.is_running:
+        # A reload (options change); at startup the sensors are only added
+        # once Home Assistant has started
+        async_remove_orphaned_entities(hass, entry)
+    startup.entry_setup_done(entry.entry_id)
     return True
 
 
+@callback
+def async_remove_orphaned_entities(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove registry entries of optional sensors that were switched off.
+
+    After the entry was set up again, entities that were not re-created only
+    have a restored 'unavailable' placeholder state left.
+    """
+    entity_registry = er.async_get(hass)
+    for entity in er.async_entries_for_config_entry(entity_registry, entry.entry_id):
+        state = hass.states.get(entity.entity_id)
+        if state is not None and state.attributes.get("restored"):
+            _LOGGER.info("Removing sensor no longer provided by this zone: %s", entity.entity_id)
+            entity_registry.async_remove(entity.entity_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Handle unloading of an entry."""
     _LOGGER.debug("Unloading Energy and Power Monitor for entry: %s", entry.title)
@@ -31,4 +89,6 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
 async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Remove a config entry."""
-    _LOGGER.debug("Removing Energy and Power Monitor for entry: %s", entry.title)
\ No newline at end of file
+    _LOGGER.debug("Removing Energy and Power Monitor for entry: %s", entry.title)
+    membership = await async_get_membership_store(hass)
+    membership.async_remove(entry.entry_id)
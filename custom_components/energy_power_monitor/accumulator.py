@@ -0,0 +1,72 @@
+"""Consumption bookkeeping for energy zones.
+
+Plain Python without Home Assistant imports: callers pass in member values.
+"""
+
+# A drop to less than this fraction of the last value is a meter reset; a
+# smaller drop is jitter (the recorder uses the same 10% rule for
+# total_increasing sensors)
+RESET_RATIO = 0.9
+
+
+class IncreaseTracker:
+    """Turn the values of cumulative (total_increasing) members into increases.
+
+    Only the last valid value per member is kept.  A member that is briefly
+    unavailable keeps its last value, so the consumption during the gap is
+    counted when it reports again.  A drop below RESET_RATIO of the last
+    value is a meter reset and counting restarts at 0; a smaller drop is
+    ignored until the member climbs above its last value again.  A member
+    seen for the first time contributes nothing until its next update.
+    """
+
+    __slots__ = ("_last", "resets", "jitter")
+
+    def __init__(self):
+        self._last: dict[str, float] = {}
+        self.resets = 0
+        self.jitter = 0
+
+    def __len__(self) -> int:
+        return len(self._last)
+
+    def update(self, entity_id: str, value: float | None) -> float:
+        """Record a new value of a member and return its increase."""
+        if value is None:
+            return 0.0
+        last = self._last.get(entity_id)
+        if last is None:
+            self._last[entity_id] = value
+            return 0.0
+        if value >= last:
+            self._last[entity_id] = value
+            return value - last
+        if value >= last * RESET_RATIO:
+            self.jitter += 1
+            return 0.0
+        self._last[entity_id] = value
+        self.resets += 1
+        return value
+
+    def get(self, entity_id: str) -> float | None:
+        """Return the last value of a member, or None while it has not reported."""
+        return self._last.get(entity_id)
+
+    def discard(self, entity_id: str) -> None:
+        """Forget a member that left the zone."""
+        self._last.pop(entity_id, None)
+
+    def as_dict(self) -> dict[str, float]:
+        """Return the last value per member (persisted across restarts)."""
+        return dict(self._last)
+
+    def restore(self, last: dict[str, float], members) -> None:
+        """Continue from persisted last values of the given members.
+
+        The next value of a member then counts the consumption while Home
+        Assistant was stopped.
+        """
+        for entity_id in members:
+            value = last.get(entity_id)
+            if isinstance(value, (int, float)):
+                self._last[entity_id] = float(value)
@@ -0,0 +1,204 @@
+"""Overload alerts of zones.
+
+An alert turns on when the zone value rises above its threshold and off when
+it falls back below threshold - hysteresis; with a delay, the crossing has to
+last that long before the alert changes.  Alerts are evaluated right after the
+zone wrote its state (from the in-memory zone value) and only write their own
+state on transitions.
+"""
+import logging
+
+from homeassistant.components.binary_sensor import BinarySensorDeviceClass, BinarySensorEntity
+from homeassistant.const import STATE_ON, Platform
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.entity import DeviceInfo, generate_entity_id
+from homeassistant.helpers.event import async_call_later, async_track_entity_registry_updated_event
+from homeassistant.helpers.restore_state import RestoreEntity
+
+from .const import (
+    DOMAIN,
+    ENTITY_TYPE_POWER,
+    ENTITY_TYPE_DUAL,
+    CONF_ALERT_THRESHOLD,
+    CONF_ALERT_HYSTERESIS,
+    CONF_ALERT_DELAY,
+    sanitize_zone_name,
+)
+from .models import get_runtime_data
+
+_LOGGER = logging.getLogger(__name__)
+ENTITY_ID_FORMAT = Platform.BINARY_SENSOR + ".{}"
+
+
+async def async_setup_entry(hass: HomeAssistant, entry, async_add_entities):
+    """Set up the overload alert of a zone, when configured."""
+    threshold = entry.options.get(CONF_ALERT_THRESHOLD)
+    if not threshold:
+        return
+    entity_type = entry.data.get("entity_type")
+    if entity_type == ENTITY_TYPE_DUAL:
+        # Zones of both types alert on their power sensor
+        entity_type = ENTITY_TYPE_POWER
+    async_add_entities([
+        ZoneAlertBinarySensor(
+            hass,
+            entry.data.get("room"),
+            entry.entry_id,
+            entity_type,
+            float(threshold),
+            float(entry.options.get(CONF_ALERT_HYSTERESIS) or 0),
+            float(entry.options.get(CONF_ALERT_DELAY) or 0),
+        )
+    ])
+
+
+class ZoneAlertBinarySensor(RestoreEntity, BinarySensorEntity):
+    """On while a zone is above its alert threshold."""
+
+    _attr_should_poll = False
+
+    def __init__(self, hass: HomeAssistant, zone_name, entry_id, entity_type, threshold, hysteresis, delay):
+        """Initialize the alert."""
+        self.hass = hass
+        self._zone_name = zone_name
+        self._entry_id = entry_id
+        self._entity_type = entity_type
+        self._threshold = threshold
+        self._hysteresis = hysteresis
+        self._delay = delay
+        self._zone_unique_id = f"{DOMAIN}_{sanitize_zone_name(zone_name)}_{entity_type}"
+        # Entity ID of the zone sensor, looked up in the entity registry once added
+        self._zone_entity_id = None
+        self._unsubscribe_zone = []
+        self._runtime = None
+        self._on = False
+        # Pending transition (target state) while waiting for the delay
+        self._pending = None
+        self._unsubscribe_delay = None
+        self._unique_id = f"{DOMAIN}_{sanitize_zone_name(zone_name)}_{entity_type}_alert"
+        self.entity_id = generate_entity_id(ENTITY_ID_FORMAT, self._unique_id, hass=self.hass)
+
+    # --- HA entity properties ---
+
+    @property
+    def name(self):
+        return f"{self._zone_name} alert - {self._entity_type.capitalize()}"
+
+    @property
+    def unique_id(self):
+        return self._unique_id
+
+    @property
+    def is_on(self):
+        return self._on
+
+    @property
+    def device_class(self):
+        return BinarySensorDeviceClass.PROBLEM
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        return DeviceInfo(
+            identifiers={(self._entry_id,)},
+            name=self._zone_name,
+            manufacturer="Custom",
+            model="Energy and Power Monitor",
+        )
+
+    @property
+    def extra_state_attributes(self):
+        return {
+            "source": self._zone_entity_id,
+            "threshold": self._threshold,
+            "hysteresis": self._hysteresis,
+            "delay": self._delay,
+        }
+
+    # --- Internal helpers ---
+
+    def _target(self, value):
+        """Return the state the alert should have at value."""
+        if value is None:
+            return self._on
+        if self._on:
+            return value > self._threshold - self._hysteresis
+        return value > self._threshold
+
+    @callback
+    def _cancel_pending(self):
+        self._pending = None
+        if self._unsubscribe_delay:
+            self._unsubscribe_delay()
+            self._unsubscribe_delay = None
+
+    @callback
+    def _set_state(self, on):
+        self._cancel_pending()
+        self._on = on
+        _LOGGER.debug("Zone '%s': alert %s", self._zone_name, "on" if on else "off")
+        self.async_write_ha_state()
+
+    @callback
+    def _async_follow_zone(self, entity_id):
+        """Evaluate the alert after every state write of the zone sensor entity_id."""
+        self._async_unfollow_zone()
+        self._zone_entity_id = entity_id
+        self._unsubscribe_zone = [
+            self._runtime.async_listen_value(entity_id, self._async_zone_value),
+            async_track_entity_registry_updated_event(self.hass, entity_id, self._async_zone_registry_updated),
+        ]
+        if entity_id in self._runtime.zones:
+            self._async_zone_value()
+
+    @callback
+    def _async_unfollow_zone(self):
+        for unsubscribe in self._unsubscribe_zone:
+            unsubscribe()
+        self._unsubscribe_zone = []
+
+    # --- Callbacks ---
+
+    @callback
+    def _async_zone_registry_updated(self, event):
+        """Follow the zone sensor when its entity ID is changed."""
+        if event.data["action"] == "update" and "entity_id" in event.data.get("changes", {}):
+            _LOGGER.debug("Zone '%s': alert follows %s", self._zone_name, event.data["entity_id"])
+            self._async_follow_zone(event.data["entity_id"])
+            self.async_write_ha_state()
+
+    @callback
+    def _async_zone_value(self):
+        """Evaluate the alert after the zone wrote its state."""
+        zone = self._runtime.zones.get(self._zone_entity_id)
+        value = zone.state if zone is not None else None
+        target = self._target(None if value is None else float(value))
+        if target == self._on:
+            self._cancel_pending()
+        elif not self._delay:
+            self._set_state(target)
+        elif self._pending is None:
+            self._pending = target
+            self._unsubscribe_delay = async_call_later(self.hass, self._delay, self._async_delay_passed)
+
+    @callback
+    def _async_delay_passed(self, _now):
+        self._unsubscribe_delay = None
+        if self._pending is not None:
+            self._set_state(self._pending)
+
+    # --- HA lifecycle ---
+
+    async def async_added_to_hass(self):
+        """Restore the last state and follow the zone."""
+        await super().async_added_to_hass()
+        last_state = await self.async_get_last_state()
+        if last_state is not None:
+            self._on = last_state.state == STATE_ON
+        self._runtime = get_runtime_data(self.hass)
+        # The zone sensor may have been renamed or suffixed (_2); a zone that
+        # has never been added yet gets the entity ID of its unique ID
+        entity_id = er.async_get(self.hass).async_get_entity_id(Platform.SENSOR, DOMAIN, self._zone_unique_id)
+        self._async_follow_zone(entity_id or f"{Platform.SENSOR}.{self._zone_unique_id}")
+        self.async_on_remove(self._async_unfollow_zone)
+        self.async_on_remove(self._cancel_pending)
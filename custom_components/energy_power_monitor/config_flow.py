@@ -1,11 +1,11 @@
 import logging
+import re
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.core import callback
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers import selector
-from homeassistant.helpers.translation import async_get_translations
 
 from .const import (
     DOMAIN,
@@ -14,11 +14,62 @@ from .const import (
     CONF_ENTITY_TYPE,
     ENTITY_TYPE_POWER,
     ENTITY_TYPE_ENERGY,
+    ENTITY_TYPE_DUAL,
     CONF_INTEGRATION_ROOMS,
     CONF_SMART_METER_DEVICE,
+    CONF_RULES,
+    CONF_RULE_AREAS,
+    CONF_RULE_FLOORS,
+    CONF_RULE_LABELS,
+    CONF_RULE_DEVICE_CLASSES,
+    CONF_RULE_INTEGRATIONS,
+    CONF_RULE_PATTERNS,
+    RULE_KEYS,
+    CONF_SAMPLING,
+    CONF_SAMPLING_ENTITY,
+    CONF_SAMPLING_POLICY,
+    CONF_SAMPLING_INTERVAL,
+    CONF_SAMPLING_THRESHOLD,
+    SAMPLING_PASS_THROUGH,
+    SAMPLING_POLICIES,
+    CONF_BASELINE,
+    CONF_BASELINE_UNTRACKED,
+    CONF_BASELINE_QUANTILE,
+    CONF_BASELINE_WINDOW,
+    DEFAULT_BASELINE_QUANTILE,
+    DEFAULT_BASELINE_WINDOW,
+    CONF_EXPORT,
+    CONF_EXPORT_FORMAT,
+    EXPORT_FORMAT_CSV,
+    EXPORT_FORMAT_PARQUET,
+    CONF_AGGREGATION,
+    CONF_AGGREGATION_INTERVAL,
+    CONF_AGGREGATION_RATE,
+    AGGREGATION_AUTO,
+    AGGREGATION_MODES,
+    DEFAULT_AGGREGATION_INTERVAL,
+    DEFAULT_AGGREGATION_RATE,
+    CONF_PERIODS,
+    CONF_PERIOD_CRON,
+    PERIODS,
+    CONF_FORECAST,
+    CONF_STATISTICS,
+    CONF_EVENT_THRESHOLD,
+    CONF_STEP_THRESHOLD,
+    CONF_STEP_WINDOW,
+    DEFAULT_STEP_WINDOW,
+    SHARE_KINDS,
+    CONF_PRICE_ENTITY,
+    CONF_ALERT_THRESHOLD,
+    CONF_ALERT_HYSTERESIS,
+    CONF_ALERT_DELAY,
+    CONF_UNACCOUNTED,
+    entity_types,
     sanitize_zone_name,
     is_smart_meter_selected,
 )
+from .pairing import paired_entities
+from .storage import MEMBERSHIP_KEYS, async_get_membership_store, entry_membership
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -72,9 +123,11 @@ async def get_integration_entities(hass):
     for entity_id, entity in entity_registry.entities.items():
         if not (entity.unique_id and entity.unique_id.startswith(DOMAIN)):
             continue
-        # Exclude untracked sensors — only main zone sensors are valid zone targets
+        # Exclude untracked and derived sensors — only main zone sensors are valid zone targets
         if "_untracked_" in entity_id:
             continue
+        if not entity.unique_id.endswith((f"_{ENTITY_TYPE_POWER}", f"_{ENTITY_TYPE_ENERGY}")):
+            continue
         state = hass.states.get(entity_id)
         if state and "friendly_name" in state.attributes:
             integration_entities[entity_id] = state.attributes["friendly_name"]
@@ -83,7 +136,10 @@ async def get_integration_entities(hass):
 
 
 def get_selected_entities_for_zones(hass, selected_existing_zones, integration_entities, selected_entities, entity_type):
-    """Get entities from selected existing zones, avoiding duplicates."""
+    """Get entities from selected existing zones, avoiding duplicates.
+
+    Zones of both types include zones of either type, each with its own untracked sensor.
+    """
     _LOGGER.debug(
         "get_selected_entities_for_zones: zones=%s entity_type=%s",
         selected_existing_zones,
@@ -94,7 +150,8 @@ def get_selected_entities_for_zones(hass, selected_existing_zones, integration_e
             zone_entities = get_filtered_entities_for_zone(hass, zone_id)
             if zone_entities:
                 selected_entities.extend(zone_entities)
-            untracked_entity = f"{zone_id[:-(len(entity_type) + 1)]}_untracked_{entity_type}"
+            zone_type = zone_id.rsplit("_", 1)[-1] if entity_type == ENTITY_TYPE_DUAL else entity_type
+            untracked_entity = f"{zone_id[:-(len(zone_type) + 1)]}_untracked_{zone_type}"
             if hass.states.get(untracked_entity):
                 selected_entities.append(untracked_entity)
 
@@ -105,6 +162,8 @@ def get_selected_entities_for_zones(hass, selected_existing_zones, integration_e
 
 async def get_translated_entity_type(hass, entity_type):
     """Return the translated display name for the given entity type (Power / Energy)."""
+    from homeassistant.helpers.translation import async_get_translations
+
     user_language = hass.config.language
     translations = await async_get_translations(hass, user_language, "selector", {DOMAIN})
     key = f"component.{DOMAIN}.selector.entity_type.options.{entity_type}"
@@ -128,13 +187,40 @@ def get_selected_smart_meter_devices(hass, filtered_entities):
             if is_smart_meter_selected(device):
                 selected.add(device)
     for entry in hass.config_entries.async_entries(DOMAIN):
-        device = entry.data.get(CONF_SMART_METER_DEVICE)
+        device = entry_membership(hass, entry)[CONF_SMART_METER_DEVICE]
         if is_smart_meter_selected(device):
             selected.add(device)
     _LOGGER.debug("Already assigned smart meter devices: %s", selected)
     return selected
 
 
+def get_entities_in_zones(hass):
+    """Return the entity IDs selected by any zone; zones of both types also use the paired sensors."""
+    entity_registry = er.async_get(hass)
+    in_use = set()
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        entities = entry_membership(hass, entry)[CONF_ENTITIES]
+        in_use.update(entities)
+        if entry.data.get(CONF_ENTITY_TYPE) == ENTITY_TYPE_DUAL:
+            for entity_type in entity_types(ENTITY_TYPE_DUAL):
+                in_use.update(paired_entities(entity_registry, entities, entity_type))
+    return in_use
+
+
+def one_entity_per_device(hass, entity_ids):
+    """Drop energy sensors whose power sensor on the same device is listed too.
+
+    Zones of both types select a device once and pair the other sensor.
+    """
+    entity_registry = er.async_get(hass)
+    listed = set(entity_ids)
+    return [
+        entity_id for entity_id in entity_ids
+        if not entity_id.endswith(f"_{ENTITY_TYPE_ENERGY}")
+        or not listed.intersection(paired_entities(entity_registry, [entity_id], ENTITY_TYPE_POWER))
+    ]
+
+
 def normalize_smart_meter_selection(user_input):
     """Return the selected smart meter entity ID, or '' if none selected."""
     value = user_input.get(CONF_SMART_METER_DEVICE, "")
@@ -151,9 +237,9 @@ def remove_smart_meter_from_entities(selected_smd, selected_entities):
 def get_selected_integration_zones(hass, existing_zones=None, exclude_entry_id=None):
     """Return the set of integration zone entity_ids already assigned to any config entry.
 
-    Integration zones are stored in CONF_INTEGRATION_ROOMS on the config entry, NOT in
+    Integration zones are stored in CONF_INTEGRATION_ROOMS of the zone membership, NOT in
     the sensor's selected_entities state attribute (which only holds CONF_ENTITIES).
-    We therefore read directly from config entry data here.
+    We therefore read directly from the membership here.
 
     exclude_entry_id: when called from the options flow, pass the current entry's ID so
     a zone is not considered taken by itself and remains visible in its own picker.
@@ -162,7 +248,7 @@ def get_selected_integration_zones(hass, existing_zones=None, exclude_entry_id=N
     for entry in hass.config_entries.async_entries(DOMAIN):
         if entry.entry_id == exclude_entry_id:
             continue
-        for zone_id in entry.data.get(CONF_INTEGRATION_ROOMS, []):
+        for zone_id in entry_membership(hass, entry)[CONF_INTEGRATION_ROOMS]:
             assigned.add(zone_id)
     _LOGGER.debug("Already assigned integration zones: %s", assigned)
     return assigned
@@ -202,6 +288,7 @@ class EnergyandPowerMonitorConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     options=[
                         {"value": ENTITY_TYPE_ENERGY, "label": ENTITY_TYPE_ENERGY},
                         {"value": ENTITY_TYPE_POWER, "label": ENTITY_TYPE_POWER},
+                        {"value": ENTITY_TYPE_DUAL, "label": ENTITY_TYPE_DUAL},
                     ],
                     translation_key="entity_type",
                     mode=selector.SelectSelectorMode.DROPDOWN,
@@ -212,24 +299,23 @@ class EnergyandPowerMonitorConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     async def async_step_select_entities(self, user_input=None):
         errors = {}
+        await async_get_membership_store(self.hass)
 
-        # Gather all sensor entities of the right type
+        # Gather all sensor entities of the right type (either type for zones of both)
         all_entities = self.hass.states.async_entity_ids("sensor")
-        if self.selected_type == ENTITY_TYPE_POWER:
-            filtered_entities = [e for e in all_entities if e.endswith("_power")]
-        else:
-            filtered_entities = [e for e in all_entities if e.endswith("_energy")]
+        suffixes = tuple(f"_{entity_type}" for entity_type in entity_types(self.selected_type))
+        filtered_entities = [e for e in all_entities if e.endswith(suffixes)]
 
         selected_smart_meter_devices = get_selected_smart_meter_devices(self.hass, filtered_entities)
         # Strip integration-owned entities and already-used entities
         filtered_entities = [e for e in filtered_entities if not e.startswith(f"sensor.{DOMAIN}")]
-        existing_entities_in_zones = set()
-        for entry in self.hass.config_entries.async_entries(DOMAIN):
-            existing_entities_in_zones.update(entry.data.get(CONF_ENTITIES, []))
+        existing_entities_in_zones = get_entities_in_zones(self.hass)
         filtered_entities = sorted([
             e for e in filtered_entities
             if e not in existing_entities_in_zones and e not in selected_smart_meter_devices
         ])
+        if self.selected_type == ENTITY_TYPE_DUAL:
+            filtered_entities = one_entity_per_device(self.hass, filtered_entities)
         _LOGGER.debug("Filtered entities for new zone: %s", filtered_entities)
 
         integration_entities = await get_integration_entities(self.hass)
@@ -304,16 +390,18 @@ class EnergyandPowerMonitorOptionsFlowHandler(config_entries.OptionsFlow):
 
     async def async_step_init(self, user_input=None):
         """Manage the options."""
-        return await self.async_step_user()
+        return self.async_show_menu(step_id="init", menu_options=["user", "rules", "sampling", "aggregation", "baseline", "periods", "forecast", "statistics", "events", "steps", "shares", "cost", "alert", "export"])
 
     async def async_step_user(self, user_input=None):
         """Manage the options."""
         errors = {}
+        await async_get_membership_store(self.hass)
         old_data = self.config_entry.data
+        old_membership = entry_membership(self.hass, self.config_entry)
         old_zone = old_data.get(CONF_ROOM, "")
-        old_entities_smd = old_data.get(CONF_SMART_METER_DEVICE, "")
-        old_entities = set(old_data.get(CONF_ENTITIES, []))
-        old_integration_zones = old_data.get(CONF_INTEGRATION_ROOMS, [])
+        old_entities_smd = old_membership[CONF_SMART_METER_DEVICE]
+        old_entities = set(old_membership[CONF_ENTITIES])
+        old_integration_zones = old_membership[CONF_INTEGRATION_ROOMS]
         current_zone = old_data.get(CONF_ROOM, "")
 
         integration_entities = await get_integration_entities(self.hass)
@@ -321,13 +409,11 @@ class EnergyandPowerMonitorOptionsFlowHandler(config_entries.OptionsFlow):
         if user_input is not None:
             try:
                 current_entity_type = old_data.get(CONF_ENTITY_TYPE, ENTITY_TYPE_POWER)
-                if user_input[CONF_ROOM] != old_zone:
-                    _LOGGER.debug("Zone name changed, updating references")
-                    await self.update_all_references(old_zone, user_input[CONF_ROOM], current_entity_type)
-                    await self.hass.config_entries.async_reload(self.config_entry.entry_id)
-
-                await self.async_remove_old_config(old_zone)
-                await self.async_remove_sensor_entities(old_zone)
+                zone_renamed = user_input[CONF_ROOM] != old_zone
+                if zone_renamed:
+                    # The entry is reloaded once, by async_create_new_config below
+                    await self.async_remove_old_config(old_zone)
+                    await self.async_remove_sensor_entities(old_zone)
 
                 selected_entities = list(user_input.get(CONF_ENTITIES, []))
                 selected_existing_zones = list(user_input.get(CONF_INTEGRATION_ROOMS, []))
@@ -350,10 +436,17 @@ class EnergyandPowerMonitorOptionsFlowHandler(config_entries.OptionsFlow):
                     CONF_ENTITIES: selected_entities,
                     CONF_INTEGRATION_ROOMS: selected_existing_zones,
                 }
+                # The reload also removes sensors that are no longer provided,
+                # e.g. the untracked sensor after the smart meter was deselected
                 await self.async_create_new_config(new_options, translated_entity_type)
+                if zone_renamed:
+                    # After the reload, so zones including this one find its new sensor
+                    _LOGGER.debug("Zone name changed, updating references")
+                    for entity_type in entity_types(current_entity_type):
+                        await self.update_all_references(old_zone, user_input[CONF_ROOM], entity_type)
                 return self.async_create_entry(
                     title=f"{translated_entity_type} - {new_options[CONF_ROOM]}",
-                    data=new_options,
+                    data=dict(self.config_entry.options),
                 )
             except Exception as ex:
                 _LOGGER.exception("Unexpected exception during options update: %s", ex)
@@ -378,9 +471,11 @@ class EnergyandPowerMonitorOptionsFlowHandler(config_entries.OptionsFlow):
         all_entities = self.hass.states.async_entity_ids("sensor")
         base_entity_id = f"sensor.{DOMAIN}_{sanitize_zone_name(current_zone)}"
         entity_id = None
-        if self.hass.states.get(f"{base_entity_id}_power"):
+        dual = old_data.get(CONF_ENTITY_TYPE) == ENTITY_TYPE_DUAL
+        # Zones of both types offer entities of both types
+        if self.hass.states.get(f"{base_entity_id}_power") and not dual:
             entity_id = f"{base_entity_id}_power"
-        if self.hass.states.get(f"{base_entity_id}_energy"):
+        if self.hass.states.get(f"{base_entity_id}_energy") and not dual:
             entity_id = f"{base_entity_id}_energy"
 
         device_class = None
@@ -411,15 +506,15 @@ class EnergyandPowerMonitorOptionsFlowHandler(config_entries.OptionsFlow):
             if eid not in assigned_integration_zones
         }
 
-        existing_entities_in_zones = set()
-        for entry in self.hass.config_entries.async_entries(DOMAIN):
-            existing_entities_in_zones.update(entry.data.get(CONF_ENTITIES, []))
+        existing_entities_in_zones = get_entities_in_zones(self.hass)
 
         filtered_entities = sorted(
             e for e in filtered_entities
             if e not in existing_entities_in_zones and e not in selected_smart_meter_devices
         )
         filtered_entities = sorted(set(filtered_entities))
+        if dual:
+            filtered_entities = one_entity_per_device(self.hass, filtered_entities)
         combined_entities = sorted(
             set(filtered_entities) | filtered_old_entities | old_integration_entities
         )
@@ -463,6 +558,429 @@ class EnergyandPowerMonitorOptionsFlowHandler(config_entries.OptionsFlow):
         })
         return self.async_show_form(step_id="user", data_schema=options_schema, errors=errors)
 
+    async def async_step_rules(self, user_input=None):
+        """Select zone members by area, floor, label, device class, integration or pattern."""
+        errors = {}
+        membership_store = await async_get_membership_store(self.hass)
+        rules = entry_membership(self.hass, self.config_entry)[CONF_RULES]
+
+        if user_input is not None:
+            from .rules import compile_patterns
+
+            try:
+                compile_patterns(user_input.get(CONF_RULE_PATTERNS))
+            except re.error:
+                errors[CONF_RULE_PATTERNS] = "invalid_pattern"
+            else:
+                new_rules = {key: list(user_input.get(key) or []) for key in RULE_KEYS}
+                _LOGGER.debug("Membership rules of '%s' set to %s", self.config_entry.title, new_rules)
+                # The zone recompiles its rules through the membership listener, no reload needed
+                membership_store.async_update(self.config_entry.entry_id, {CONF_RULES: new_rules})
+                return self.async_create_entry(title="", data=dict(self.config_entry.options))
+            rules = user_input
+
+        entity_registry = er.async_get(self.hass)
+        integrations = sorted({
+            entity.platform
+            for entity in entity_registry.entities.values()
+            if entity.domain == "sensor" and entity.platform != DOMAIN
+        })
+        data_schema = vol.Schema({
+            vol.Optional(CONF_RULE_AREAS, default=rules.get(CONF_RULE_AREAS, [])): selector.AreaSelector(
+                selector.AreaSelectorConfig(multiple=True)
+            ),
+            vol.Optional(CONF_RULE_FLOORS, default=rules.get(CONF_RULE_FLOORS, [])): selector.FloorSelector(
+                selector.FloorSelectorConfig(multiple=True)
+            ),
+            vol.Optional(CONF_RULE_LABELS, default=rules.get(CONF_RULE_LABELS, [])): selector.LabelSelector(
+                selector.LabelSelectorConfig(multiple=True)
+            ),
+            vol.Optional(
+                CONF_RULE_DEVICE_CLASSES, default=rules.get(CONF_RULE_DEVICE_CLASSES, [])
+            ): selector.SelectSelector(
+                selector.SelectSelectorConfig(
+                    options=[ENTITY_TYPE_POWER, ENTITY_TYPE_ENERGY],
+                    multiple=True,
+                    custom_value=True,
+                    mode=selector.SelectSelectorMode.DROPDOWN,
+                )
+            ),
+            vol.Optional(
+                CONF_RULE_INTEGRATIONS, default=rules.get(CONF_RULE_INTEGRATIONS, [])
+            ): selector.SelectSelector(
+                selector.SelectSelectorConfig(
+                    options=integrations,
+                    multiple=True,
+                    custom_value=True,
+                    mode=selector.SelectSelectorMode.DROPDOWN,
+                )
+            ),
+            vol.Optional(CONF_RULE_PATTERNS, default=rules.get(CONF_RULE_PATTERNS, [])): selector.TextSelector(
+                selector.TextSelectorConfig(multiple=True)
+            ),
+        })
+        return self.async_show_form(step_id="rules", data_schema=data_schema, errors=errors)
+
+    async def async_step_sampling(self, user_input=None):
+        """Pick the zone member whose input sampling should be configured."""
+        await async_get_membership_store(self.hass)
+        members = set(entry_membership(self.hass, self.config_entry)[CONF_ENTITIES])
+        if self.config_entry.data.get(CONF_ENTITY_TYPE) == ENTITY_TYPE_DUAL:
+            entity_registry = er.async_get(self.hass)
+            for entity_type in entity_types(ENTITY_TYPE_DUAL):
+                members.update(paired_entities(entity_registry, list(members), entity_type))
+        members = sorted(members)
+        if not members:
+            return self.async_abort(reason="no_members")
+
+        if user_input is not None:
+            self.sampling_entity = user_input[CONF_SAMPLING_ENTITY]
+            return await self.async_step_sampling_member()
+
+        sampling = self.config_entry.options.get(CONF_SAMPLING, {})
+        member_options = [
+            {
+                "value": entity_id,
+                "label": f"{label} ({sampling[entity_id][CONF_SAMPLING_POLICY]})"
+                if entity_id in sampling else label,
+            }
+            for entity_id, label in build_entity_label_map(self.hass, members).items()
+        ]
+        data_schema = vol.Schema({
+            vol.Required(CONF_SAMPLING_ENTITY): selector.SelectSelector(
+                selector.SelectSelectorConfig(
+                    options=member_options,
+                    mode=selector.SelectSelectorMode.DROPDOWN,
+                )
+            ),
+        })
+        return self.async_show_form(step_id="sampling", data_schema=data_schema)
+
+    async def async_step_sampling_member(self, user_input=None):
+        """Configure the sampling policy of the selected member."""
+        sampling = dict(self.config_entry.options.get(CONF_SAMPLING, {}))
+        current = sampling.get(self.sampling_entity, {})
+
+        if user_input is not None:
+            if user_input[CONF_SAMPLING_POLICY] == SAMPLING_PASS_THROUGH:
+                sampling.pop(self.sampling_entity, None)
+            else:
+                sampling[self.sampling_entity] = {
+                    CONF_SAMPLING_POLICY: user_input[CONF_SAMPLING_POLICY],
+                    CONF_SAMPLING_INTERVAL: user_input.get(CONF_SAMPLING_INTERVAL, 0),
+                    CONF_SAMPLING_THRESHOLD: user_input.get(CONF_SAMPLING_THRESHOLD, 0),
+                }
+            _LOGGER.debug("Sampling for '%s' set to %s", self.sampling_entity, sampling.get(self.sampling_entity))
+            return await self.async_save_options({**self.config_entry.options, CONF_SAMPLING: sampling})
+
+        data_schema = vol.Schema({
+            vol.Required(
+                CONF_SAMPLING_POLICY, default=current.get(CONF_SAMPLING_POLICY, SAMPLING_PASS_THROUGH)
+            ): selector.SelectSelector(
+                selector.SelectSelectorConfig(
+                    options=SAMPLING_POLICIES,
+                    translation_key="sampling_policy",
+                    mode=selector.SelectSelectorMode.LIST,
+                )
+            ),
+            vol.Optional(
+                CONF_SAMPLING_INTERVAL, default=current.get(CONF_SAMPLING_INTERVAL, 5)
+            ): selector.NumberSelector(
+                selector.NumberSelectorConfig(
+                    min=0, max=3600, step=0.1, unit_of_measurement="s",
+                    mode=selector.NumberSelectorMode.BOX,
+                )
+            ),
+            vol.Optional(
+                CONF_SAMPLING_THRESHOLD, default=current.get(CONF_SAMPLING_THRESHOLD, 0)
+            ): selector.NumberSelector(
+                selector.NumberSelectorConfig(
+                    min=0, step="any", mode=selector.NumberSelectorMode.BOX,
+                )
+            ),
+        })
+        return self.async_show_form(
+            step_id="sampling_member",
+            data_schema=data_schema,
+            description_placeholders={"entity_id": self.sampling_entity},
+        )
+
+    async def async_step_aggregation(self, user_input=None):
+        """Configure when the zone recomputes: per event, per interval tick, or adaptively."""
+        options = self.config_entry.options
+        if user_input is not None:
+            return await self.async_save_options({**options, **user_input})
+
+        data_schema = vol.Schema({
+            vol.Required(
+                CONF_AGGREGATION, default=options.get(CONF_AGGREGATION, AGGREGATION_AUTO)
+            ): selector.SelectSelector(
+                selector.SelectSelectorConfig(
+                    options=AGGREGATION_MODES,
+                    translation_key="aggregation",
+                    mode=selector.SelectSelectorMode.LIST,
+                )
+            ),
+            vol.Optional(
+                CONF_AGGREGATION_INTERVAL,
+                default=options.get(CONF_AGGREGATION_INTERVAL, DEFAULT_AGGREGATION_INTERVAL),
+            ): selector.NumberSelector(
+                selector.NumberSelectorConfig(
+                    min=0.1, max=60, step=0.1, unit_of_measurement="s",
+                    mode=selector.NumberSelectorMode.BOX,
+                )
+            ),
+            vol.Optional(
+                CONF_AGGREGATION_RATE,
+                default=options.get(CONF_AGGREGATION_RATE, DEFAULT_AGGREGATION_RATE),
+            ): selector.NumberSelector(
+                selector.NumberSelectorConfig(
+                    min=0.1, max=1000, step=0.1, unit_of_measurement="events/s",
+                    mode=selector.NumberSelectorMode.BOX,
+                )
+            ),
+        })
+        return self.async_show_form(step_id="aggregation", data_schema=data_schema)
+
+    async def async_step_baseline(self, user_input=None):
+        """Configure the streaming standby/baseline sensors of this zone."""
+        options = self.config_entry.options
+        if user_input is not None:
+            return await self.async_save_options({**options, **user_input})
+
+        data_schema = vol.Schema({
+            vol.Optional(CONF_BASELINE, default=options.get(CONF_BASELINE, False)): cv.boolean,
+            vol.Optional(
+                CONF_BASELINE_UNTRACKED, default=options.get(CONF_BASELINE_UNTRACKED, False)
+            ): cv.boolean,
+            vol.Optional(
+                CONF_BASELINE_QUANTILE,
+                default=options.get(CONF_BASELINE_QUANTILE, DEFAULT_BASELINE_QUANTILE),
+            ): selector.NumberSelector(
+                selector.NumberSelectorConfig(
+                    min=1, max=50, step=1, unit_of_measurement="%",
+                    mode=selector.NumberSelectorMode.BOX,
+                )
+            ),
+            vol.Optional(
+                CONF_BASELINE_WINDOW,
+                default=options.get(CONF_BASELINE_WINDOW, DEFAULT_BASELINE_WINDOW),
+            ): selector.NumberSelector(
+                selector.NumberSelectorConfig(
+                    min=1, max=168, step=1, unit_of_measurement="h",
+                    mode=selector.NumberSelectorMode.BOX,
+                )
+            ),
+        })
+        return self.async_show_form(step_id="baseline", data_schema=data_schema)
+
+    async def async_step_periods(self, user_input=None):
+        """Configure the daily/weekly/monthly/cron consumption sensors of an energy zone."""
+        if ENTITY_TYPE_ENERGY not in entity_types(self.config_entry.data.get(CONF_ENTITY_TYPE)):
+            return self.async_abort(reason="energy_only")
+        errors = {}
+        options = self.config_entry.options
+        if user_input is not None:
+            cron = (user_input.get(CONF_PERIOD_CRON) or "").strip()
+            if cron:
+                from .scheduler import validate_cron
+
+                try:
+                    validate_cron(cron)
+                except ImportError:
+                    errors[CONF_PERIOD_CRON] = "cron_unavailable"
+                except ValueError:
+                    errors[CONF_PERIOD_CRON] = "invalid_cron"
+            if not errors:
+                return await self.async_save_options({
+                    **options,
+                    CONF_PERIODS: user_input.get(CONF_PERIODS, []),
+                    CONF_PERIOD_CRON: cron,
+                })
+
+        data_schema = vol.Schema({
+            vol.Optional(CONF_PERIODS, default=options.get(CONF_PERIODS, [])): selector.SelectSelector(
+                selector.SelectSelectorConfig(
+                    options=PERIODS,
+                    multiple=True,
+                    translation_key="period",
+                    mode=selector.SelectSelectorMode.LIST,
+                )
+            ),
+            vol.Optional(
+                CONF_PERIOD_CRON,
+                description={"suggested_value": options.get(CONF_PERIOD_CRON, "")},
+            ): selector.TextSelector(),
+        })
+        return self.async_show_form(step_id="periods", data_schema=data_schema, errors=errors)
+
+    async def async_step_forecast(self, user_input=None):
+        """Select the periods with an end-of-period consumption forecast of an energy zone."""
+        if ENTITY_TYPE_ENERGY not in entity_types(self.config_entry.data.get(CONF_ENTITY_TYPE)):
+            return self.async_abort(reason="energy_only")
+        options = self.config_entry.options
+        if user_input is not None:
+            return await self.async_save_options({**options, CONF_FORECAST: user_input.get(CONF_FORECAST, [])})
+
+        data_schema = vol.Schema({
+            vol.Optional(CONF_FORECAST, default=options.get(CONF_FORECAST, [])): selector.SelectSelector(
+                selector.SelectSelectorConfig(
+                    options=PERIODS,
+                    multiple=True,
+                    translation_key="period",
+                    mode=selector.SelectSelectorMode.LIST,
+                )
+            ),
+        })
+        return self.async_show_form(step_id="forecast", data_schema=data_schema)
+
+    async def async_step_statistics(self, user_input=None):
+        """Enable the hourly long-term statistics of an energy zone and its untracked sensor."""
+        if ENTITY_TYPE_ENERGY not in entity_types(self.config_entry.data.get(CONF_ENTITY_TYPE)):
+            return self.async_abort(reason="energy_only")
+        options = self.config_entry.options
+        if user_input is not None:
+            return await self.async_save_options({**options, **user_input})
+
+        data_schema = vol.Schema({
+            vol.Optional(CONF_STATISTICS, default=options.get(CONF_STATISTICS, False)): cv.boolean,
+        })
+        return self.async_show_form(step_id="statistics", data_schema=data_schema)
+
+    async def async_step_events(self, user_input=None):
+        """Configure the threshold of the zone changed events."""
+        options = self.config_entry.options
+        if user_input is not None:
+            return await self.async_save_options({**options, **user_input})
+
+        # Zones of both types use their power sensor
+        unit = "kWh" if self.config_entry.data.get(CONF_ENTITY_TYPE) == ENTITY_TYPE_ENERGY else "W"
+        data_schema = vol.Schema({
+            vol.Optional(
+                CONF_EVENT_THRESHOLD, default=options.get(CONF_EVENT_THRESHOLD, 0)
+            ): selector.NumberSelector(
+                selector.NumberSelectorConfig(
+                    min=0, max=100000, step="any", unit_of_measurement=unit,
+                    mode=selector.NumberSelectorMode.BOX,
+                )
+            ),
+        })
+        return self.async_show_form(step_id="events", data_schema=data_schema)
+
+    async def async_step_steps(self, user_input=None):
+        """Configure the step detection of a power zone and its untracked sensor."""
+        if ENTITY_TYPE_POWER not in entity_types(self.config_entry.data.get(CONF_ENTITY_TYPE)):
+            return self.async_abort(reason="power_only")
+        options = self.config_entry.options
+        if user_input is not None:
+            return await self.async_save_options({**options, **user_input})
+
+        data_schema = vol.Schema({
+            vol.Optional(
+                CONF_STEP_THRESHOLD, default=options.get(CONF_STEP_THRESHOLD, 0)
+            ): selector.NumberSelector(
+                selector.NumberSelectorConfig(
+                    min=0, max=100000, step="any", unit_of_measurement="W",
+                    mode=selector.NumberSelectorMode.BOX,
+                )
+            ),
+            vol.Optional(
+                CONF_STEP_WINDOW, default=options.get(CONF_STEP_WINDOW, DEFAULT_STEP_WINDOW)
+            ): selector.NumberSelector(
+                selector.NumberSelectorConfig(
+                    min=0, max=3600, step=1, unit_of_measurement="s",
+                    mode=selector.NumberSelectorMode.BOX,
+                )
+            ),
+        })
+        return self.async_show_form(step_id="steps", data_schema=data_schema)
+
+    async def async_step_shares(self, user_input=None):
+        """Enable the share, coverage and unaccounted sensors derived from the zone tree."""
+        options = self.config_entry.options
+        if user_input is not None:
+            return await self.async_save_options({**options, **user_input})
+
+        data_schema = vol.Schema({
+            **{vol.Optional(kind, default=options.get(kind, False)): cv.boolean for kind in SHARE_KINDS},
+            vol.Optional(CONF_UNACCOUNTED, default=options.get(CONF_UNACCOUNTED, False)): cv.boolean,
+        })
+        return self.async_show_form(step_id="shares", data_schema=data_schema)
+
+    async def async_step_cost(self, user_input=None):
+        """Select the price entity of the zone's running cost sensor (empty removes it)."""
+        options = self.config_entry.options
+        if user_input is not None:
+            return await self.async_save_options({
+                **options, CONF_PRICE_ENTITY: user_input.get(CONF_PRICE_ENTITY, "")
+            })
+
+        data_schema = vol.Schema({
+            vol.Optional(
+                CONF_PRICE_ENTITY,
+                description={"suggested_value": options.get(CONF_PRICE_ENTITY) or None},
+            ): selector.EntitySelector(
+                selector.EntitySelectorConfig(domain=["sensor", "input_number", "number"])
+            ),
+        })
+        return self.async_show_form(step_id="cost", data_schema=data_schema)
+
+    async def async_step_alert(self, user_input=None):
+        """Configure the overload alert (binary sensor) of this zone."""
+        options = self.config_entry.options
+        if user_input is not None:
+            return await self.async_save_options({**options, **user_input})
+
+        # Zones of both types use their power sensor
+        unit = "kWh" if self.config_entry.data.get(CONF_ENTITY_TYPE) == ENTITY_TYPE_ENERGY else "W"
+        data_schema = vol.Schema({
+            vol.Optional(
+                CONF_ALERT_THRESHOLD, default=options.get(CONF_ALERT_THRESHOLD, 0)
+            ): selector.NumberSelector(
+                selector.NumberSelectorConfig(
+                    min=0, max=1000000, step="any", unit_of_measurement=unit,
+                    mode=selector.NumberSelectorMode.BOX,
+                )
+            ),
+            vol.Optional(
+                CONF_ALERT_HYSTERESIS, default=options.get(CONF_ALERT_HYSTERESIS, 0)
+            ): selector.NumberSelector(
+                selector.NumberSelectorConfig(
+                    min=0, max=1000000, step="any", unit_of_measurement=unit,
+                    mode=selector.NumberSelectorMode.BOX,
+                )
+            ),
+            vol.Optional(
+                CONF_ALERT_DELAY, default=options.get(CONF_ALERT_DELAY, 0)
+            ): selector.NumberSelector(
+                selector.NumberSelectorConfig(
+                    min=0, max=86400, step=1, unit_of_measurement="s",
+                    mode=selector.NumberSelectorMode.BOX,
+                )
+            ),
+        })
+        return self.async_show_form(step_id="alert", data_schema=data_schema)
+
+    async def async_step_export(self, user_input=None):
+        """Configure the local time-series export of this zone."""
+        options = self.config_entry.options
+        if user_input is not None:
+            return await self.async_save_options({**options, **user_input})
+
+        data_schema = vol.Schema({
+            vol.Optional(CONF_EXPORT, default=options.get(CONF_EXPORT, False)): cv.boolean,
+            vol.Optional(
+                CONF_EXPORT_FORMAT, default=options.get(CONF_EXPORT_FORMAT, EXPORT_FORMAT_CSV)
+            ): selector.SelectSelector(
+                selector.SelectSelectorConfig(
+                    options=[EXPORT_FORMAT_CSV, EXPORT_FORMAT_PARQUET],
+                    translation_key="export_format",
+                    mode=selector.SelectSelectorMode.DROPDOWN,
+                )
+            ),
+        })
+        return self.async_show_form(step_id="export", data_schema=data_schema)
+
     async def update_all_references(self, old_zone: str, new_zone: str, current_entity_type: str):
         """Update references to old_zone in all other config entries after a rename."""
         sanitized_old = sanitize_zone_name(old_zone)
@@ -473,13 +991,14 @@ class EnergyandPowerMonitorOptionsFlowHandler(config_entries.OptionsFlow):
         new_smart_prefix = f"sensor.{DOMAIN}_{sanitized_new}_untracked_"
 
         _LOGGER.debug("update_all_references: %s -> %s", old_main_id, new_main_id)
+        membership_store = await async_get_membership_store(self.hass)
         for entry in self.hass.config_entries.async_entries(DOMAIN):
             if entry.entry_id == self.config_entry.entry_id:
                 continue
-            data = dict(entry.data)
+            data = entry_membership(self.hass, entry)
             updated = False
 
-            if CONF_INTEGRATION_ROOMS in data:
+            if data[CONF_INTEGRATION_ROOMS]:
                 new_zones = [
                     new_main_id if z == old_main_id else z
                     for z in data[CONF_INTEGRATION_ROOMS]
@@ -488,7 +1007,7 @@ class EnergyandPowerMonitorOptionsFlowHandler(config_entries.OptionsFlow):
                     data[CONF_INTEGRATION_ROOMS] = new_zones
                     updated = True
 
-            if CONF_ENTITIES in data:
+            if data[CONF_ENTITIES]:
                 new_ents = []
                 for ent in data[CONF_ENTITIES]:
                     if ent == old_main_id:
@@ -504,7 +1023,8 @@ class EnergyandPowerMonitorOptionsFlowHandler(config_entries.OptionsFlow):
             if updated:
                 zone_name = entry.data.get(CONF_ROOM, "unknown")
                 _LOGGER.debug("Updating references in zone '%s'", zone_name)
-                self.hass.config_entries.async_update_entry(entry, data=data)
+                # Running zones pick the change up through their membership listener
+                membership_store.async_update(entry.entry_id, data)
         _LOGGER.debug("Completed update_all_references")
 
     async def async_remove_old_config(self, old_zone: str):
@@ -518,14 +1038,28 @@ class EnergyandPowerMonitorOptionsFlowHandler(config_entries.OptionsFlow):
                         await sensor.async_remove_sensor_entities(old_zone)
 
     async def async_create_new_config(self, options: dict, translated_entity_type: str):
-        """Persist updated options and reload the entry."""
+        """Persist the zone identity and membership and reload the entry."""
+        membership_store = await async_get_membership_store(self.hass)
+        membership_store.async_update(
+            self.config_entry.entry_id, {key: options[key] for key in MEMBERSHIP_KEYS}
+        )
         self.hass.config_entries.async_update_entry(
             self.config_entry,
             title=f"{translated_entity_type} - {options[CONF_ROOM]}",
-            data=options,
+            data={key: value for key, value in options.items() if key not in MEMBERSHIP_KEYS},
         )
         await self.hass.config_entries.async_reload(self.config_entry.entry_id)
 
+    async def async_save_options(self, options: dict):
+        """Persist updated zone options, reload the entry once and finish the flow.
+
+        The zone sensors have no update listener: the reload applies the
+        options (and removes sensors that were switched off).
+        """
+        self.hass.config_entries.async_update_entry(self.config_entry, options=options)
+        await self.hass.config_entries.async_reload(self.config_entry.entry_id)
+        return self.async_create_entry(title="", data=options)
+
     async def async_remove_sensor_entities(self, zone_name: str):
         """Remove all sensor entities associated with the old zone name."""
         entity_registry = er.async_get(self.hass)
@@ -534,7 +1068,13 @@ class EnergyandPowerMonitorOptionsFlowHandler(config_entries.OptionsFlow):
         entity_id_se = f"sensor.{DOMAIN}_{sanitized}_{current_entity_type}"
         entity_id_cr = f"sensor.{DOMAIN}_{sanitized}_untracked_{current_entity_type}"
         _LOGGER.info("Attempting to remove entities: %s and %s", entity_id_se, entity_id_cr)
-        for eid in (entity_id_se, entity_id_cr):
+        # Derived sensors (baseline, ...) carry the old zone name in their entity IDs too
+        derived = [
+            entity.entity_id
+            for entity in er.async_entries_for_config_entry(entity_registry, self.config_entry.entry_id)
+            if entity.entity_id not in (entity_id_se, entity_id_cr)
+        ]
+        for eid in (entity_id_se, entity_id_cr, *derived):
             if eid in entity_registry.entities:
                 _LOGGER.info("Removing from entity registry: %s", eid)
                 entity_registry.async_remove(eid)
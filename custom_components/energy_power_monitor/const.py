@@ -10,6 +10,123 @@ CONF_INTEGRATION_ROOMS = "integration_rooms"
 
 ENTITY_TYPE_POWER = "power"
 ENTITY_TYPE_ENERGY = "energy"
+# One zone with power and energy sensors; members are paired per device
+ENTITY_TYPE_DUAL = "dual"
+
+# Per-member input sampling (stored in entry.options[CONF_SAMPLING][entity_id])
+CONF_SAMPLING = "sampling"
+CONF_SAMPLING_ENTITY = "sampling_entity"
+CONF_SAMPLING_POLICY = "policy"
+CONF_SAMPLING_INTERVAL = "interval"
+CONF_SAMPLING_THRESHOLD = "threshold"
+
+SAMPLING_PASS_THROUGH = "pass_through"
+SAMPLING_MIN_INTERVAL = "min_interval"
+SAMPLING_TIME_WEIGHTED = "time_weighted"
+SAMPLING_CHANGE_THRESHOLD = "change_threshold"
+SAMPLING_POLICIES = [
+    SAMPLING_PASS_THROUGH,
+    SAMPLING_MIN_INTERVAL,
+    SAMPLING_TIME_WEIGHTED,
+    SAMPLING_CHANGE_THRESHOLD,
+]
+
+# Standby/baseline (low quantile) sensors
+CONF_BASELINE = "baseline"
+CONF_BASELINE_UNTRACKED = "baseline_untracked"
+CONF_BASELINE_QUANTILE = "baseline_quantile"
+CONF_BASELINE_WINDOW = "baseline_window"
+
+DEFAULT_BASELINE_QUANTILE = 5
+DEFAULT_BASELINE_WINDOW = 24
+
+# Local time-series export
+CONF_EXPORT = "export"
+CONF_EXPORT_FORMAT = "export_format"
+
+EXPORT_FORMAT_CSV = "csv"
+EXPORT_FORMAT_PARQUET = "parquet"
+
+# Adaptive aggregation: recompute per event, or once per interval tick when busy
+CONF_AGGREGATION = "aggregation"
+CONF_AGGREGATION_INTERVAL = "aggregation_interval"
+CONF_AGGREGATION_RATE = "aggregation_rate"
+
+AGGREGATION_AUTO = "auto"
+AGGREGATION_EVENT = "event"
+AGGREGATION_INTERVAL = "interval"
+AGGREGATION_MODES = [AGGREGATION_AUTO, AGGREGATION_EVENT, AGGREGATION_INTERVAL]
+
+DEFAULT_AGGREGATION_INTERVAL = 1
+DEFAULT_AGGREGATION_RATE = 5
+
+# Period consumption sensors of energy zones
+CONF_PERIODS = "periods"
+CONF_PERIOD_CRON = "period_cron"
+
+PERIOD_DAILY = "daily"
+PERIOD_WEEKLY = "weekly"
+PERIOD_MONTHLY = "monthly"
+PERIOD_CRON = "cron"
+PERIODS = [PERIOD_DAILY, PERIOD_WEEKLY, PERIOD_MONTHLY]
+# Internal period of the long-term statistics (UTC hours, like the recorder)
+PERIOD_HOURLY = "hourly"
+
+# End-of-period consumption forecasts of energy zones (list of PERIODS)
+CONF_FORECAST = "forecast"
+
+# Hourly long-term statistics of energy zones and their untracked sensors
+CONF_STATISTICS = "statistics"
+
+# Zone changed events: fired when the zone value moved by at least the
+# threshold (W or kWh) since the last event; 0 disables them
+CONF_EVENT_THRESHOLD = "event_threshold"
+EVENT_ZONE_CHANGED = f"{DOMAIN}_zone_changed"
+
+# Step detection on power zones and their untracked sensors: steps of at
+# least the threshold (W) that last the window (s); 0 disables it
+CONF_STEP_THRESHOLD = "step_threshold"
+CONF_STEP_WINDOW = "step_window"
+DEFAULT_STEP_WINDOW = 10
+EVENT_STEP_DETECTED = f"{DOMAIN}_step_detected"
+
+# Derived percentage sensors of a zone (option keys and sensor kinds)
+SHARE_PARENT = "share_parent"
+SHARE_METER = "share_meter"
+SHARE_COVERAGE = "coverage"
+SHARE_KINDS = [SHARE_PARENT, SHARE_METER, SHARE_COVERAGE]
+
+# Running cost of a zone, priced by a tariff entity (<currency>/kWh)
+CONF_PRICE_ENTITY = "price_entity"
+
+# Overload alert of a zone: on above the threshold, off below threshold -
+# hysteresis, each after the crossing lasted the delay (s); 0 disables it
+CONF_ALERT_THRESHOLD = "alert_threshold"
+CONF_ALERT_HYSTERESIS = "alert_hysteresis"
+CONF_ALERT_DELAY = "alert_delay"
+
+# Unaccounted value per level of the zone tree: the zone (its smart meter, if
+# any) minus its included zones
+CONF_UNACCOUNTED = "unaccounted"
+
+# Rule-based membership (stored with the zone membership, not in the config entry)
+CONF_RULES = "rules"
+CONF_RULE_AREAS = "areas"
+CONF_RULE_FLOORS = "floors"
+CONF_RULE_LABELS = "labels"
+CONF_RULE_DEVICE_CLASSES = "device_classes"
+CONF_RULE_INTEGRATIONS = "integrations"
+CONF_RULE_PATTERNS = "patterns"
+RULE_KEYS = [
+    CONF_RULE_AREAS,
+    CONF_RULE_FLOORS,
+    CONF_RULE_LABELS,
+    CONF_RULE_DEVICE_CLASSES,
+    CONF_RULE_INTEGRATIONS,
+    CONF_RULE_PATTERNS,
+]
+# Entity ID patterns are globs unless they start with this prefix
+RULE_REGEX_PREFIX = "re:"
 
 
 def sanitize_zone_name(zone_name: str) -> str:
@@ -23,6 +140,13 @@ def sanitize_zone_name(zone_name: str) -> str:
     return normalized.lower().replace(" ", "_").replace("-", "_")
 
 
+def entity_types(entity_type: str) -> list[str]:
+    """Return the sensor types a zone of entity_type provides."""
+    if entity_type == ENTITY_TYPE_DUAL:
+        return [ENTITY_TYPE_POWER, ENTITY_TYPE_ENERGY]
+    return [entity_type]
+
+
 def is_smart_meter_selected(value: str | None) -> bool:
     """Return True only when value looks like a real sensor entity ID.
 
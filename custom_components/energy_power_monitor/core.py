@@ -0,0 +1,217 @@
+"""Zone aggregation core.
+
+Plain Python without Home Assistant imports: callers pass in entity IDs and
+raw state strings or numbers and read the results back.  Together with
+accumulator.py and const.py it can be loaded without the package __init__
+(which imports Home Assistant), as tests/test_core.py does to fuzz-test the
+zone arithmetic offline.  The sensors in sensor.py are adapters that feed a
+ZoneModel from state change events.
+"""
+from __future__ import annotations
+
+import math
+from collections.abc import Callable, Iterable
+
+from .accumulator import IncreaseTracker
+
+# States that never carry a value (Home Assistant's unknown / unavailable)
+INVALID_STATES = frozenset((None, "", "unknown", "unavailable"))
+# Updates after which the running sum is recomputed exactly, bounding the
+# floating-point drift of the incremental updates
+RESUM_INTERVAL = 10000
+
+
+def parse_value(state) -> float | None:
+    """Return the numeric value of a state, or None when it cannot be used.
+
+    Non-finite numbers (nan, inf) are rejected as well: one of them would
+    poison every sum it takes part in.
+    """
+    if state in INVALID_STATES:
+        return None
+    try:
+        value = float(state)
+    except (ValueError, TypeError):
+        return None
+    return value if math.isfinite(value) else None
+
+
+def untracked_entity_id(zone_entity_id: str, entity_type: str) -> str:
+    """Return the entity ID of the untracked sensor belonging to a zone sensor."""
+    return f"{zone_entity_id[:-(len(entity_type) + 1)]}_untracked_{entity_type}"
+
+
+def expand_members(
+    entities: Iterable[str],
+    integration_zones: Iterable[str],
+    entity_type: str,
+    exists: Callable[[str], bool],
+    cumulative: bool = False,
+) -> list[str]:
+    """Expand included zones into their zone and untracked sensors.
+
+    exists tells whether an entity ID is registered; included zones (and
+    untracked sensors) that are not are skipped.  Cumulative (energy) zones
+    only get the zone sensors: an untracked value (meter - zone) drops
+    whenever the zone counts before the meter, which the accumulation would
+    take for a meter reset.
+    """
+    selected = list(entities or [])
+    if not integration_zones:
+        return selected
+    for zone_id in integration_zones:
+        if exists(zone_id):
+            selected.append(zone_id)
+        if cumulative:
+            continue
+        untracked = untracked_entity_id(zone_id, entity_type)
+        if exists(untracked):
+            selected.append(untracked)
+    return sorted(set(selected))
+
+
+def untracked_value(meter: float | None, zone_value: float | None) -> float | None:
+    """Return meter - zone_value clamped to 0, or None while either is unknown."""
+    if meter is None or zone_value is None:
+        return None
+    return max(0, round(meter - zone_value, 1))
+
+
+class ZoneSum:
+    """Running sum of the valid member values of a power zone.
+
+    Negative and missing values are skipped (a member renamed or briefly
+    unavailable counts again once it reports).  An update only adjusts the
+    total by the difference to the member's previous value, so it is O(1)
+    however many members the zone has.
+    """
+
+    __slots__ = ("_values", "_total", "_valid", "_updates")
+
+    def __init__(self):
+        self._values: dict[str, float | None] = {}
+        self._total = 0.0
+        self._valid = 0
+        self._updates = 0
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __contains__(self, entity_id) -> bool:
+        return entity_id in self._values
+
+    @property
+    def total(self) -> float:
+        return self._total
+
+    @property
+    def valid(self) -> int:
+        """Number of members with a valid value."""
+        return self._valid
+
+    def get(self, entity_id: str) -> float | None:
+        """Return the value of a member, or None when it is unknown or skipped."""
+        return self._values.get(entity_id)
+
+    def update(self, entity_id: str, value: float | None) -> None:
+        """Set the value of a member, adding it when it is new."""
+        if value is not None and value < 0:
+            value = None
+        old = self._values.get(entity_id)
+        self._values[entity_id] = value
+        if old is not None:
+            self._total -= old
+            self._valid -= 1
+        if value is not None:
+            self._total += value
+            self._valid += 1
+        self._updated()
+
+    def discard(self, entity_id: str) -> None:
+        """Remove a member."""
+        old = self._values.pop(entity_id, None)
+        if old is not None:
+            self._total -= old
+            self._valid -= 1
+            self._updated()
+
+    def _updated(self) -> None:
+        self._updates += 1
+        if self._valid == 0:
+            self._total = 0.0
+        elif self._updates >= RESUM_INTERVAL:
+            self._updates = 0
+            self._total = math.fsum(value for value in self._values.values() if value is not None)
+
+
+class ZoneModel:
+    """The value of one zone, updated member by member.
+
+    A power zone is the sum of its members' current values.  An energy
+    (cumulative) zone accumulates the increases of its members instead, so
+    member resets, removals and additions never make its total drop; add()
+    and update() return the increase they caused so callers can publish it.
+    """
+
+    __slots__ = ("cumulative", "sum", "increases", "total")
+
+    def __init__(self, cumulative: bool = False):
+        self.cumulative = cumulative
+        self.sum = None if cumulative else ZoneSum()
+        self.increases = IncreaseTracker() if cumulative else None
+        # Energy zones: accumulated total, None until restored or started
+        self.total: float | None = None
+
+    @property
+    def value(self) -> float:
+        """The zone value, rounded like the sensor state."""
+        if self.cumulative:
+            return round(self.total or 0.0, 1)
+        return round(self.sum.total, 1)
+
+    @property
+    def valid_members(self) -> int:
+        """Members that feed the value: with a valid value, or known to the accumulator."""
+        if self.cumulative:
+            return len(self.increases)
+        return self.sum.valid
+
+    def member_value(self, entity_id: str) -> float | None:
+        """Return the last value of a member that fed the zone."""
+        if self.cumulative:
+            return self.increases.get(entity_id)
+        return self.sum.get(entity_id)
+
+    def add(self, entity_id: str, value: float | None) -> float:
+        """Add a member with its current value."""
+        return self.update(entity_id, value)
+
+    def update(self, entity_id: str, value: float | None) -> float:
+        """Record a new value of a member; return the increase (0 for power zones)."""
+        if not self.cumulative:
+            self.sum.update(entity_id, value)
+            return 0.0
+        increase = self.increases.update(entity_id, value)
+        if increase and self.total is not None:
+            self.total += increase
+        return increase
+
+    def remove(self, entity_id: str) -> None:
+        """Remove a member; an energy zone keeps what it contributed."""
+        if self.cumulative:
+            self.increases.discard(entity_id)
+        else:
+            self.sum.discard(entity_id)
+
+    def restore(self, total: float, last: dict[str, float], members: Iterable[str]) -> None:
+        """Continue an energy zone from a persisted total and per-member values."""
+        self.total = float(total)
+        self.increases.restore(last, members)
+
+    def start(self) -> None:
+        """Start an energy zone without a persisted total from its members' current values."""
+        if self.cumulative and self.total is None:
+            self.total = sum(self.increases.as_dict().values())
@@ -0,0 +1,44 @@
+"""Diagnostics support for Energy and Power Monitor."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .models import get_runtime_data
+from .storage import entry_membership
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """Return diagnostics for a zone config entry."""
+    runtime = get_runtime_data(hass)
+    zones = {
+        entity_id: diagnostics
+        for entity_id, sensor in runtime.zones.items()
+        if (diagnostics := sensor.diagnostics())["entry_id"] == entry.entry_id
+    }
+    untracked = {
+        entity_id: diagnostics
+        for entity_id, sensor in runtime.untracked.items()
+        if (diagnostics := sensor.diagnostics())["entry_id"] == entry.entry_id
+    }
+    startup = runtime.startup.as_dict()
+    return {
+        "data": dict(entry.data),
+        "options": dict(entry.options),
+        "membership": entry_membership(hass, entry),
+        "zones": zones,
+        "untracked": untracked,
+        "listeners": runtime.listener_counts(),
+        "startup": {
+            "imports_ms": startup["imports_ms"],
+            "total_ms": startup["total_ms"],
+            "entry_setup_ms": startup["entry_setup_ms"].get(entry.entry_id),
+            "first_valid_state_ms": {
+                entity_id: ms
+                for entity_id, ms in startup["first_valid_state_ms"].items()
+                if entity_id in zones or entity_id in untracked
+            },
+        },
+    }
@@ -0,0 +1,292 @@
+"""Constant-memory streaming estimators used by the zone analytics sensors.
+
+Everything here is plain Python without Home Assistant imports; callers pass
+in timestamps (seconds, any monotonic origin) explicitly.
+"""
+import math
+from collections import deque
+
+
+class P2Quantile:
+    """Estimate a single quantile of a stream with the P² algorithm.
+
+    Jain & Chlamtac, "The P² algorithm for dynamic calculation of quantiles and
+    histograms without storing observations" (1985).  Five markers are kept no
+    matter how many observations are added.
+    """
+
+    __slots__ = ("p", "count", "_heights", "_positions", "_desired", "_increments")
+
+    def __init__(self, p: float):
+        self.p = p
+        self.count = 0
+        self._heights: list[float] = []
+        self._positions = [0, 1, 2, 3, 4]
+        self._desired = [0.0, 2 * p, 4 * p, 2 + 2 * p, 4.0]
+        self._increments = [0.0, p / 2, p, (1 + p) / 2, 1.0]
+
+    def add(self, x: float) -> None:
+        """Add one observation."""
+        self.count += 1
+        heights = self._heights
+        if self.count <= 5:
+            heights.append(x)
+            if self.count == 5:
+                heights.sort()
+            return
+
+        if x < heights[0]:
+            heights[0] = x
+            cell = 0
+        elif x >= heights[4]:
+            heights[4] = x
+            cell = 3
+        else:
+            cell = 0
+            while x >= heights[cell + 1]:
+                cell += 1
+
+        positions = self._positions
+        for i in range(cell + 1, 5):
+            positions[i] += 1
+        for i in range(5):
+            self._desired[i] += self._increments[i]
+
+        for i in (1, 2, 3):
+            delta = self._desired[i] - positions[i]
+            if (delta >= 1 and positions[i + 1] - positions[i] > 1) or (
+                delta <= -1 and positions[i - 1] - positions[i] < -1
+            ):
+                step = 1 if delta > 0 else -1
+                candidate = self._parabolic(i, step)
+                if not heights[i - 1] < candidate < heights[i + 1]:
+                    candidate = self._linear(i, step)
+                heights[i] = candidate
+                positions[i] += step
+
+    def value(self) -> float | None:
+        """Return the current quantile estimate, or None before the first observation."""
+        if self.count == 0:
+            return None
+        if self.count < 5:
+            ordered = sorted(self._heights)
+            return ordered[min(len(ordered) - 1, int(round(self.p * (len(ordered) - 1))))]
+        return self._heights[2]
+
+    def _parabolic(self, i: int, step: int) -> float:
+        q, n = self._heights, self._positions
+        return q[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def _linear(self, i: int, step: int) -> float:
+        q, n = self._heights, self._positions
+        return q[i] + step * (q[i + step] - q[i]) / (n[i + step] - n[i])
+
+
+class WindowedQuantile:
+    """Approximate a quantile over a sliding time window in constant memory.
+
+    Two P² estimators restart every window, staggered by half a window.  The
+    older of the two answers queries, so the estimate always covers between
+    half and one full window of recent observations.
+    """
+
+    def __init__(self, p: float, window: float, now: float):
+        self.p = p
+        self.window = window
+        self._starts = [now, now - window / 2]
+        self._estimators = [P2Quantile(p), P2Quantile(p)]
+
+    def add(self, x: float, now: float) -> None:
+        """Add one observation taken at time now."""
+        for i in (0, 1):
+            elapsed = now - self._starts[i]
+            if elapsed >= self.window:
+                self._starts[i] += self.window * (elapsed // self.window)
+                self._estimators[i] = P2Quantile(self.p)
+            self._estimators[i].add(x)
+
+    def value(self) -> float | None:
+        """Return the estimate of the older window, falling back to the younger one."""
+        older, younger = (0, 1) if self._starts[0] <= self._starts[1] else (1, 0)
+        estimate = self._estimators[older].value()
+        if estimate is None:
+            estimate = self._estimators[younger].value()
+        return estimate
+
+
+class EventRate:
+    """Exponentially weighted event rate in events per second.
+
+    Each event adds 1/tau to a value that decays with time constant tau, so a
+    steady stream of r events per second converges to r.  Reading the rate
+    applies the decay without changing the state.
+    """
+
+    __slots__ = ("tau", "_rate", "_last")
+
+    def __init__(self, tau: float):
+        self.tau = tau
+        self._rate = 0.0
+        self._last = None
+
+    def add(self, now: float) -> float:
+        """Count one event at time now and return the updated rate."""
+        self._rate = self.value(now) + 1 / self.tau
+        self._last = now
+        return self._rate
+
+    def value(self, now: float) -> float:
+        """Return the rate decayed to time now."""
+        if self._last is None:
+            return 0.0
+        return self._rate * math.exp(-(now - self._last) / self.tau)
+
+
+class ConsumptionProfile:
+    """Consumption rate and time-of-day profile of a cumulative stream.
+
+    Two constant-memory estimators fed with the increases of an energy zone:
+
+    - an exponentially weighted rate (units per hour) with time constant tau
+      seconds, like EventRate but weighted by the size of each increase;
+    - one bucket per hour of the day, holding an exponentially weighted mean
+      (weight alpha per day) of the consumption during that hour.
+
+    Callers pass the timestamp and the bucket (local hour of the day) of every
+    call.  A bucket is only learned from an hour that was observed from its
+    start, so restarts and time jumps never teach a too low value.
+    """
+
+    __slots__ = ("tau", "alpha", "profile", "_rate", "_last", "_bucket", "_sum", "_partial")
+
+    def __init__(self, tau: float, alpha: float, buckets: int = 24):
+        self.tau = tau
+        self.alpha = alpha
+        self.profile: list[float | None] = [None] * buckets
+        self._rate = 0.0
+        self._last = None
+        self._bucket = None
+        self._sum = 0.0
+        self._partial = True
+
+    def add(self, increase: float, now: float, bucket: int) -> None:
+        """Count an increase at time now."""
+        self.advance(bucket)
+        self._rate = self.rate(now) + increase * 3600 / self.tau
+        self._last = now
+        self._sum += increase
+
+    def advance(self, bucket: int) -> None:
+        """Close the running hour once bucket has moved on (also call without increases)."""
+        if bucket == self._bucket:
+            return
+        if self._bucket is not None and not self._partial:
+            learned = self.profile[self._bucket]
+            self.profile[self._bucket] = (
+                self._sum if learned is None else learned + self.alpha * (self._sum - learned)
+            )
+        # Only the hour right after an observed one is observed from its start
+        self._partial = self._bucket is None or bucket != (self._bucket + 1) % len(self.profile)
+        self._bucket = bucket
+        self._sum = 0.0
+
+    def rate(self, now: float) -> float:
+        """Return the rate (units per hour) decayed to time now."""
+        if self._last is None:
+            return 0.0
+        return self._rate * math.exp(-max(0.0, now - self._last) / self.tau)
+
+    def expected(self, bucket: int, now: float) -> float:
+        """Return the expected consumption of a whole hour: its profile, else the current rate."""
+        learned = self.profile[bucket]
+        return self.rate(now) if learned is None else learned
+
+    @property
+    def learned(self) -> int:
+        """Number of hours of the day with a learned profile."""
+        return sum(value is not None for value in self.profile)
+
+    def as_dict(self) -> dict:
+        """Return the state persisted across restarts."""
+        return {"profile": list(self.profile), "rate": self._rate, "last": self._last}
+
+    def restore(self, data: dict) -> None:
+        """Continue from a persisted state; the running hour starts over as partial."""
+        profile = data.get("profile")
+        if isinstance(profile, list) and len(profile) == len(self.profile):
+            self.profile = [float(value) if isinstance(value, (int, float)) else None for value in profile]
+        if isinstance(data.get("rate"), (int, float)) and isinstance(data.get("last"), (int, float)):
+            self._rate = float(data["rate"])
+            self._last = float(data["last"])
+
+
+class StepDetector:
+    """Detect steps (level shifts) in a stream with short-window edge detection.
+
+    The level follows the value while it changes by less than threshold.  A
+    change of at least threshold from the level starts a candidate step,
+    which is confirmed once the value stayed away from the old level for
+    window seconds (a shorter spike is ignored).  Steps up are kept in a
+    bounded list of recent unmatched steps until a step down of about the
+    same size (within match_tolerance of it) matches them, like a load
+    switching on and off again.
+    """
+
+    __slots__ = ("threshold", "window", "match_tolerance", "level", "recent", "steps", "_start", "_value")
+
+    def __init__(self, threshold: float, window: float, match_tolerance: float = 0.25, recent: int = 10):
+        self.threshold = threshold
+        self.window = window
+        self.match_tolerance = match_tolerance
+        self.level = None
+        self.recent: deque[dict] = deque(maxlen=recent)
+        self.steps = 0
+        # Candidate step: start time and latest value
+        self._start = None
+        self._value = None
+
+    @property
+    def pending_until(self) -> float | None:
+        """Time at which the candidate step is confirmed, or None without one."""
+        return None if self._start is None else self._start + self.window
+
+    def update(self, value: float | None, now: float) -> dict | None:
+        """Add a value at time now; return the step it confirmed, if any."""
+        if value is None:
+            self._start = None
+            return None
+        if self.level is None or abs(value - self.level) < self.threshold:
+            self.level = value
+            self._start = None
+            return None
+        if self._start is None:
+            self._start = now
+        self._value = value
+        return self.confirm(now)
+
+    def confirm(self, now: float) -> dict | None:
+        """Confirm the candidate step once the window has passed."""
+        if self._start is None or now - self._start < self.window:
+            return None
+        step = {
+            "step": self._value - self.level,
+            "old": self.level,
+            "new": self._value,
+            "time": self._start,
+            "matched": None,
+        }
+        self.level = self._value
+        self._start = None
+        self.steps += 1
+        if step["step"] > 0:
+            self.recent.append(step)
+            return step
+        for previous in reversed(self.recent):
+            if abs(previous["step"] + step["step"]) <= self.match_tolerance * previous["step"]:
+                self.recent.remove(previous)
+                step["matched"] = previous["time"]
+                break
+        return step
@@ -0,0 +1,220 @@
+"""Batched local time-series export of zone and untracked values.
+
+Values are only appended to an in-memory buffer on the event loop; files are
+written from the executor when the buffer is large enough or the flush
+interval elapses.  CSV files rotate daily and by size; Parquet files (only
+when pyarrow is installed) are written as one part file per flush.
+"""
+import csv
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import DOMAIN, EXPORT_FORMAT_CSV, EXPORT_FORMAT_PARQUET
+
+_LOGGER = logging.getLogger(__name__)
+
+EXPORT_DIR = "export"
+FLUSH_INTERVAL = timedelta(seconds=60)
+FLUSH_ROWS = 5000
+# Rows kept while the files cannot be written; the oldest are dropped beyond
+MAX_BUFFERED_ROWS = 20 * FLUSH_ROWS
+MAX_CSV_BYTES = 50 * 1024 * 1024
+CSV_HEADER = ["timestamp", "entity_id", "zone", "kind", "value"]
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat()
+
+
+def _day(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%d")
+
+
+def _csv_path(directory: str, day: str) -> str:
+    """Return the current CSV file of a day, rotating to a new part past MAX_CSV_BYTES."""
+    part = 0
+    while True:
+        name = f"zones_{day}.csv" if part == 0 else f"zones_{day}.{part}.csv"
+        path = os.path.join(directory, name)
+        if not os.path.exists(path) or os.path.getsize(path) < MAX_CSV_BYTES:
+            return path
+        part += 1
+
+
+def _write_csv(directory: str, rows: list[tuple]) -> None:
+    by_day: dict[str, list[tuple]] = {}
+    for row in rows:
+        by_day.setdefault(_day(row[0]), []).append(row)
+    for day, day_rows in by_day.items():
+        path = _csv_path(directory, day)
+        is_new = not os.path.exists(path)
+        with open(path, "a", newline="", encoding="utf-8") as handle:
+            writer = csv.writer(handle)
+            if is_new:
+                writer.writerow(CSV_HEADER)
+            writer.writerows((_iso(ts), *rest) for ts, *rest in day_rows)
+
+
+def _write_parquet(directory: str, rows: list[tuple]) -> bool:
+    """Write rows as one Parquet part file; return False when pyarrow is unavailable."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        return False
+    table = pa.table({
+        "timestamp": pa.array(
+            [datetime.fromtimestamp(row[0], timezone.utc) for row in rows], pa.timestamp("us", tz="UTC")
+        ),
+        "entity_id": [row[1] for row in rows],
+        "zone": [row[2] for row in rows],
+        "kind": [row[3] for row in rows],
+        "value": pa.array([row[4] for row in rows], pa.float64()),
+    })
+    pq.write_table(table, _parquet_path(directory, rows[0][0]))
+    return True
+
+
+def _parquet_path(directory: str, first: float) -> str:
+    """Return a new Parquet part file named after its first row, numbered so it never replaces one."""
+    stem = f"zones_{_day(first)}_{datetime.fromtimestamp(first, timezone.utc):%H%M%S}"
+    part = 0
+    while True:
+        path = os.path.join(directory, f"{stem}_{part:04d}.parquet")
+        if not os.path.exists(path):
+            return path
+        part += 1
+
+
+def _write_batches(directory: str, batches: dict[str, list[tuple]]) -> int:
+    """Write all buffered rows (runs in the executor); return the number of rows written.
+
+    The rows of each format are removed from batches once written, so after
+    an error batches holds exactly the rows that still have to be written.
+    """
+    os.makedirs(directory, exist_ok=True)
+    written = 0
+    for fmt, rows in batches.items():
+        if not rows:
+            continue
+        if fmt != EXPORT_FORMAT_PARQUET or not _write_parquet(directory, rows):
+            if fmt == EXPORT_FORMAT_PARQUET:
+                _LOGGER.warning("pyarrow is not installed; exporting %d rows as CSV instead", len(rows))
+            _write_csv(directory, rows)
+        batches[fmt] = []
+        written += len(rows)
+    return written
+
+
+class ZoneExporter:
+    """Buffer zone values and append them to rotating files from the executor."""
+
+    def __init__(self, hass: HomeAssistant):
+        self.hass = hass
+        self.directory = hass.config.path(DOMAIN, EXPORT_DIR)
+        self.rows_written = 0
+        self._buffers: dict[str, list[tuple]] = {EXPORT_FORMAT_CSV: [], EXPORT_FORMAT_PARQUET: []}
+        self._buffered = 0
+        # After a failed write, retry on the flush interval only
+        self._failed = False
+        self._users = 0
+        self._flush_task = None
+        self._unsubscribe_interval = None
+        self._unsubscribe_stop = None
+
+    @callback
+    def async_add(self, fmt: str, entity_id: str, zone: str, kind: str, value) -> None:
+        """Buffer one value; never touches the file system."""
+        self._buffers[fmt].append((time.time(), entity_id, zone, kind, value))
+        self._buffered += 1
+        if self._buffered >= FLUSH_ROWS and not self._failed:
+            self._async_schedule_flush()
+
+    @callback
+    def async_register(self) -> None:
+        """Register an exporting sensor; starts the periodic flush on first use."""
+        self._users += 1
+        if self._unsubscribe_interval is None:
+            self._unsubscribe_interval = async_track_time_interval(
+                self.hass, self._async_interval_flush, FLUSH_INTERVAL
+            )
+            self._unsubscribe_stop = self.hass.bus.async_listen_once(
+                EVENT_HOMEASSISTANT_STOP, self._async_on_stop
+            )
+
+    @callback
+    def async_unregister(self) -> None:
+        """Unregister an exporting sensor; flush and stop the timer after the last one."""
+        self._users -= 1
+        if self._users > 0:
+            return
+        self._async_schedule_flush()
+        if self._unsubscribe_interval:
+            self._unsubscribe_interval()
+            self._unsubscribe_interval = None
+        if self._unsubscribe_stop:
+            self._unsubscribe_stop()
+            self._unsubscribe_stop = None
+
+    @callback
+    def _async_interval_flush(self, now=None) -> None:
+        self._async_schedule_flush()
+
+    async def _async_on_stop(self, event) -> None:
+        self._unsubscribe_stop = None
+        if self._flush_task is not None:
+            await self._flush_task
+        await self.async_flush()
+
+    @callback
+    def _async_schedule_flush(self) -> None:
+        if self._flush_task is None and self._buffered:
+            self._flush_task = self.hass.async_create_background_task(
+                self._async_flush_in_background(), f"{DOMAIN} export flush"
+            )
+
+    async def _async_flush_in_background(self) -> None:
+        try:
+            await self.async_flush()
+        finally:
+            self._flush_task = None
+
+    async def async_flush(self) -> None:
+        """Hand the buffered rows to the executor; keep them for the next flush when writing fails."""
+        while self._buffered:
+            batches, buffered = self._buffers, self._buffered
+            self._buffers = {EXPORT_FORMAT_CSV: [], EXPORT_FORMAT_PARQUET: []}
+            self._buffered = 0
+            try:
+                self.rows_written += await self.hass.async_add_executor_job(
+                    _write_batches, self.directory, batches
+                )
+            except Exception:
+                # Serialization (pyarrow) errors as well as OSError
+                self.rows_written += buffered - sum(map(len, batches.values()))
+                _LOGGER.exception("Exporting zone values to '%s' failed; retrying later", self.directory)
+                self._failed = True
+                self._async_requeue(batches)
+                return
+            self._failed = False
+
+    @callback
+    def _async_requeue(self, batches: dict[str, list[tuple]]) -> None:
+        """Put rows that were not written back in front of the buffer."""
+        for fmt, rows in batches.items():
+            self._buffers[fmt][:0] = rows
+            self._buffered += len(rows)
+        if self._buffered > MAX_BUFFERED_ROWS:
+            dropped = self._buffered - MAX_BUFFERED_ROWS
+            for fmt, rows in self._buffers.items():
+                drop = min(dropped, len(rows))
+                del rows[:drop]
+                dropped -= drop
+                self._buffered -= drop
+            _LOGGER.warning("Export buffer full; dropped the oldest zone values")
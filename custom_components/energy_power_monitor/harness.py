@@ -0,0 +1,265 @@
+"""Record and replay real state_changed streams for performance checks.
+
+A recording is a gzip-compressed JSON-lines file:
+
+- line 1 is a header object: {"version": 1, "start": <iso timestamp>}
+- ["d", idx, entity_id, role] defines a compact index for an entity
+- [t_ms, idx, state] is a state change, t_ms relative to the header start
+
+Entities with role 'member' are the raw inputs of the zones and are replayed;
+entities with role 'zone' are this integration's own sensors and are only
+kept as the reference for the final totals.
+"""
+import asyncio
+import gzip
+import json
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+
+from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.core import HomeAssistant, callback, Event
+from homeassistant.helpers.event import async_track_state_change_event, async_track_time_interval
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .models import get_runtime_data
+
+_LOGGER = logging.getLogger(__name__)
+
+RECORDING_VERSION = 1
+RECORDING_DIR = "recordings"
+RECORDING_SUFFIX = ".jsonl.gz"
+FLUSH_INTERVAL = timedelta(seconds=5)
+
+
+def recording_path(hass: HomeAssistant, name: str) -> str:
+    """Return the absolute path of a recording stored under the config dir."""
+    name = os.path.basename(name)
+    if not name.endswith(RECORDING_SUFFIX):
+        name += RECORDING_SUFFIX
+    return hass.config.path(DOMAIN, RECORDING_DIR, name)
+
+
+def _append_lines(path: str, lines: list[str]) -> None:
+    """Append lines to a gzip recording (runs in the executor)."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with gzip.open(path, "at", encoding="utf-8") as handle:
+        handle.write("\n".join(lines) + "\n")
+
+
+def _load_recording(path: str):
+    """Parse a recording into (events, roles); events are (t_seconds, entity_id, state)."""
+    events = []
+    index = {}
+    roles = {}
+    with gzip.open(path, "rt", encoding="utf-8") as handle:
+        header = json.loads(handle.readline())
+        if header.get("version") != RECORDING_VERSION:
+            raise ValueError(f"Unsupported recording version: {header.get('version')}")
+        for line in handle:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record[0] == "d":
+                _, idx, entity_id, role = record
+                index[idx] = entity_id
+                roles[entity_id] = role
+            else:
+                t_ms, idx, state = record
+                events.append((t_ms / 1000, index[idx], state))
+    events.sort(key=lambda item: item[0])
+    return events, roles
+
+
+class RecordingWriter:
+    """Encode state changes into the compact recording format."""
+
+    def __init__(self, path: str, start: datetime):
+        self.path = path
+        self.start = start
+        self.event_count = 0
+        self._index: dict[str, int] = {}
+        self._lines = [json.dumps({"version": RECORDING_VERSION, "start": start.isoformat()})]
+
+    def add(self, when: datetime, entity_id: str, role: str, state: str) -> None:
+        """Buffer one state change."""
+        idx = self._index.get(entity_id)
+        if idx is None:
+            idx = self._index[entity_id] = len(self._index)
+            self._lines.append(json.dumps(["d", idx, entity_id, role]))
+        t_ms = int((when - self.start).total_seconds() * 1000)
+        self._lines.append(json.dumps([t_ms, idx, state], separators=(",", ":")))
+        self.event_count += 1
+
+    def take_lines(self) -> list[str]:
+        """Return and clear the buffered lines."""
+        lines, self._lines = self._lines, []
+        return lines
+
+
+class EventRecorder:
+    """Capture state changes of all zone members and zone sensors from a live instance."""
+
+    def __init__(self, hass: HomeAssistant, path: str):
+        self.hass = hass
+        self._roles = get_runtime_data(hass).member_roles()
+        self._writer = RecordingWriter(path, dt_util.utcnow())
+        self._unsubscribe_state_changes = None
+        self._unsubscribe_flush = None
+
+    @property
+    def path(self):
+        return self._writer.path
+
+    @callback
+    def async_start(self):
+        """Start capturing."""
+        _LOGGER.info("Recording %d entities to '%s'", len(self._roles), self.path)
+        self._unsubscribe_state_changes = async_track_state_change_event(
+            self.hass, list(self._roles), self._on_state_change
+        )
+        self._unsubscribe_flush = async_track_time_interval(
+            self.hass, self._async_flush, FLUSH_INTERVAL
+        )
+
+    async def async_stop(self):
+        """Stop capturing and flush the remaining buffer; return a summary."""
+        if self._unsubscribe_state_changes:
+            self._unsubscribe_state_changes()
+            self._unsubscribe_state_changes = None
+        if self._unsubscribe_flush:
+            self._unsubscribe_flush()
+            self._unsubscribe_flush = None
+        await self._async_flush()
+        _LOGGER.info("Recording '%s' stopped after %d events", self.path, self._writer.event_count)
+        return {"path": self.path, "events": self._writer.event_count, "entities": len(self._roles)}
+
+    @callback
+    def _on_state_change(self, event: Event):
+        new_state = event.data.get("new_state")
+        if new_state is None:
+            return
+        entity_id = event.data["entity_id"]
+        self._writer.add(new_state.last_updated, entity_id, self._roles[entity_id], new_state.state)
+
+    async def _async_flush(self, now=None):
+        lines = self._writer.take_lines()
+        if lines:
+            await self.hass.async_add_executor_job(_append_lines, self.path, lines)
+
+
+async def async_export_from_recorder(hass: HomeAssistant, path: str, start_time: datetime, end_time: datetime):
+    """Export member and zone history from the recorder database into a recording."""
+    from homeassistant.components.recorder import get_instance, history
+
+    roles = get_runtime_data(hass).member_roles()
+    if not roles:
+        return {"path": path, "events": 0, "entities": 0}
+
+    def _fetch():
+        return history.get_significant_states(
+            hass,
+            start_time,
+            end_time,
+            list(roles),
+            significant_changes_only=False,
+            no_attributes=True,
+        )
+
+    states_by_entity = await get_instance(hass).async_add_executor_job(_fetch)
+    rows = sorted(
+        (state.last_updated, entity_id, state.state)
+        for entity_id, states in states_by_entity.items()
+        for state in states
+    )
+    writer = RecordingWriter(path, start_time)
+    for when, entity_id, state in rows:
+        writer.add(max(when, start_time), entity_id, roles.get(entity_id, "member"), state)
+    if os.path.exists(path):
+        await hass.async_add_executor_job(os.remove, path)
+    await hass.async_add_executor_job(_append_lines, path, writer.take_lines())
+    _LOGGER.info("Exported %d state changes to '%s'", writer.event_count, path)
+    return {"path": path, "events": writer.event_count, "entities": len(roles)}
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+async def async_replay(hass: HomeAssistant, path: str, speed: float | None):
+    """Feed a recording's member states back into this instance and report the effect.
+
+    speed is the playback factor (1.0 = real time); None replays as fast as possible.
+    Destructive: member entities are overwritten in the state machine, so the
+    replay_recording service refuses to run while the recorder is loaded.
+    """
+    events, roles = await hass.async_add_executor_job(_load_recording, path)
+    runtime = get_runtime_data(hass)
+    before = runtime.counters()
+
+    expected = {}
+    latencies = []
+    replayed = 0
+    started = time.perf_counter()
+    for t_offset, entity_id, state in events:
+        if roles.get(entity_id) == "zone":
+            expected[entity_id] = state
+            continue
+        if speed is not None:
+            delay = t_offset / speed - (time.perf_counter() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        old_state = hass.states.get(entity_id)
+        attributes = old_state.attributes if old_state else None
+        t0 = time.perf_counter()
+        hass.states.async_set(entity_id, state, attributes)
+        # Latency covers the listeners the write schedules on the event loop
+        await asyncio.sleep(0)
+        latencies.append(time.perf_counter() - t0)
+        replayed += 1
+    duration = time.perf_counter() - started
+
+    after = runtime.counters()
+    zones = {}
+    for entity_id, counters in after.items():
+        previous = before.get(entity_id, {})
+        result = {
+            "recomputes": counters["recomputes"] - previous.get("recomputes", 0),
+            "writes": counters["writes"] - previous.get("writes", 0),
+            "final": counters["state"],
+        }
+        if entity_id in expected:
+            result["expected"] = expected[entity_id]
+            if expected[entity_id] not in (STATE_UNKNOWN, STATE_UNAVAILABLE):
+                actual = _to_float(counters["state"])
+                reference = _to_float(expected[entity_id])
+                if actual is not None and reference is not None:
+                    result["difference"] = round(actual - reference, 3)
+        zones[entity_id] = result
+
+    latencies.sort()
+    return {
+        "events": replayed,
+        "duration_s": round(duration, 3),
+        "events_per_s": round(replayed / duration, 1) if duration else None,
+        "recomputes": sum(z["recomputes"] for z in zones.values()),
+        "writes": sum(z["writes"] for z in zones.values()),
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies) * 1000, 4) if latencies else None,
+            "p50": round(_percentile(latencies, 0.5) * 1000, 4) if latencies else None,
+            "p95": round(_percentile(latencies, 0.95) * 1000, 4) if latencies else None,
+            "max": round(latencies[-1] * 1000, 4) if latencies else None,
+        },
+        "zones": zones,
+    }
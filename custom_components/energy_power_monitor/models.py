@@ -0,0 +1,346 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from asyncio import TimerHandle
+
+    from .exporter import ZoneExporter
+    from .harness import EventRecorder
+    from .rules import ZoneRuleTracker
+    from .scheduler import PeriodScheduler
+    from .sensor import EnergyandPowerMonitorSensor, SmartMeterSensor
+    from .statistics import ZoneStatistics
+    from .storage import ZoneMembershipStore
+    from .tariffs import TariffTracker
+
+# Zone value changes are pushed to websocket subscribers at most once per tick
+DELTA_TICK = 1.0
+
+# Bus events the integration listens to (state changes go through the shared
+# state trackers, counted per sensor instead)
+LISTENED_EVENTS = (
+    "entity_registry_updated",
+    "device_registry_updated",
+    "area_registry_updated",
+    "homeassistant_stop",
+)
+
+
+@dataclass
+class StartupProfile:
+    """Cold-start timings of the integration, in seconds.
+
+    Measured with time.monotonic() from async_setup: the import time of the
+    zone modules, the duration of each entry setup and, per zone, the time
+    from the start of its entry setup to its first valid state.
+    """
+
+    started: float | None = None
+    imports: dict[str, float] = field(default_factory=dict)
+    entry_started: dict[str, float] = field(default_factory=dict)
+    entry_setup: dict[str, float] = field(default_factory=dict)
+    first_state: dict[str, float] = field(default_factory=dict)
+    last_first_state: float | None = None
+
+    def entry_setup_started(self, entry_id: str) -> None:
+        """Note the start of async_setup_entry; only the first setup counts."""
+        self.entry_started.setdefault(entry_id, time.monotonic())
+
+    def entry_setup_done(self, entry_id: str) -> None:
+        """Note the end of async_setup_entry."""
+        if entry_id not in self.entry_setup and entry_id in self.entry_started:
+            self.entry_setup[entry_id] = time.monotonic() - self.entry_started[entry_id]
+
+    def zone_valid(self, entity_id: str, entry_id: str) -> None:
+        """Note the first valid state of a zone or untracked sensor."""
+        if entity_id in self.first_state or entry_id not in self.entry_started:
+            return
+        now = time.monotonic()
+        self.first_state[entity_id] = now - self.entry_started[entry_id]
+        self.last_first_state = now
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the profile in milliseconds."""
+
+        def ms(seconds):
+            return None if seconds is None else round(seconds * 1000, 2)
+
+        return {
+            "imports_ms": {module: ms(seconds) for module, seconds in self.imports.items()},
+            "entry_setup_ms": {entry_id: ms(seconds) for entry_id, seconds in self.entry_setup.items()},
+            "first_valid_state_ms": {entity_id: ms(seconds) for entity_id, seconds in self.first_state.items()},
+            # From async_setup until the last zone reported its first valid state
+            "total_ms": ms(
+                self.last_first_state - self.started
+                if self.started is not None and self.last_first_state is not None
+                else None
+            ),
+        }
+
+
+@dataclass
+class EnergyPowerMonitorData:
+    """In-memory state shared by every zone of the integration.
+
+    Zone and untracked sensors register themselves here while they are added
+    to Home Assistant, keyed by entity_id, so integration-wide features can
+    reach them without going through the state machine.
+    """
+
+    hass: HomeAssistant
+    zones: dict[str, EnergyandPowerMonitorSensor] = field(default_factory=dict)
+    untracked: dict[str, SmartMeterSensor] = field(default_factory=dict)
+    recorder: EventRecorder | None = None
+    exporter: ZoneExporter | None = None
+    membership: ZoneMembershipStore | None = None
+    rules: ZoneRuleTracker | None = None
+    scheduler: PeriodScheduler | None = None
+    statistics: ZoneStatistics | None = None
+    tariffs: TariffTracker | None = None
+    startup: StartupProfile = field(default_factory=StartupProfile)
+    _delta_listeners: list[tuple[Callable[[dict[str, Any]], None], dict[str, Any]]] = field(default_factory=list)
+    _pending_deltas: dict[str, Any] = field(default_factory=dict)
+    _delta_flush: TimerHandle | None = None
+    _increase_listeners: dict[str, list[Callable[[float], None]]] = field(default_factory=dict)
+    # Increases published per energy zone since it started, for late subscribers
+    _increase_totals: dict[str, float] = field(default_factory=dict)
+    _value_listeners: dict[str, list[Callable[[], None]]] = field(default_factory=dict)
+    # Zone entity_id -> entity_id of the zone including it; None until needed
+    _parents: dict[str, str] | None = None
+
+    def member_roles(self) -> dict[str, str]:
+        """Return {entity_id: role} for every entity feeding or produced by a zone.
+
+        'member' entities are the raw inputs (tracked sensors, smart meters);
+        'zone' entities are produced by this integration and are recomputed,
+        never replayed.
+        """
+        roles: dict[str, str] = {}
+        for sensor in self.zones.values():
+            for entity_id in sensor.tracked_entities:
+                roles.setdefault(entity_id, "member")
+        for sensor in self.untracked.values():
+            roles.setdefault(sensor.smart_meter_device, "member")
+        for entity_id in (*self.zones, *self.untracked):
+            roles[entity_id] = "zone"
+        return roles
+
+    def counters(self) -> dict[str, dict[str, Any]]:
+        """Return the recompute/write counters of every registered sensor."""
+        return {
+            entity_id: sensor.counters()
+            for entity_id, sensor in (*self.zones.items(), *self.untracked.items())
+        }
+
+    def listener_counts(self) -> dict[str, int]:
+        """Return the number of live listeners, to spot leaks across reloads."""
+        bus = self.hass.bus.async_listeners()
+        return {
+            **{f"bus_{event_type}": bus.get(event_type, 0) for event_type in LISTENED_EVENTS},
+            "sensor_subscriptions": sum(
+                sensor.subscriptions() for sensor in (*self.zones.values(), *self.untracked.values())
+            ),
+            "increase_listeners": sum(len(listeners) for listeners in self._increase_listeners.values()),
+            "value_listeners": sum(len(listeners) for listeners in self._value_listeners.values()),
+            "membership_listeners": self.membership.listener_count() if self.membership else 0,
+            "rule_zones": self.rules.zone_count if self.rules else 0,
+            "scheduled_periods": self.scheduler.registration_count if self.scheduler else 0,
+            "tariff_listeners": self.tariffs.listener_count if self.tariffs else 0,
+            "entry_update_listeners": sum(
+                len(entry.update_listeners) for entry in self.hass.config_entries.async_entries(DOMAIN)
+            ),
+        }
+
+    def get_exporter(self) -> ZoneExporter:
+        """Return the shared time-series exporter, creating it on first use."""
+        if self.exporter is None:
+            from .exporter import ZoneExporter
+
+            self.exporter = ZoneExporter(self.hass)
+        return self.exporter
+
+    def get_rule_tracker(self) -> ZoneRuleTracker:
+        """Return the shared rule membership tracker, creating it on first use."""
+        if self.rules is None:
+            from .rules import ZoneRuleTracker
+
+            self.rules = ZoneRuleTracker(self.hass)
+        return self.rules
+
+    def get_scheduler(self) -> PeriodScheduler:
+        """Return the shared period scheduler, creating it on first use."""
+        if self.scheduler is None:
+            from .scheduler import PeriodScheduler
+
+            self.scheduler = PeriodScheduler(self.hass)
+        return self.scheduler
+
+    def get_statistics(self) -> ZoneStatistics:
+        """Return the shared long-term statistics collector, creating it on first use."""
+        if self.statistics is None:
+            from .statistics import ZoneStatistics
+
+            self.statistics = ZoneStatistics(self.hass)
+        return self.statistics
+
+    def get_tariffs(self) -> TariffTracker:
+        """Return the shared price entity tracker, creating it on first use."""
+        if self.tariffs is None:
+            from .tariffs import TariffTracker
+
+            self.tariffs = TariffTracker(self.hass)
+        return self.tariffs
+
+    # --- Energy increases ---
+
+    @callback
+    def async_listen_increase(
+        self, entity_id: str, listener: Callable[[float], None], replay: bool = False
+    ) -> CALLBACK_TYPE:
+        """Call listener with every consumption increase of an energy zone.
+
+        Works before the zone itself is set up, so parents and period sensors
+        do not depend on the order in which zones start.  With replay, the
+        listener first gets everything the zone published since it started,
+        so sensors added after the zone do not miss its first increases.
+        """
+        unsubscribe = _async_listen(self._increase_listeners, entity_id, listener)
+        if replay and self._increase_totals.get(entity_id):
+            listener(self._increase_totals[entity_id])
+        return unsubscribe
+
+    @callback
+    def async_increase(self, entity_id: str, increase: float) -> None:
+        """Publish a consumption increase of an energy zone."""
+        self._increase_totals[entity_id] = self._increase_totals.get(entity_id, 0.0) + increase
+        for listener in list(self._increase_listeners.get(entity_id, ())):
+            listener(increase)
+
+    @callback
+    def async_reset_increases(self, entity_id: str) -> None:
+        """Forget the published increases of a zone that (re)starts or is removed."""
+        self._increase_totals.pop(entity_id, None)
+
+    # --- Zone values ---
+
+    @callback
+    def async_listen_value(self, entity_id: str, listener: Callable[[], None]) -> CALLBACK_TYPE:
+        """Call listener after every state write of a zone or untracked sensor."""
+        return _async_listen(self._value_listeners, entity_id, listener)
+
+    # --- Zone tree snapshot / deltas ---
+
+    def parent_of(self, entity_id: str) -> EnergyandPowerMonitorSensor | None:
+        """Return the zone that includes a zone (the first by entity_id, if several do)."""
+        if self._parents is None:
+            self._parents = {}
+            for parent_id in sorted(self.zones, reverse=True):
+                for child_id in self.zones[parent_id].tracked_entities:
+                    if child_id in self.zones:
+                        self._parents[child_id] = parent_id
+        parent_id = self._parents.get(entity_id)
+        return self.zones.get(parent_id) if parent_id else None
+
+    @callback
+    def async_zone_tree_changed(self) -> None:
+        """Drop the parent index after a zone was added, removed or changed its members."""
+        self._parents = None
+
+    def zone_tree(self) -> dict[str, Any]:
+        """Return the complete zone tree with current values from memory."""
+        untracked_by_zone = {
+            sensor.zone_entity_id: entity_id for entity_id, sensor in self.untracked.items()
+        }
+        zones = {}
+        children = set()
+        for entity_id, sensor in self.zones.items():
+            node = sensor.snapshot()
+            node["sub_zones"] = [e for e in sensor.tracked_entities if e in self.zones]
+            node["untracked"] = untracked_by_zone.get(entity_id)
+            children.update(node["sub_zones"])
+            zones[entity_id] = node
+        return {
+            "zones": zones,
+            "untracked": {entity_id: sensor.snapshot() for entity_id, sensor in self.untracked.items()},
+            "roots": sorted(entity_id for entity_id in zones if entity_id not in children),
+        }
+
+    def zone_values(self) -> dict[str, Any]:
+        """Return {entity_id: value} of every zone and untracked sensor."""
+        return {
+            entity_id: sensor.state for entity_id, sensor in (*self.zones.items(), *self.untracked.items())
+        }
+
+    @callback
+    def async_subscribe_deltas(self, listener: Callable[[dict[str, Any]], None]) -> CALLBACK_TYPE:
+        """Call listener with {entity_id: value} of changed zones once per tick.
+
+        Every subscriber keeps its own baseline, starting at the current
+        values (the snapshot it is sent), so a new subscriber never causes a
+        resend to the others.
+        """
+        subscriber = (listener, self.zone_values())
+        self._delta_listeners.append(subscriber)
+
+        @callback
+        def unsubscribe() -> None:
+            self._delta_listeners.remove(subscriber)
+            if not self._delta_listeners:
+                self._pending_deltas.clear()
+
+        return unsubscribe
+
+    @callback
+    def async_value_changed(self, entity_id: str, value: Any) -> None:
+        """Notify the value listeners and record the value for the next delta tick."""
+        for listener in list(self._value_listeners.get(entity_id, ())):
+            listener()
+        if not self._delta_listeners:
+            return
+        self._pending_deltas[entity_id] = value
+        if self._delta_flush is None:
+            self._delta_flush = self.hass.loop.call_later(DELTA_TICK, self._async_flush_deltas)
+
+    @callback
+    def _async_flush_deltas(self) -> None:
+        self._delta_flush = None
+        pending, self._pending_deltas = self._pending_deltas, {}
+        for listener, published in list(self._delta_listeners):
+            deltas = {
+                entity_id: value
+                for entity_id, value in pending.items()
+                if published.get(entity_id, published) != value
+            }
+            if deltas:
+                published.update(deltas)
+                listener(deltas)
+
+
+@callback
+def _async_listen(registry: dict[str, list[Callable]], entity_id: str, listener: Callable) -> CALLBACK_TYPE:
+    """Add listener to the listeners of entity_id; return the unsubscribe callback."""
+    listeners = registry.setdefault(entity_id, [])
+    listeners.append(listener)
+
+    @callback
+    def unsubscribe() -> None:
+        listeners.remove(listener)
+        if not listeners:
+            registry.pop(entity_id, None)
+
+    return unsubscribe
+
+
+def get_runtime_data(hass: HomeAssistant) -> EnergyPowerMonitorData:
+    """Return the shared runtime data, creating it on first use."""
+    if DOMAIN not in hass.data:
+        hass.data[DOMAIN] = EnergyPowerMonitorData(hass)
+    return hass.data[DOMAIN]
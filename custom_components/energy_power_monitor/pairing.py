@@ -0,0 +1,98 @@
+"""Power/energy pairing for zones of both types.
+
+A zone of both types stores each device once, by either of its sensors.  The
+power and energy sensors of the zone pair every stored entity with the sensor
+of their own type on the same device, looked up through the device index of
+the entity registry (no registry scan).  Sensors of this integration pair
+through their unique IDs, which only differ in the type.
+"""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+from .const import (
+    DOMAIN,
+    ENTITY_TYPE_POWER,
+    ENTITY_TYPE_ENERGY,
+    CONF_ENTITIES,
+    CONF_INTEGRATION_ROOMS,
+    CONF_SMART_METER_DEVICE,
+    is_smart_meter_selected,
+)
+
+# Preferred state class when a device has several sensors of a type
+PREFERRED_STATE_CLASS = {ENTITY_TYPE_POWER: "measurement", ENTITY_TYPE_ENERGY: "total_increasing"}
+
+
+def entity_kind(entity: er.RegistryEntry) -> str | None:
+    """Return power or energy for a registry entry, by device class or entity ID suffix."""
+    device_class = entity.device_class or entity.original_device_class
+    if device_class:
+        return device_class if device_class in PREFERRED_STATE_CLASS else None
+    for kind in PREFERRED_STATE_CLASS:
+        if entity.entity_id.endswith(f"_{kind}"):
+            return kind
+    return None
+
+
+def paired_entity(entity_registry: er.EntityRegistry, entity_id: str, entity_type: str) -> str | None:
+    """Return the sensor of entity_type belonging to the same device as entity_id."""
+    entity = entity_registry.async_get(entity_id)
+    if entity is None:
+        # Not registered: only usable when it already is of the right type
+        return entity_id if entity_id.endswith(f"_{entity_type}") else None
+    kind = entity_kind(entity)
+    if kind == entity_type:
+        return entity_id
+    if kind is None:
+        return None
+    if entity.platform == DOMAIN:
+        if not entity.unique_id.endswith(f"_{kind}"):
+            return None
+        return entity_registry.async_get_entity_id(
+            entity.domain, DOMAIN, f"{entity.unique_id[:-len(kind)]}{entity_type}"
+        )
+    if entity.device_id is None:
+        return None
+    return device_sensor(entity_registry, entity.device_id, entity_type)
+
+
+def device_sensor(entity_registry: er.EntityRegistry, device_id: str, *entity_types: str) -> str | None:
+    """Return the sensor of the first of entity_types that the device has."""
+    entities = er.async_entries_for_device(entity_registry, device_id)
+    for entity_type in entity_types:
+        candidates = [
+            entity
+            for entity in entities
+            if entity.domain == "sensor" and entity.platform != DOMAIN and entity_kind(entity) == entity_type
+        ]
+        if candidates:
+            preferred = PREFERRED_STATE_CLASS[entity_type]
+            return min(
+                candidates,
+                key=lambda entity: ((entity.capabilities or {}).get("state_class") != preferred, entity.entity_id),
+            ).entity_id
+    return None
+
+
+def paired_entities(entity_registry: er.EntityRegistry, entity_ids, entity_type: str) -> list[str]:
+    """Pair every entity; devices without a sensor of entity_type are left out."""
+    paired = (paired_entity(entity_registry, entity_id, entity_type) for entity_id in entity_ids)
+    return list(dict.fromkeys(entity_id for entity_id in paired if entity_id))
+
+
+def paired_membership(hass: HomeAssistant, membership: dict[str, Any], entity_type: str) -> dict[str, Any]:
+    """Return the membership of a zone of both types as seen by its entity_type sensors."""
+    entity_registry = er.async_get(hass)
+    meter = membership[CONF_SMART_METER_DEVICE]
+    if is_smart_meter_selected(meter):
+        meter = paired_entity(entity_registry, meter, entity_type) or ""
+    return {
+        **membership,
+        CONF_ENTITIES: paired_entities(entity_registry, membership[CONF_ENTITIES], entity_type),
+        CONF_INTEGRATION_ROOMS: paired_entities(entity_registry, membership[CONF_INTEGRATION_ROOMS], entity_type),
+        CONF_SMART_METER_DEVICE: meter,
+    }
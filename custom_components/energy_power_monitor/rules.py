@@ -0,0 +1,285 @@
+"""Rule-based zone membership.
+
+A zone may select members by rules instead of (or in addition to) a fixed
+list: area, floor, label, device class, integration or an entity ID pattern.
+Categories are combined with AND, the values within a category with OR.
+
+Rules are compiled once per zone.  A single ZoneRuleTracker shared by all
+zones listens to the entity, device and area registries and re-evaluates only
+the entities an event touches, so rule zones stay current without rescans.
+New or changed rules are evaluated against an index of candidate sensors
+that the tracker keeps current, not the whole registry.
+"""
+from __future__ import annotations
+
+import fnmatch
+import logging
+import re
+from collections.abc import Callable
+
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers import area_registry as ar
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+
+from .const import (
+    DOMAIN,
+    CONF_RULE_AREAS,
+    CONF_RULE_FLOORS,
+    CONF_RULE_LABELS,
+    CONF_RULE_DEVICE_CLASSES,
+    CONF_RULE_INTEGRATIONS,
+    CONF_RULE_PATTERNS,
+    RULE_KEYS,
+    RULE_REGEX_PREFIX,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def has_rules(rules: dict | None) -> bool:
+    """Return True when at least one rule category has a value."""
+    return bool(rules) and any(rules.get(key) for key in RULE_KEYS)
+
+
+def compile_patterns(patterns) -> re.Pattern | None:
+    """Combine entity ID globs and 're:' regexes into one pattern; raises re.error."""
+    parts = []
+    for pattern in patterns or ():
+        pattern = pattern.strip()
+        if not pattern:
+            continue
+        if pattern.startswith(RULE_REGEX_PREFIX):
+            parts.append(pattern[len(RULE_REGEX_PREFIX):])
+        else:
+            parts.append(fnmatch.translate(pattern))
+    if not parts:
+        return None
+    return re.compile("|".join(f"(?:{part})" for part in parts))
+
+
+class CompiledRules:
+    """The rules of one zone, prepared for cheap per-entity evaluation."""
+
+    __slots__ = ("entity_type", "areas", "floors", "labels", "device_classes", "integrations", "pattern")
+
+    def __init__(self, rules: dict, entity_type: str):
+        self.entity_type = entity_type
+        self.areas = frozenset(rules.get(CONF_RULE_AREAS) or ())
+        self.floors = frozenset(rules.get(CONF_RULE_FLOORS) or ())
+        self.labels = frozenset(rules.get(CONF_RULE_LABELS) or ())
+        self.device_classes = frozenset(rules.get(CONF_RULE_DEVICE_CLASSES) or ())
+        self.integrations = frozenset(rules.get(CONF_RULE_INTEGRATIONS) or ())
+        self.pattern = compile_patterns(rules.get(CONF_RULE_PATTERNS))
+
+    @property
+    def uses_devices(self) -> bool:
+        """True when a device change (area, labels) can change the result."""
+        return bool(self.areas or self.floors or self.labels)
+
+    def matches(self, entity: er.RegistryEntry, device: dr.DeviceEntry | None, floor_of: Callable) -> bool:
+        """Return True when entity is a member of the zone."""
+        if entity.domain != "sensor" or entity.platform == DOMAIN or entity.disabled_by:
+            return False
+        device_class = entity.device_class or entity.original_device_class
+        if self.device_classes:
+            # An explicit device class rule replaces the zone type check
+            if device_class not in self.device_classes:
+                return False
+        elif device_class:
+            if device_class != self.entity_type:
+                return False
+        elif not entity.entity_id.endswith(f"_{self.entity_type}"):
+            return False
+        if self.integrations and entity.platform not in self.integrations:
+            return False
+        if self.pattern is not None and not self.pattern.fullmatch(entity.entity_id):
+            return False
+        if self.areas or self.floors:
+            area_id = entity.area_id or (device.area_id if device else None)
+            if self.areas and area_id not in self.areas:
+                return False
+            if self.floors and floor_of(area_id) not in self.floors:
+                return False
+        if self.labels:
+            labels = set(entity.labels)
+            if device:
+                labels.update(device.labels)
+            if not self.labels & labels:
+                return False
+        return True
+
+
+class _RuleZone:
+    __slots__ = ("rules", "matched", "on_change")
+
+    def __init__(self, rules: CompiledRules, on_change: Callable[[set[str]], None]):
+        self.rules = rules
+        self.matched: set[str] = set()
+        self.on_change = on_change
+
+
+class ZoneRuleTracker:
+    """Keep the rule-matched members of every rule zone current."""
+
+    def __init__(self, hass: HomeAssistant):
+        self.hass = hass
+        self.full_scans = 0
+        self.evaluations = 0
+        self._zones: list[_RuleZone] = []
+        self._unsubscribes: list[CALLBACK_TYPE] = []
+        # Registry entries that can match any rule (sensors of other
+        # integrations), kept current by the registry events while tracking
+        self._candidates: dict[str, er.RegistryEntry] | None = None
+
+    @callback
+    def async_track(
+        self, rules: CompiledRules, on_change: Callable[[set[str]], None]
+    ) -> tuple[set[str], CALLBACK_TYPE]:
+        """Start tracking a zone; return its current members and an unsubscribe callback.
+
+        on_change is called with the complete new member set whenever it changes.
+        """
+        zone = _RuleZone(rules, on_change)
+        zone.matched = self._scan(rules)
+        self._zones.append(zone)
+        if not self._unsubscribes:
+            self._subscribe()
+
+        @callback
+        def unsubscribe() -> None:
+            self._zones.remove(zone)
+            if not self._zones:
+                for unsub in self._unsubscribes:
+                    unsub()
+                self._unsubscribes = []
+                self._candidates = None
+
+        return set(zone.matched), unsubscribe
+
+    @property
+    def zone_count(self) -> int:
+        """Number of zones currently tracked."""
+        return len(self._zones)
+
+    # --- Evaluation ---
+
+    def _floor_of(self, area_id: str | None) -> str | None:
+        if area_id is None:
+            return None
+        area = ar.async_get(self.hass).async_get_area(area_id)
+        return area.floor_id if area else None
+
+    def _device(self, entity: er.RegistryEntry) -> dr.DeviceEntry | None:
+        if not entity.device_id:
+            return None
+        return dr.async_get(self.hass).async_get(entity.device_id)
+
+    @staticmethod
+    def _is_candidate(entity: er.RegistryEntry) -> bool:
+        return entity.domain == "sensor" and entity.platform != DOMAIN
+
+    def _scan(self, rules: CompiledRules) -> set[str]:
+        """Evaluate the candidate entities once for a newly compiled zone.
+
+        The candidate index is built from the entity registry by the first
+        scan only; later zones (and rule changes) reuse it.
+        """
+        if self._candidates is None:
+            self.full_scans += 1
+            self._candidates = {
+                entity.entity_id: entity
+                for entity in er.async_get(self.hass).entities.values()
+                if self._is_candidate(entity)
+            }
+        return {
+            entity_id
+            for entity_id, entity in self._candidates.items()
+            if rules.matches(entity, self._device(entity), self._floor_of)
+        }
+
+    def _update_candidate(self, entity_id: str, removed: str | None = None) -> None:
+        """Refresh the index entry of an entity after a registry change."""
+        if self._candidates is None:
+            return
+        if removed:
+            self._candidates.pop(removed, None)
+        entity = er.async_get(self.hass).async_get(entity_id)
+        if entity is not None and self._is_candidate(entity):
+            self._candidates[entity_id] = entity
+        else:
+            self._candidates.pop(entity_id, None)
+
+    @callback
+    def _async_evaluate(self, entity_ids, removed=()) -> None:
+        """Re-evaluate only the given entities for every zone."""
+        entity_registry = er.async_get(self.hass)
+        changed = []
+        for zone in self._zones:
+            dirty = False
+            for entity_id in removed:
+                if entity_id in zone.matched:
+                    zone.matched.discard(entity_id)
+                    dirty = True
+            for entity_id in entity_ids:
+                self.evaluations += 1
+                entity = entity_registry.async_get(entity_id)
+                member = entity is not None and zone.rules.matches(
+                    entity, self._device(entity), self._floor_of
+                )
+                if member and entity_id not in zone.matched:
+                    zone.matched.add(entity_id)
+                    dirty = True
+                elif not member and entity_id in zone.matched:
+                    zone.matched.discard(entity_id)
+                    dirty = True
+            if dirty:
+                changed.append(zone)
+        for zone in changed:
+            zone.on_change(set(zone.matched))
+
+    # --- Registry events ---
+
+    def _subscribe(self) -> None:
+        bus = self.hass.bus
+        self._unsubscribes = [
+            bus.async_listen(er.EVENT_ENTITY_REGISTRY_UPDATED, self._async_entity_updated),
+            bus.async_listen(dr.EVENT_DEVICE_REGISTRY_UPDATED, self._async_device_updated),
+            bus.async_listen(ar.EVENT_AREA_REGISTRY_UPDATED, self._async_area_updated),
+        ]
+
+    @callback
+    def _async_entity_updated(self, event: Event) -> None:
+        entity_id = event.data["entity_id"]
+        old_entity_id = event.data.get("changes", {}).get("entity_id")
+        self._update_candidate(entity_id, removed=old_entity_id)
+        if event.data["action"] == "remove":
+            self._async_evaluate((), removed=(entity_id,))
+            return
+        self._async_evaluate((entity_id,), removed=(old_entity_id,) if old_entity_id else ())
+
+    @callback
+    def _async_device_updated(self, event: Event) -> None:
+        if event.data["action"] == "remove":
+            return  # The entity registry reports the affected entities itself
+        if not any(zone.rules.uses_devices for zone in self._zones):
+            return
+        entities = er.async_entries_for_device(
+            er.async_get(self.hass), event.data["device_id"], include_disabled_entities=True
+        )
+        self._async_evaluate([entity.entity_id for entity in entities])
+
+    @callback
+    def _async_area_updated(self, event: Event) -> None:
+        # Only the floor of an area can change a rule result
+        if event.data["action"] != "update" or not any(zone.rules.floors for zone in self._zones):
+            return
+        area_id = event.data["area_id"]
+        entity_registry = er.async_get(self.hass)
+        entity_ids = {entity.entity_id for entity in er.async_entries_for_area(entity_registry, area_id)}
+        for device in dr.async_entries_for_area(dr.async_get(self.hass), area_id):
+            entity_ids.update(
+                entity.entity_id
+                for entity in er.async_entries_for_device(entity_registry, device.id)
+            )
+        self._async_evaluate(entity_ids)
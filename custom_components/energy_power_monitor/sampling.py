@@ -0,0 +1,120 @@
+from .const import (
+    SAMPLING_PASS_THROUGH,
+    SAMPLING_MIN_INTERVAL,
+    SAMPLING_TIME_WEIGHTED,
+    SAMPLING_CHANGE_THRESHOLD,
+)
+
+
+class MemberSampler:
+    """Reduce the raw updates of one high-frequency member before zone aggregation.
+
+    Pure bookkeeping: callers pass in a monotonic timestamp and get back whether
+    the zone should recompute now.  When an update is held back, pending is set
+    and next_flush tells the caller when flush() should be called so the last
+    value is never lost.
+
+    Policies:
+    - pass_through:     every update is forwarded.
+    - min_interval:     at most one forwarded update per interval (latest value wins).
+    - time_weighted:    the time-weighted mean over each interval window is forwarded,
+                        which preserves the energy of a power signal.  Cumulative
+                        members (energy counters) must not be averaged and fall back
+                        to min_interval.
+    - change_threshold: an update is forwarded only when it differs from the last
+                        forwarded value by at least threshold.
+    """
+
+    def __init__(self, policy, interval=0.0, threshold=0.0, cumulative=False):
+        if policy == SAMPLING_TIME_WEIGHTED and cumulative:
+            policy = SAMPLING_MIN_INTERVAL
+        self.policy = policy
+        self.interval = max(0.0, float(interval or 0))
+        self.threshold = max(0.0, float(threshold or 0))
+        self.value = None
+        self.has_value = False
+        self.pending = False
+        self.raw_updates = 0
+        self.forwarded_updates = 0
+        self._last_emit = None
+        self._latest = None
+        # time_weighted window state
+        self._window_start = None
+        self._integral = 0.0
+        self._last_time = None
+
+    @property
+    def next_flush(self):
+        """Monotonic time at which a held-back update must be flushed, or None."""
+        if not self.pending or self._last_emit is None:
+            return None
+        if self.policy == SAMPLING_TIME_WEIGHTED:
+            return self._window_start + self.interval
+        return self._last_emit + self.interval
+
+    def update(self, value, now):
+        """Feed a raw value (None = invalid); return True when the zone should recompute."""
+        self.raw_updates += 1
+        if value is None or self.value is None or self.policy == SAMPLING_PASS_THROUGH:
+            self._reset_window(value, now)
+            return self._emit(value, now)
+
+        if self.policy == SAMPLING_CHANGE_THRESHOLD:
+            if abs(value - self.value) >= self.threshold:
+                return self._emit(value, now)
+            return False
+
+        if self.policy == SAMPLING_TIME_WEIGHTED:
+            self._integrate(now)
+            self._latest = value
+            if now - self._window_start >= self.interval:
+                return self._emit_window_mean(now)
+            self.pending = True
+            return False
+
+        # min_interval
+        self._latest = value
+        if now - self._last_emit >= self.interval:
+            return self._emit(value, now)
+        self.pending = True
+        return False
+
+    def flush(self, now):
+        """Publish a held-back update; return True when the zone should recompute."""
+        if not self.pending:
+            return False
+        if self.policy == SAMPLING_TIME_WEIGHTED:
+            self._integrate(now)
+            self._emit_window_mean(now)
+            # A quiet member converges to its latest value after one more window
+            self.pending = self.value != self._latest
+            return True
+        return self._emit(self._latest, now)
+
+    # --- Internal helpers ---
+
+    def _emit(self, value, now):
+        self.value = value
+        self.has_value = True
+        self.pending = False
+        self._last_emit = now
+        self.forwarded_updates += 1
+        return True
+
+    def _reset_window(self, value, now):
+        self._window_start = now
+        self._integral = 0.0
+        self._last_time = now
+        self._latest = value
+
+    def _integrate(self, now):
+        if self._latest is not None:
+            self._integral += self._latest * (now - self._last_time)
+        self._last_time = now
+
+    def _emit_window_mean(self, now):
+        elapsed = now - self._window_start
+        mean = self._integral / elapsed if elapsed > 0 else self._latest
+        latest = self._latest
+        self._reset_window(latest, now)
+        return self._emit(round(mean, 3), now)
@@ -0,0 +1,146 @@
+"""One integration-wide timer for period boundaries (hourly, daily, weekly, monthly, cron).
+
+Every period sensor registers its period here instead of owning a timer.  The
+scheduler keeps a single point-in-time listener for the earliest boundary and,
+when it fires, resets every registration that is due in one batch.
+"""
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable
+from datetime import datetime, timedelta
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.util import dt as dt_util
+
+from .const import PERIOD_HOURLY, PERIOD_DAILY, PERIOD_WEEKLY, PERIOD_MONTHLY, PERIOD_CRON
+
+_LOGGER = logging.getLogger(__name__)
+
+ResetCallback = Callable[[datetime, datetime], None]
+
+
+def validate_cron(expression: str) -> None:
+    """Raise ImportError when cronsim is missing, ValueError for an invalid expression."""
+    from cronsim import CronSim, CronSimError
+
+    try:
+        CronSim(expression, dt_util.now())
+    except CronSimError as exc:
+        raise ValueError(str(exc)) from exc
+
+
+def next_period_start(period: str, now: datetime, cron: str | None = None) -> datetime:
+    """Return the first period boundary after now (as an aware UTC datetime)."""
+    if period == PERIOD_HOURLY:
+        return dt_util.as_utc(now).replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+    local = dt_util.as_local(now)
+    if period == PERIOD_DAILY:
+        start = dt_util.start_of_local_day(local.date() + timedelta(days=1))
+    elif period == PERIOD_WEEKLY:
+        start = dt_util.start_of_local_day(local.date() + timedelta(days=7 - local.weekday()))
+    elif period == PERIOD_MONTHLY:
+        start = dt_util.start_of_local_day((local.date().replace(day=1) + timedelta(days=32)).replace(day=1))
+    elif period == PERIOD_CRON:
+        from cronsim import CronSim
+
+        start = next(CronSim(cron, local))
+    else:
+        raise ValueError(f"Unknown period: {period}")
+    return dt_util.as_utc(start)
+
+
+def last_period_start(period: str, now: datetime, cron: str | None = None) -> datetime:
+    """Return the last period boundary at or before now (as an aware UTC datetime)."""
+    if period == PERIOD_HOURLY:
+        return dt_util.as_utc(now).replace(minute=0, second=0, microsecond=0)
+    local = dt_util.as_local(now)
+    if period == PERIOD_DAILY:
+        start = dt_util.start_of_local_day(local.date())
+    elif period == PERIOD_WEEKLY:
+        start = dt_util.start_of_local_day(local.date() - timedelta(days=local.weekday()))
+    elif period == PERIOD_MONTHLY:
+        start = dt_util.start_of_local_day(local.date().replace(day=1))
+    elif period == PERIOD_CRON:
+        from cronsim import CronSim
+
+        # Searching backwards is strictly before the start; include now itself
+        start = next(CronSim(cron, local.replace(microsecond=0) + timedelta(seconds=1), reverse=True))
+    else:
+        raise ValueError(f"Unknown period: {period}")
+    return dt_util.as_utc(start)
+
+
+class _Registration:
+    __slots__ = ("period", "cron", "reset", "next")
+
+    def __init__(self, period: str, cron: str | None, reset: ResetCallback, next_start: datetime):
+        self.period = period
+        self.cron = cron
+        self.reset = reset
+        self.next = next_start
+
+
+class PeriodScheduler:
+    """Fire period resets for all zones from a single timer."""
+
+    def __init__(self, hass: HomeAssistant):
+        self.hass = hass
+        self.batches = 0
+        self._registrations: list[_Registration] = []
+        self._unsubscribe_timer = None
+        self._timer_at = None
+
+    @callback
+    def async_register(self, period: str, reset: ResetCallback, cron: str | None = None) -> tuple[datetime, CALLBACK_TYPE]:
+        """Call reset(boundary, next_boundary) at every start of period.
+
+        Returns the next boundary and an unsubscribe callback.
+        """
+        registration = _Registration(period, cron, reset, next_period_start(period, dt_util.utcnow(), cron))
+        self._registrations.append(registration)
+        self._async_schedule()
+
+        @callback
+        def unsubscribe() -> None:
+            self._registrations.remove(registration)
+            self._async_schedule()
+
+        return registration.next, unsubscribe
+
+    def last_boundary(self, period: str, cron: str | None = None) -> datetime:
+        """Return the start of the period that is running now."""
+        return last_period_start(period, dt_util.utcnow(), cron)
+
+    @property
+    def registration_count(self) -> int:
+        """Number of registered periods."""
+        return len(self._registrations)
+
+    @callback
+    def _async_schedule(self) -> None:
+        """Point the single timer at the earliest boundary."""
+        earliest = min((r.next for r in self._registrations), default=None)
+        if earliest == self._timer_at:
+            return
+        if self._unsubscribe_timer:
+            self._unsubscribe_timer()
+            self._unsubscribe_timer = None
+        self._timer_at = earliest
+        if earliest is not None:
+            self._unsubscribe_timer = async_track_point_in_utc_time(self.hass, self._async_fire, earliest)
+
+    @callback
+    def _async_fire(self, now: datetime) -> None:
+        self._unsubscribe_timer = None
+        self._timer_at = None
+        now = dt_util.utcnow()
+        due = [r for r in self._registrations if r.next <= now]
+        self.batches += 1
+        _LOGGER.debug("Period boundary: resetting %d sensors", len(due))
+        for registration in due:
+            boundary = registration.next
+            registration.next = next_period_start(registration.period, now, registration.cron)
+            registration.reset(boundary, registration.next)
+        self._async_schedule()
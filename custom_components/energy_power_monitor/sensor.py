@@ -1,25 +1,95 @@
 import logging
+import re
+import time
+from datetime import timedelta
+from functools import partial
 from homeassistant.components.sensor import SensorEntity, SensorDeviceClass, SensorStateClass
 from homeassistant.helpers.entity import DeviceInfo, generate_entity_id
-from homeassistant.const import Platform, UnitOfPower, UnitOfEnergy, STATE_UNKNOWN, STATE_UNAVAILABLE
+from homeassistant.const import PERCENTAGE, Platform, UnitOfPower, UnitOfEnergy
 from homeassistant.helpers import entity_registry as er
 from homeassistant.core import HomeAssistant, callback, Event
-from homeassistant.const import EVENT_HOMEASSISTANT_STARTED
-from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.helpers.event import (
+    async_call_later,
+    async_track_state_change_event,
+    async_track_time_interval,
+)
+from homeassistant.helpers.restore_state import RestoreEntity, RestoredExtraData
+from homeassistant.helpers.start import async_at_started
+from homeassistant.util import dt as dt_util
 
 from .const import (
     DOMAIN,
     ENTITY_TYPE_POWER,
     ENTITY_TYPE_ENERGY,
+    ENTITY_TYPE_DUAL,
+    CONF_ENTITY_TYPE,
     CONF_SMART_METER_DEVICE,
     CONF_ENTITIES,
     CONF_INTEGRATION_ROOMS,
+    CONF_RULES,
+    CONF_SAMPLING,
+    CONF_SAMPLING_POLICY,
+    CONF_SAMPLING_INTERVAL,
+    CONF_SAMPLING_THRESHOLD,
+    SAMPLING_PASS_THROUGH,
+    CONF_BASELINE,
+    CONF_BASELINE_UNTRACKED,
+    CONF_BASELINE_QUANTILE,
+    CONF_BASELINE_WINDOW,
+    DEFAULT_BASELINE_QUANTILE,
+    DEFAULT_BASELINE_WINDOW,
+    CONF_EXPORT,
+    CONF_EXPORT_FORMAT,
+    EXPORT_FORMAT_CSV,
+    CONF_AGGREGATION,
+    CONF_AGGREGATION_INTERVAL,
+    CONF_AGGREGATION_RATE,
+    AGGREGATION_AUTO,
+    AGGREGATION_EVENT,
+    AGGREGATION_INTERVAL,
+    DEFAULT_AGGREGATION_INTERVAL,
+    DEFAULT_AGGREGATION_RATE,
+    CONF_PERIODS,
+    CONF_PERIOD_CRON,
+    PERIOD_CRON,
+    CONF_FORECAST,
+    CONF_STATISTICS,
+    CONF_EVENT_THRESHOLD,
+    EVENT_ZONE_CHANGED,
+    CONF_STEP_THRESHOLD,
+    CONF_STEP_WINDOW,
+    DEFAULT_STEP_WINDOW,
+    EVENT_STEP_DETECTED,
+    SHARE_PARENT,
+    SHARE_METER,
+    SHARE_COVERAGE,
+    SHARE_KINDS,
+    CONF_PRICE_ENTITY,
+    CONF_UNACCOUNTED,
+    entity_types,
     sanitize_zone_name,
     is_smart_meter_selected,
 )
+from .accumulator import IncreaseTracker
+from .core import ZoneModel, expand_members, parse_value, untracked_entity_id, untracked_value
+from .estimators import ConsumptionProfile, EventRate, StepDetector, WindowedQuantile
+from .models import get_runtime_data
+from .pairing import paired_membership
+from .rules import CompiledRules, has_rules
+from .sampling import MemberSampler
 
 _LOGGER = logging.getLogger(__name__)
 ENTITY_ID_FORMAT = Platform.SENSOR + ".{}"
+BASELINE_SAMPLE_INTERVAL = timedelta(minutes=1)
+# Forecasts: publish cadence, time constant of the rate (s) and weight of the
+# last day in the hour-of-day profile
+FORECAST_INTERVAL = timedelta(minutes=5)
+FORECAST_RATE_TAU = 3600.0
+FORECAST_PROFILE_ALPHA = 0.3
+# Time constant of the per-zone event rate, and the hysteresis of the switch
+# back to event mode (a fraction of the switch-over rate)
+EVENT_RATE_TAU = 3.0
+AGGREGATION_HYSTERESIS = 0.5
 
 
 # ---------------------------------------------------------------------------
@@ -45,31 +115,39 @@ def check_and_remove_nonexistent_entities(hass: HomeAssistant, entities, entry):
 
 def expand_integration_zone_entities(hass: HomeAssistant, entities, integration_zones, entity_type):
     """Expand selected integration zones into their tracked entities."""
-    if not integration_zones:
-        return list(entities or [])
-
     entity_registry = er.async_get(hass)
-    selected = list(entities or [])
-    for zone_id in integration_zones:
-        if zone_id in entity_registry.entities:
-            selected.append(zone_id)
-        untracked = f"{zone_id[:-(len(entity_type) + 1)]}_untracked_{entity_type}"
-        if untracked in entity_registry.entities:
-            selected.append(untracked)
-    return sorted(set(selected))
+    return expand_members(
+        entities,
+        integration_zones,
+        entity_type,
+        entity_registry.entities.__contains__,
+        cumulative=entity_type == ENTITY_TYPE_ENERGY,
+    )
+
+
+def type_membership(hass: HomeAssistant, entry_id, entity_type):
+    """Return the membership of a zone as seen by its sensors of entity_type.
+
+    Zones of both types pair the stored members per device; callers must not
+    modify the result.
+    """
+    membership = get_runtime_data(hass).membership.peek(entry_id)
+    entry = hass.config_entries.async_get_entry(entry_id)
+    if entry is None or entry.data.get(CONF_ENTITY_TYPE) != ENTITY_TYPE_DUAL:
+        return membership
+    return paired_membership(hass, membership, entity_type)
 
 
 def is_valid_value(state_obj):
     """Return True when state_obj has a numeric value that can be used in calculations."""
+    return state_to_float(state_obj) is not None
+
+
+def state_to_float(state_obj):
+    """Return the numeric value of state_obj, or None when it is not usable."""
     if state_obj is None:
-        return False
-    if state_obj.state in (STATE_UNKNOWN, STATE_UNAVAILABLE, None, ""):
-        return False
-    try:
-        float(state_obj.state)
-        return True
-    except (ValueError, TypeError):
-        return False
+        return None
+    return parse_value(state_obj.state)
 
 
 # ---------------------------------------------------------------------------
@@ -80,7 +158,7 @@ async def async_setup_entry(hass: HomeAssistant, entry, async_add_entities):
     """Set up the Energy and Power Monitor sensor based on a config entry."""
     _LOGGER.debug("async_setup_entry start for: %s", entry.title)
 
-    async def check_and_setup_entities(event=None):
+    async def check_and_setup_entities(_hass=None):
         """Set up entities once Home Assistant is fully started."""
         if not hass.is_running:
             _LOGGER.debug("HA not fully running yet, waiting for started event")
@@ -89,56 +167,271 @@ async def async_setup_entry(hass: HomeAssistant, entry, async_add_entities):
         _LOGGER.debug("HA fully started, proceeding with entity setup for: %s", entry.title)
 
         zone_name = entry.data.get("room")
-        entities = entry.data.get(CONF_ENTITIES, [])
-        entity_type = entry.data.get("entity_type")
-        integration_zones = entry.data.get(CONF_INTEGRATION_ROOMS, [])
-        smart_meter_device = entry.data.get(CONF_SMART_METER_DEVICE, "")
+        membership_store = get_runtime_data(hass).membership
+        entities = membership_store.peek(entry.entry_id)[CONF_ENTITIES]
 
-        expanded_entities = expand_integration_zone_entities(
-            hass, entities, integration_zones, entity_type
-        )
+        # Integration zones and rule members are expanded once, when the
+        # zone sensor is added; only the stored member list is checked here
         base_entities_checked = check_and_remove_nonexistent_entities(hass, entities, entry)
         if set(base_entities_checked) != set(entities):
-            new_data = dict(entry.data)
-            new_data[CONF_ENTITIES] = base_entities_checked
-            hass.config_entries.async_update_entry(entry, data=new_data)
-            _LOGGER.debug("Config entry updated with valid entities only")
+            membership_store.async_update(entry.entry_id, {CONF_ENTITIES: base_entities_checked})
+            _LOGGER.debug("Zone membership updated with valid entities only")
 
-        entities_checked = check_and_remove_nonexistent_entities(hass, expanded_entities, entry)
+        if not zone_name or not isinstance(base_entities_checked, list):
+            _LOGGER.error("Invalid configuration: zone_name or entities missing for entry %s", entry.title)
+            return
 
-        _LOGGER.debug(
-            "Setting up sensor: zone=%s entities=%s smart_meter=%s entity_type=%s",
-            zone_name,
-            entities_checked,
-            smart_meter_device,
-            entity_type,
+        for entity_type in entity_types(entry.data.get("entity_type")):
+            async_add_zone_sensors(hass, entry, entity_type, async_add_entities)
+
+    if hass.is_running:
+        await check_and_setup_entities()
+    else:
+        # Cancelled when the entry is unloaded before Home Assistant started
+        entry.async_on_unload(async_at_started(hass, check_and_setup_entities))
+
+
+@callback
+def async_add_zone_sensors(hass: HomeAssistant, entry, entity_type, async_add_entities):
+    """Add the zone sensor of entity_type and the sensors derived from it."""
+    zone_name = entry.data.get("room")
+    dual = entry.data.get("entity_type") == ENTITY_TYPE_DUAL
+    membership = type_membership(hass, entry.entry_id, entity_type)
+    entities = membership[CONF_ENTITIES]
+    smart_meter_device = membership[CONF_SMART_METER_DEVICE]
+    _LOGGER.debug(
+        "Setting up sensor: zone=%s entities=%s integration_zones=%s smart_meter=%s entity_type=%s",
+        zone_name,
+        entities,
+        membership[CONF_INTEGRATION_ROOMS],
+        smart_meter_device,
+        entity_type,
+    )
+
+    sensor = EnergyandPowerMonitorSensor(hass, zone_name, entities, entry.entry_id, entity_type)
+    async_add_entities([sensor])
+
+    smart_meter_sensor = None
+    if is_smart_meter_selected(smart_meter_device):
+        smart_meter_sensor = SmartMeterSensor(
+            hass, zone_name, smart_meter_device, entry.entry_id, entity_type, sensor
+        )
+        async_add_entities([smart_meter_sensor])
+
+    quantile = entry.options.get(CONF_BASELINE_QUANTILE, DEFAULT_BASELINE_QUANTILE)
+    window = entry.options.get(CONF_BASELINE_WINDOW, DEFAULT_BASELINE_WINDOW)
+    baseline_sensors = []
+    if entry.options.get(CONF_BASELINE):
+        baseline_sensors.append(
+            BaselineSensor(hass, zone_name, entry.entry_id, entity_type, sensor, quantile, window)
         )
+    if smart_meter_sensor and entry.options.get(CONF_BASELINE_UNTRACKED):
+        baseline_sensors.append(
+            BaselineSensor(hass, zone_name, entry.entry_id, entity_type, smart_meter_sensor, quantile, window)
+        )
+    if baseline_sensors:
+        async_add_entities(baseline_sensors)
+
+    if entity_type == ENTITY_TYPE_ENERGY:
+        periods = [(period, None) for period in entry.options.get(CONF_PERIODS, [])]
+        if entry.options.get(CONF_PERIOD_CRON):
+            periods.append((PERIOD_CRON, entry.options[CONF_PERIOD_CRON]))
+        if periods:
+            async_add_entities([
+                PeriodConsumptionSensor(hass, zone_name, entry.entry_id, entity_type, sensor, period, cron)
+                for period, cron in periods
+            ])
+        if entry.options.get(CONF_FORECAST):
+            async_add_entities([
+                ZoneForecastSensor(hass, zone_name, entry.entry_id, entity_type, sensor, period)
+                for period in entry.options[CONF_FORECAST]
+            ])
+
+    shares = [
+        kind for kind in SHARE_KINDS
+        if entry.options.get(kind) and (kind != SHARE_METER or smart_meter_sensor is not None)
+    ]
+    if shares:
+        async_add_entities([
+            ZoneShareSensor(hass, zone_name, entry.entry_id, entity_type, sensor, kind, smart_meter_sensor)
+            for kind in shares
+        ])
+
+    if entry.options.get(CONF_UNACCOUNTED):
+        async_add_entities([UnaccountedSensor(hass, zone_name, entry.entry_id, entity_type, sensor)])
+
+    # Zones of both types price their energy sensor
+    if entry.options.get(CONF_PRICE_ENTITY) and (not dual or entity_type == ENTITY_TYPE_ENERGY):
+        async_add_entities([
+            ZoneCostSensor(hass, zone_name, entry.entry_id, entity_type, sensor, entry.options[CONF_PRICE_ENTITY])
+        ])
 
-        if not zone_name or not isinstance(entities_checked, list):
-            _LOGGER.error("Invalid configuration: zone_name or entities missing for entry %s", entry.title)
+
+# ---------------------------------------------------------------------------
+# Shared zone output bookkeeping
+# ---------------------------------------------------------------------------
+
+class ZoneOutputMixin:
+    """Counters, delta publishing, export and step detection shared by the zone and untracked sensors."""
+
+    # Name of the EnergyPowerMonitorData registry the sensor is kept in
+    _runtime_registry = "zones"
+    _output_kind = "zone"
+
+    def _init_output(self):
+        self._recompute_count = 0
+        self._write_count = 0
+        self._runtime = None
+        self._exporter = None
+        self._export_format = None
+        self._last_exported = None
+        self._startup_pending = True
+        self._statistics = None
+        self._steps = None
+        self._unsubscribe_step = None
+
+    def counters(self):
+        """Return recompute/write counters used by the replay harness."""
+        return {
+            "state": self._state,
+            "recomputes": self._recompute_count,
+            "writes": self._write_count,
+        }
+
+    def diagnostics(self):
+        """Return the diagnostics of this sensor."""
+        diagnostics = {"entry_id": self._entry_id, **self.counters()}
+        if self._statistics is not None:
+            diagnostics["statistics"] = self._statistics.diagnostics()
+        if self._steps is not None:
+            diagnostics["steps"] = {
+                "level": self._steps.level,
+                "detected": self._steps.steps,
+                "unmatched": [self._step_data(step) for step in self._steps.recent],
+            }
+        return diagnostics
+
+    def _has_valid_state(self):
+        """Return True when the current state is a real value (used for the startup profile)."""
+        return self._state is not None
+
+    @property
+    def state_class(self):
+        # With long-term statistics imported by the integration, the recorder
+        # must not compile its own statistics from the state rows
+        if self._statistics is not None:
+            return None
+        return SensorStateClass.MEASUREMENT
+
+    @callback
+    def async_write_ha_state(self):
+        """Write state to the state machine, counting writes and publishing the value."""
+        self._write_count += 1
+        super().async_write_ha_state()
+        if self._runtime is not None:
+            self._runtime.async_value_changed(self.entity_id, self._state)
+            if self._startup_pending and self._has_valid_state():
+                self._startup_pending = False
+                self._runtime.startup.zone_valid(self.entity_id, self._entry_id)
+        if self._exporter is not None and self._state is not None and self._state != self._last_exported:
+            self._last_exported = self._state
+            self._exporter.async_add(
+                self._export_format, self.entity_id, self._zone_name, self._output_kind, self._state
+            )
+        if self._steps is not None:
+            self._async_detect_step(self._steps.update(self._state, dt_util.utcnow().timestamp()))
+
+    def _register_output(self, entry):
+        """Register in the shared runtime data and, when enabled, with the exporter."""
+        self._runtime = runtime = get_runtime_data(self.hass)
+        registry = getattr(runtime, self._runtime_registry)
+        registry[self.entity_id] = self
+        runtime.async_zone_tree_changed()
+
+        @callback
+        def unregister():
+            registry.pop(self.entity_id, None)
+            runtime.async_zone_tree_changed()
+
+        self.async_on_remove(unregister)
+        if entry and entry.options.get(CONF_EXPORT):
+            self._export_format = entry.options.get(CONF_EXPORT_FORMAT, EXPORT_FORMAT_CSV)
+            self._exporter = runtime.get_exporter()
+            self._exporter.async_register()
+            self.async_on_remove(self._exporter.async_unregister)
+
+    def _setup_statistics(self, entry):
+        """Start the hourly long-term statistics when enabled for this energy zone."""
+        if not entry or self._entity_type != ENTITY_TYPE_ENERGY or not entry.options.get(CONF_STATISTICS):
+            return
+        self._statistics, unregister = self._runtime.get_statistics().async_register(
+            self._unique_id, self.name, lambda: self._state
+        )
+        self.async_on_remove(unregister)
+
+    def _setup_steps(self, entry):
+        """Start the step detection when enabled for this power zone."""
+        threshold = entry.options.get(CONF_STEP_THRESHOLD) if entry else None
+        if not threshold or self._entity_type != ENTITY_TYPE_POWER:
             return
+        self._steps = StepDetector(
+            float(threshold), float(entry.options.get(CONF_STEP_WINDOW, DEFAULT_STEP_WINDOW))
+        )
+        self.async_on_remove(self._cancel_step_timer)
+
+    @staticmethod
+    def _step_data(step):
+        """Return a detected step with ISO timestamps."""
+        matched = step["matched"]
+        return {
+            "step": round(step["step"], 1),
+            "old_value": step["old"],
+            "new_value": step["new"],
+            "time": dt_util.utc_from_timestamp(step["time"]).isoformat(),
+            "matched": dt_util.utc_from_timestamp(matched).isoformat() if matched is not None else None,
+        }
 
-        sensor = EnergyandPowerMonitorSensor(hass, zone_name, entities_checked, entry.entry_id, entity_type)
-        async_add_entities([sensor])
+    @callback
+    def _cancel_step_timer(self):
+        if self._unsubscribe_step:
+            self._unsubscribe_step()
+            self._unsubscribe_step = None
 
-        if is_smart_meter_selected(smart_meter_device):
-            smart_meter_sensor = SmartMeterSensor(
-                hass, zone_name, smart_meter_device, entry.entry_id, entity_type, sensor
+    @callback
+    def _async_detect_step(self, step):
+        """Fire a detected step, or wait for the window of a candidate step to pass."""
+        if step is not None:
+            data = self._step_data(step)
+            _LOGGER.debug("Zone '%s': %s step of %s W", self._zone_name, self._output_kind, data["step"])
+            self.hass.bus.async_fire(
+                EVENT_STEP_DETECTED,
+                {"zone": self._zone_name, "entity_id": self.entity_id, "kind": self._output_kind, **data},
+            )
+        pending_until = self._steps.pending_until
+        if pending_until is not None and self._unsubscribe_step is None:
+            self._unsubscribe_step = async_call_later(
+                self.hass, max(0.0, pending_until - dt_util.utcnow().timestamp()), self._async_step_window_passed
             )
-            async_add_entities([smart_meter_sensor])
 
-    if hass.is_running:
-        await check_and_setup_entities()
-    else:
-        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STARTED, check_and_setup_entities)
+    @callback
+    def _async_step_window_passed(self, _now):
+        self._unsubscribe_step = None
+        self._async_detect_step(self._steps.confirm(dt_util.utcnow().timestamp()))
 
 
 # ---------------------------------------------------------------------------
 # Main zone sensor
 # ---------------------------------------------------------------------------
 
-class EnergyandPowerMonitorSensor(SensorEntity):
-    """Representation of an Energy and Power Monitor zone sensor with real-time updates."""
+class EnergyandPowerMonitorSensor(ZoneOutputMixin, RestoreEntity, SensorEntity):
+    """Representation of an Energy and Power Monitor zone sensor with real-time updates.
+
+    A power zone is the sum of its members.  An energy zone accumulates the
+    increases of its members instead (included zones are members like any
+    other counter), so member resets, removals and additions never make the
+    total drop; the total and the last value per member are restored after a
+    restart.
+    """
 
     _attr_should_poll = False
 
@@ -149,12 +442,42 @@ class EnergyandPowerMonitorSensor(SensorEntity):
         self._base_entities = list(entities)
         self._entities = list(entities)
         self._state = 0
+        self._valid_members = 0
         self._entry_id = entry_id
         self._entity_type = entity_type
         self._unique_id = self._make_unique_id()
         self.entity_id = generate_entity_id(ENTITY_ID_FORMAT, self._unique_id, hass=self.hass)
-        self._unsubscribe_state_changes = None
-        self._unsubscribe_registry_listener = None
+        # One state-change subscription per member, so membership changes only
+        # touch the members that were added or removed
+        self._state_unsubs = {}
+        self._subscriptions_added = 0
+        self._subscriptions_removed = 0
+        self._full_rebuilds = 0
+        self._membership = None
+        self._rule_entities = set()
+        self._unsubscribe_rules = None
+        self._init_output()
+        self._samplers = {}
+        self._sampling_options = None
+        self._sampler_flush_unsubs = {}
+        self._aggregation = AGGREGATION_AUTO
+        self._aggregation_mode = AGGREGATION_EVENT
+        self._aggregation_interval = DEFAULT_AGGREGATION_INTERVAL
+        self._aggregation_rate = DEFAULT_AGGREGATION_RATE
+        self._event_rate = EventRate(EVENT_RATE_TAU)
+        self._dirty = False
+        self._mode_switches = 0
+        self._unsubscribe_tick = None
+        # Zone arithmetic (core.py): the running sum of a power zone, or the
+        # accumulated member increases of an energy zone, which are also
+        # published to the period sensors and statistics
+        self._model = ZoneModel(cumulative=entity_type == ENTITY_TYPE_ENERGY)
+        # Zone changed events: value of the last event and the member that
+        # changed since the last state write
+        self._event_threshold = 0.0
+        self._event_value = None
+        self._event_member = None
+        self._events_fired = 0
         _LOGGER.debug(
             "EnergyandPowerMonitorSensor init: entity_id=%s zone=%s type=%s",
             self.entity_id,
@@ -190,16 +513,15 @@ class EnergyandPowerMonitorSensor(SensorEntity):
 
     @property
     def extra_state_attributes(self):
-        return {"selected_entities": self._base_entities}
+        attributes = {"selected_entities": self._base_entities}
+        if self._unsubscribe_rules is not None:
+            attributes["rule_entities"] = sorted(self._rule_entities)
+        return attributes
 
     @property
     def icon(self):
         return "mdi:flash" if self._entity_type == ENTITY_TYPE_POWER else "mdi:counter"
 
-    @property
-    def state_class(self):
-        return SensorStateClass.MEASUREMENT
-
     @property
     def unit_of_measurement(self):
         if self._entity_type == ENTITY_TYPE_POWER:
@@ -212,149 +534,458 @@ class EnergyandPowerMonitorSensor(SensorEntity):
             return SensorDeviceClass.POWER
         return SensorDeviceClass.ENERGY
 
+    @property
+    def state_class(self):
+        if self._model.cumulative and self._statistics is None:
+            return SensorStateClass.TOTAL_INCREASING
+        return super().state_class
+
+    @property
+    def extra_restore_state_data(self):
+        if not self._model.cumulative or self._model.total is None:
+            return None
+        return RestoredExtraData({"total": self._model.total, "members": self._model.increases.as_dict()})
+
+    @property
+    def tracked_entities(self):
+        """Expanded entity IDs currently feeding this zone."""
+        return list(self._entities)
+
+    @property
+    def valid_members(self):
+        """Number of members that fed the last calculation."""
+        return self._valid_members
+
+    def includes(self, entity_id):
+        """Return True when entity_id feeds this zone (without copying the member list)."""
+        return entity_id in self._entities
+
+    def counters(self):
+        """Return recompute/write counters, including the member sampling totals."""
+        counters = super().counters()
+        counters["sampled_raw_updates"] = sum(s.raw_updates for s in self._samplers.values())
+        counters["sampled_forwarded_updates"] = sum(s.forwarded_updates for s in self._samplers.values())
+        counters["mode_switches"] = self._mode_switches
+        counters["subscriptions_added"] = self._subscriptions_added
+        counters["subscriptions_removed"] = self._subscriptions_removed
+        counters["full_rebuilds"] = self._full_rebuilds
+        counters["events_fired"] = self._events_fired
+        return counters
+
+    def diagnostics(self):
+        """Return the diagnostics of this zone, including its aggregation mode."""
+        diagnostics = {
+            **super().diagnostics(),
+            "aggregation": {
+                "setting": self._aggregation,
+                "mode": self._aggregation_mode,
+                "event_rate": round(self._event_rate.value(time.monotonic()), 3),
+                "switch_rate": self._aggregation_rate,
+                "interval": self._aggregation_interval,
+            },
+            "tracked_entities": len(self._entities),
+            "state_subscriptions": len(self._state_unsubs),
+            "rule_entities": len(self._rule_entities),
+            "sampled_entities": sorted(self._samplers),
+            "valid_members": self._valid_members,
+        }
+        if self._model.cumulative:
+            increases = self._model.increases
+            diagnostics["accumulator"] = {
+                "total": self._model.total,
+                "members": len(increases),
+                "resets": increases.resets,
+                "ignored_drops": increases.jitter,
+            }
+        return diagnostics
+
+    def subscriptions(self):
+        """Return the number of live subscriptions of this zone."""
+        return (
+            len(self._state_unsubs)
+            + len(self._sampler_flush_unsubs)
+            + sum(
+                unsub is not None
+                for unsub in (self._unsubscribe_rules, self._unsubscribe_tick)
+            )
+        )
+
+    def snapshot(self):
+        """Return this zone's node for the websocket zone tree."""
+        return {
+            "entry_id": self._entry_id,
+            "name": self._zone_name,
+            "entity_type": self._entity_type,
+            "value": self._state,
+            "members": {entity_id: self._snapshot_value(entity_id) for entity_id in self._base_entities},
+            "rule_members": sorted(self._rule_entities),
+            "tracked_entities": list(self._entities),
+        }
+
     # --- Internal helpers ---
 
-    def _get_expanded_entities(self, entry):
-        """Return the full expanded entity list for the current config entry."""
+    def _apply_sampling_options(self, entry):
+        """(Re)build the per-member samplers from the entry options."""
+        self._cancel_sampler_flushes()
+        self._samplers = {}
         if not entry:
+            return
+        self._sampling_options = entry.options.get(CONF_SAMPLING, {})
+        for entity_id, settings in entry.options.get(CONF_SAMPLING, {}).items():
+            policy = settings.get(CONF_SAMPLING_POLICY, SAMPLING_PASS_THROUGH)
+            if policy == SAMPLING_PASS_THROUGH:
+                continue
+            self._samplers[entity_id] = MemberSampler(
+                policy,
+                settings.get(CONF_SAMPLING_INTERVAL, 0),
+                settings.get(CONF_SAMPLING_THRESHOLD, 0),
+                cumulative=self._entity_type == ENTITY_TYPE_ENERGY,
+            )
+        if not self._model.cumulative:
+            # The fresh samplers start from the raw member values
+            for entity_id in self._state_unsubs:
+                self._model.update(entity_id, self._member_value(entity_id))
+        if self._samplers:
+            _LOGGER.debug(
+                "Zone '%s': sampling enabled for %s",
+                self._zone_name,
+                list(self._samplers),
+            )
+
+    def _apply_event_options(self, entry):
+        """Read the zone changed event threshold from the entry options."""
+        options = entry.options if entry else {}
+        self._event_threshold = float(options.get(CONF_EVENT_THRESHOLD) or 0)
+        if entry and entry.data.get(CONF_ENTITY_TYPE) == ENTITY_TYPE_DUAL and self._entity_type != ENTITY_TYPE_POWER:
+            # The threshold of a zone of both types is in W
+            self._event_threshold = 0.0
+        self._event_value = None
+
+    def _apply_aggregation_options(self, entry):
+        """Read the aggregation override from the entry options."""
+        options = entry.options if entry else {}
+        self._aggregation = options.get(CONF_AGGREGATION, AGGREGATION_AUTO)
+        self._aggregation_interval = float(options.get(CONF_AGGREGATION_INTERVAL, DEFAULT_AGGREGATION_INTERVAL))
+        self._aggregation_rate = float(options.get(CONF_AGGREGATION_RATE, DEFAULT_AGGREGATION_RATE))
+        if self._unsubscribe_tick:
+            self._unsubscribe_tick()
+            self._unsubscribe_tick = None
+        self._aggregation_mode = None
+        self._set_aggregation_mode(
+            AGGREGATION_INTERVAL if self._aggregation == AGGREGATION_INTERVAL else AGGREGATION_EVENT
+        )
+
+    def _set_aggregation_mode(self, mode):
+        """Switch between per-event recompute and the interval tick."""
+        if mode == self._aggregation_mode:
+            return
+        if self._aggregation_mode is not None:
+            self._mode_switches += 1
+            _LOGGER.debug(
+                "Zone '%s': switching to %s aggregation at %.1f events/s",
+                self._zone_name,
+                mode,
+                self._event_rate.value(time.monotonic()),
+            )
+        self._aggregation_mode = mode
+        if mode == AGGREGATION_INTERVAL and self._unsubscribe_tick is None:
+            self._unsubscribe_tick = async_track_time_interval(
+                self.hass, self._async_aggregation_tick, timedelta(seconds=self._aggregation_interval)
+            )
+        elif mode == AGGREGATION_EVENT and self._unsubscribe_tick is not None:
+            self._unsubscribe_tick()
+            self._unsubscribe_tick = None
+
+    def _member_value(self, entity_id):
+        """Return the value of a member as seen by the zone (after sampling)."""
+        sampler = self._samplers.get(entity_id)
+        if sampler is not None and sampler.has_value:
+            return sampler.value
+        return state_to_float(self.hass.states.get(entity_id))
+
+    def _snapshot_value(self, entity_id):
+        """Return the last value of a member held in memory (sampler or zone model)."""
+        sampler = self._samplers.get(entity_id)
+        if sampler is not None and sampler.has_value:
+            return sampler.value
+        return self._model.member_value(entity_id)
+
+    def _schedule_sampler_flush(self, entity_id, sampler):
+        """Make sure a held-back sampled update is published at the end of its interval."""
+        if entity_id in self._sampler_flush_unsubs or sampler.next_flush is None:
+            return
+        delay = max(0.0, sampler.next_flush - time.monotonic())
+        self._sampler_flush_unsubs[entity_id] = async_call_later(
+            self.hass, delay, partial(self._flush_sampler, entity_id)
+        )
+
+    def _cancel_sampler_flushes(self):
+        for unsub in self._sampler_flush_unsubs.values():
+            unsub()
+        self._sampler_flush_unsubs = {}
+
+    @callback
+    def _flush_sampler(self, entity_id, _now):
+        self._sampler_flush_unsubs.pop(entity_id, None)
+        sampler = self._samplers.get(entity_id)
+        if sampler is None or not sampler.flush(time.monotonic()):
+            return
+        if sampler.pending:
+            self._schedule_sampler_flush(entity_id, sampler)
+        if not self._model.cumulative:
+            # Energy zones counted the raw value already (_on_state_change)
+            self._model.update(entity_id, sampler.value)
+        self._async_members_changed()
+
+    def _get_expanded_entities(self, entry):
+        """Return the full expanded entity list for the current zone membership."""
+        if not entry or self._membership is None:
             return self._entities
-        base_entities = entry.data.get(CONF_ENTITIES, [])
-        integration_zones = entry.data.get(CONF_INTEGRATION_ROOMS, [])
+        membership = type_membership(self.hass, self._entry_id, self._entity_type)
+        base_entities = membership[CONF_ENTITIES]
+        integration_zones = membership[CONF_INTEGRATION_ROOMS]
         self._base_entities = list(base_entities)
-        self.async_write_ha_state()
+        selected = base_entities + sorted(self._rule_entities.difference(base_entities))
         return expand_integration_zone_entities(
-            self.hass, base_entities, integration_zones, self._entity_type
+            self.hass, selected, integration_zones, self._entity_type
         )
 
+    def _apply_rules(self):
+        """(Re)compile the membership rules and start tracking their matches."""
+        # The previous rules are released only after the new ones are
+        # tracked, so the tracker keeps its candidate index
+        previous, self._unsubscribe_rules = self._unsubscribe_rules, None
+        self._rule_entities = set()
+        rules = self._membership.peek(self._entry_id)[CONF_RULES] if self._membership else None
+        try:
+            compiled = CompiledRules(rules, self._entity_type) if has_rules(rules) else None
+        except re.error as exc:
+            _LOGGER.error("Zone '%s': invalid entity ID pattern in membership rules: %s", self._zone_name, exc)
+            compiled = None
+        if compiled is not None:
+            tracker = get_runtime_data(self.hass).get_rule_tracker()
+            self._rule_entities, self._unsubscribe_rules = tracker.async_track(
+                compiled, self._async_rule_entities_changed
+            )
+            _LOGGER.debug(
+                "Zone '%s': %d entities match the membership rules", self._zone_name, len(self._rule_entities)
+            )
+        if previous:
+            previous()
+
     def _calculate_state(self):
-        """Sum all tracked entities, skipping invalid/negative values."""
-        total = 0.0
-        valid = []
-        for entity_id in self._entities:
-            state_obj = self.hass.states.get(entity_id)
-            if is_valid_value(state_obj):
-                try:
-                    value = float(state_obj.state)
-                    if value >= 0:
-                        total += value
-                        valid.append(entity_id)
-                except (ValueError, TypeError):
-                    _LOGGER.warning("Cannot convert state of '%s' to float: %s", entity_id, state_obj.state)
-        if len(valid) != len(self._entities):
-            self._entities = valid
-        return round(total, 1)
+        """Return the zone value kept up to date by the model.
+
+        Power zones sum the valid, non-negative member values; energy zones
+        return their accumulated total.
+        """
+        self._recompute_count += 1
+        self._valid_members = self._model.valid_members
+        return self._model.value
+
+    def _has_valid_state(self):
+        """A zone is valid once a member reports a value (or it has no members)."""
+        return self._valid_members > 0 or not self._entities
+
+    def _update_model_members(self, added, removed):
+        """Drop members that left the zone from the model and seed the new ones.
+
+        A member removed from an energy zone keeps the consumption it
+        contributed; a member with a restored value counts the consumption
+        since the last run right away.
+        """
+        for entity_id in removed:
+            self._model.remove(entity_id)
+        for entity_id in added:
+            if self._model.cumulative:
+                value = state_to_float(self.hass.states.get(entity_id))
+            else:
+                value = self._member_value(entity_id)
+            self._add_increase(self._model.add(entity_id, value))
+
+    @callback
+    def _add_increase(self, increase):
+        """Publish a member increase of an energy zone."""
+        if increase and self._model.total is not None:
+            get_runtime_data(self.hass).async_increase(self.entity_id, increase)
+
+    async def _async_restore_total(self):
+        """Continue the total and the per-member values of the last run."""
+        extra = await self.async_get_last_extra_data()
+        restored = extra.as_dict() if extra else {}
+        if isinstance(restored.get("total"), (int, float)):
+            self._model.restore(restored["total"], restored.get("members") or {}, self._entities)
 
     def _setup_state_listeners(self):
-        """Subscribe to state-change events for all tracked entities."""
-        if self._unsubscribe_state_changes:
-            self._unsubscribe_state_changes()
-            self._unsubscribe_state_changes = None
+        """Subscribe to state changes of the tracked entities.
 
-        if not self._entities:
+        Only the difference to the current subscriptions is applied: members
+        that stay in the zone keep their subscription.
+        """
+        wanted = set(self._entities)
+        current = set(self._state_unsubs)
+        removed = current - wanted
+        added = wanted - current
+        if not added and not removed:
             return
-
-        self._unsubscribe_state_changes = async_track_state_change_event(
-            self.hass, self._entities, self._on_state_change
-        )
+        if len(current) > 1 and removed == current:
+            # Every previous member was replaced at once
+            self._full_rebuilds += 1
+        for entity_id in removed:
+            self._state_unsubs.pop(entity_id)()
+        for entity_id in added:
+            self._state_unsubs[entity_id] = async_track_state_change_event(
+                self.hass, entity_id, self._on_state_change
+            )
+        self._subscriptions_added += len(added)
+        self._subscriptions_removed += len(removed)
+        self._update_model_members(added, removed)
+        if self._runtime is not None:
+            self._runtime.async_zone_tree_changed()
         _LOGGER.debug(
-            "State listeners set up for %d entities in zone '%s'",
-            len(self._entities),
+            "Zone '%s': state listeners +%d -%d (%d tracked)",
             self._zone_name,
+            len(added),
+            len(removed),
+            len(self._state_unsubs),
         )
 
-    def _setup_registry_listener(self):
-        """Subscribe to entity registry events so we react to removals / renames."""
-        if self._unsubscribe_registry_listener:
-            self._unsubscribe_registry_listener()
-        self._unsubscribe_registry_listener = self.hass.bus.async_listen(
-            "entity_registry_updated",
-            self._handle_entity_registry_event,
-        )
-
-    def _update_config_entry_entities(self):
-        """Persist the current _base_entities back into the config entry."""
-        entry = self.hass.config_entries.async_get_entry(self._entry_id)
-        if entry:
-            new_data = dict(entry.data)
-            new_data[CONF_ENTITIES] = list(self._base_entities)
-            self.hass.config_entries.async_update_entry(entry, data=new_data)
-            _LOGGER.debug("Config entry updated with new entity list: %s", self._base_entities)
-
     # --- Callbacks ---
 
     @callback
-    def _on_state_change(self, event: Event):
-        """Recalculate and push state whenever a tracked entity changes."""
-        self._state = self._calculate_state()
-        self.async_write_ha_state()
+    def async_write_ha_state(self):
+        """Write the state and fire a zone changed event past the threshold."""
+        super().async_write_ha_state()
+        if self._event_threshold:
+            self._async_fire_changed()
+        self._event_member = None
 
     @callback
-    def _handle_entity_registry_event(self, event: Event):
-        """React to entity registry updates that affect our tracked entities.
+    def _async_fire_changed(self):
+        value = self._state
+        if self._event_value is None:
+            self._event_value = value
+            return
+        delta = value - self._event_value
+        if abs(delta) < self._event_threshold:
+            return
+        self.hass.bus.async_fire(
+            EVENT_ZONE_CHANGED,
+            {
+                "zone": self._zone_name,
+                "entity_id": self.entity_id,
+                "old_value": self._event_value,
+                "new_value": value,
+                "delta": round(delta, 3),
+                "member": self._event_member,
+            },
+        )
+        self._event_value = value
+        self._events_fired += 1
 
-        This replaces the old 5-minute periodic reload:
-        - If a tracked entity is removed  → drop it from our list immediately.
-        - If a tracked entity is renamed  → update the reference immediately.
-        Both cases persist the change to the config entry so it survives restarts.
-        """
-        action = event.data.get("action")
+    @callback
+    def _on_state_change(self, event: Event):
+        """Recalculate and push state whenever a tracked entity changes."""
         entity_id = event.data.get("entity_id")
-
-        if action == "remove":
-            if entity_id not in self._entities and entity_id not in self._base_entities:
+        self._event_member = entity_id
+        value = state_to_float(event.data.get("new_state"))
+        if self._model.cumulative:
+            # Increases are counted from the raw values, sampling only delays
+            # the recompute
+            self._add_increase(self._model.update(entity_id, value))
+        sampler = self._samplers.get(entity_id)
+        if sampler is not None:
+            if not sampler.update(value, time.monotonic()):
+                self._schedule_sampler_flush(entity_id, sampler)
                 return
-            _LOGGER.warning(
-                "Tracked entity '%s' was removed; removing from zone '%s' automatically.",
-                entity_id,
-                self._zone_name,
-            )
-            self._entities = [e for e in self._entities if e != entity_id]
-            self._base_entities = [e for e in self._base_entities if e != entity_id]
-            self._update_config_entry_entities()
-            self._setup_state_listeners()
-            self._state = self._calculate_state()
-            self.async_write_ha_state()
+            value = sampler.value
+        if not self._model.cumulative:
+            self._model.update(entity_id, value)
+        self._async_members_changed()
 
-        elif action == "update":
-            changes = event.data.get("changes", {})
-            if "entity_id" not in changes:
-                return
-            old_entity_id = changes["entity_id"]  # value BEFORE the rename
-            if old_entity_id not in self._entities and old_entity_id not in self._base_entities:
+    @callback
+    def _async_members_changed(self):
+        """Recompute now (event mode) or at the next tick (interval mode)."""
+        rate = self._event_rate.add(time.monotonic())
+        if self._aggregation_mode == AGGREGATION_EVENT:
+            if self._aggregation != AGGREGATION_AUTO or rate < self._aggregation_rate:
+                self._state = self._calculate_state()
+                self.async_write_ha_state()
                 return
-            _LOGGER.info(
-                "Tracked entity renamed '%s' → '%s' in zone '%s'; updating reference.",
-                old_entity_id,
-                entity_id,
-                self._zone_name,
-            )
-            self._entities = [
-                entity_id if e == old_entity_id else e for e in self._entities
-            ]
-            self._base_entities = [
-                entity_id if e == old_entity_id else e for e in self._base_entities
-            ]
-            self._update_config_entry_entities()
-            self._setup_state_listeners()
+            self._set_aggregation_mode(AGGREGATION_INTERVAL)
+        self._dirty = True
+
+    @callback
+    def _async_aggregation_tick(self, _now=None):
+        """Publish the changes collected during one interval."""
+        if self._dirty:
+            self._dirty = False
             self._state = self._calculate_state()
             self.async_write_ha_state()
+        if (
+            self._aggregation == AGGREGATION_AUTO
+            and self._event_rate.value(time.monotonic()) < self._aggregation_rate * AGGREGATION_HYSTERESIS
+        ):
+            self._set_aggregation_mode(AGGREGATION_EVENT)
+
+    @callback
+    def _async_membership_updated(self, changed):
+        """Refresh the members after the zone membership was changed elsewhere."""
+        if CONF_RULES in changed:
+            self._apply_rules()
+        elif not changed & {CONF_ENTITIES, CONF_INTEGRATION_ROOMS}:
+            return
+        entry = self.hass.config_entries.async_get_entry(self._entry_id)
+        if entry and entry.options.get(CONF_SAMPLING, {}) != self._sampling_options:
+            # A sampled member was renamed
+            self._apply_sampling_options(entry)
+        self._refresh_entities(entry)
+
+    @callback
+    def _async_rule_entities_changed(self, matched):
+        """Follow the rule matches after a registry change."""
+        self._rule_entities = matched
+        self._refresh_entities(self.hass.config_entries.async_get_entry(self._entry_id))
 
     # --- HA lifecycle ---
 
     async def async_added_to_hass(self):
         """Called when entity is added to Home Assistant."""
         entry = self.hass.config_entries.async_get_entry(self._entry_id)
+        self._membership = get_runtime_data(self.hass).membership
+        self._apply_rules()
         if entry:
             expanded = self._get_expanded_entities(entry)
             if expanded != self._entities:
                 self._entities = expanded
-            self.async_on_remove(entry.add_update_listener(self._update_listener))
+            self._apply_sampling_options(entry)
+        self._apply_aggregation_options(entry)
+        self._apply_event_options(entry)
+        if self._membership is not None:
+            self.async_on_remove(
+                self._membership.async_listen(self._entry_id, self._async_membership_updated)
+            )
 
+        if self._model.cumulative:
+            # Late subscribers get the increases of this run only
+            runtime = get_runtime_data(self.hass)
+            runtime.async_reset_increases(self.entity_id)
+            self.async_on_remove(partial(runtime.async_reset_increases, self.entity_id))
+            await self._async_restore_total()
         self._setup_state_listeners()
-        self._setup_registry_listener()
+        # First start of an energy zone: continue from the sum of the current
+        # member values
+        self._model.start()
 
         # Ensure cleanup on removal
         self.async_on_remove(self._teardown_listeners)
+        self._register_output(entry)
+        self._setup_statistics(entry)
+        self._setup_steps(entry)
+        if self._statistics is not None:
+            self.async_on_remove(
+                self._runtime.async_listen_increase(self.entity_id, self._statistics.add)
+            )
 
         self._state = self._calculate_state()
         await super().async_added_to_hass()
@@ -362,12 +993,16 @@ class EnergyandPowerMonitorSensor(SensorEntity):
     @callback
     def _teardown_listeners(self):
         """Unsubscribe all listeners."""
-        if self._unsubscribe_state_changes:
-            self._unsubscribe_state_changes()
-            self._unsubscribe_state_changes = None
-        if self._unsubscribe_registry_listener:
-            self._unsubscribe_registry_listener()
-            self._unsubscribe_registry_listener = None
+        for unsub in self._state_unsubs.values():
+            unsub()
+        self._state_unsubs = {}
+        if self._unsubscribe_rules:
+            self._unsubscribe_rules()
+            self._unsubscribe_rules = None
+        if self._unsubscribe_tick:
+            self._unsubscribe_tick()
+            self._unsubscribe_tick = None
+        self._cancel_sampler_flushes()
 
     async def async_update(self):
         """Update state by re-reading config and recalculating."""
@@ -385,12 +1020,13 @@ class EnergyandPowerMonitorSensor(SensorEntity):
                 self._setup_state_listeners()
         self._state = self._calculate_state()
 
-    async def _update_listener(self, hass, entry):
-        """Called by HA when the config entry is updated via the options flow."""
+    @callback
+    def _refresh_entities(self, entry):
+        """Re-expand the membership, resubscribe when it changed and recalculate."""
         new_entities = self._get_expanded_entities(entry)
         if new_entities != self._entities:
             _LOGGER.debug(
-                "Zone '%s': config updated, refreshing entities",
+                "Zone '%s': membership updated, refreshing entities",
                 self._zone_name,
             )
             self._entities = new_entities
@@ -407,10 +1043,12 @@ class EnergyandPowerMonitorSensor(SensorEntity):
 # Smart meter (untracked) sensor
 # ---------------------------------------------------------------------------
 
-class SmartMeterSensor(SensorEntity):
+class SmartMeterSensor(ZoneOutputMixin, SensorEntity):
     """Untracked consumption sensor: smart_meter - zone_total."""
 
     _attr_should_poll = False
+    _runtime_registry = "untracked"
+    _output_kind = "untracked"
 
     def __init__(self, hass: HomeAssistant, zone_name, smart_meter_device, entry_id, entity_type, energy_power_monitor_sensor):
         """Initialize the Smart Meter sensor."""
@@ -425,7 +1063,9 @@ class SmartMeterSensor(SensorEntity):
         self._unique_id = f"{DOMAIN}_{sanitize_zone_name(zone_name)}_untracked_{entity_type}"
         self.entity_id = generate_entity_id(ENTITY_ID_FORMAT, self._unique_id, hass=self.hass)
         self._unsubscribe_state_changes = None
-        self._unsubscribe_registry_listener = None
+        self._init_output()
+        self._meter_increases = IncreaseTracker()
+        self._meter_value = None
         _LOGGER.debug(
             "SmartMeterSensor init: entity_id=%s zone=%s smart_meter=%s",
             self.entity_id,
@@ -467,10 +1107,6 @@ class SmartMeterSensor(SensorEntity):
     def icon(self):
         return "mdi:flash" if self._entity_type == ENTITY_TYPE_POWER else "mdi:counter"
 
-    @property
-    def state_class(self):
-        return SensorStateClass.MEASUREMENT
-
     @property
     def unit_of_measurement(self):
         if self._entity_type == ENTITY_TYPE_POWER:
@@ -483,26 +1119,53 @@ class SmartMeterSensor(SensorEntity):
             return SensorDeviceClass.POWER
         return SensorDeviceClass.ENERGY
 
+    @property
+    def smart_meter_device(self):
+        """Entity ID of the smart meter this sensor subtracts the zone from."""
+        return self._smart_meter_device
+
+    @property
+    def zone_entity_id(self):
+        """Entity ID of the zone sensor this untracked value belongs to."""
+        return self._energy_power_monitor_sensor.entity_id
+
+    @property
+    def smart_meter_value(self):
+        """Smart meter value of the last calculation."""
+        return self._meter_value
+
+    def subscriptions(self):
+        """Return the number of live subscriptions of this sensor."""
+        return int(self._unsubscribe_state_changes is not None)
+
+    def snapshot(self):
+        """Return this untracked sensor's node for the websocket zone tree."""
+        return {
+            "entry_id": self._entry_id,
+            "name": self._zone_name,
+            "entity_type": self._entity_type,
+            "value": self._state,
+            "zone": self.zone_entity_id,
+            "smart_meter": self._smart_meter_device,
+            "smart_meter_value": self._meter_value,
+        }
+
     # --- Internal helpers ---
 
     def _calculate_state(self):
         """Return smart_meter - zone_total, clamped to 0 if negative."""
+        self._recompute_count += 1
         monitor_value = self._energy_power_monitor_sensor.state
         smart_meter_state = self.hass.states.get(self._smart_meter_device)
+        self._meter_value = state_to_float(smart_meter_state)
 
-        if not is_valid_value(smart_meter_state):
+        if self._meter_value is None:
             _LOGGER.debug("Smart meter '%s' has no valid state", self._smart_meter_device)
             return None
         if monitor_value is None:
             _LOGGER.debug("Zone sensor for '%s' has no valid state yet", self._zone_name)
             return None
-
-        try:
-            result = float(smart_meter_state.state) - float(monitor_value)
-            return max(0, round(result, 1))
-        except (ValueError, TypeError) as exc:
-            _LOGGER.warning("Error calculating untracked value for '%s': %s", self._zone_name, exc)
-            return None
+        return untracked_value(self._meter_value, parse_value(monitor_value))
 
     def _setup_state_listeners(self):
         """Subscribe to state changes for the smart meter and the main zone sensor."""
@@ -519,61 +1182,55 @@ class SmartMeterSensor(SensorEntity):
         )
         _LOGGER.debug("SmartMeterSensor '%s' state listeners set up", self.entity_id)
 
-    def _setup_registry_listener(self):
-        """Subscribe to entity registry events to handle smart meter renames/removals."""
-        if self._unsubscribe_registry_listener:
-            self._unsubscribe_registry_listener()
-        self._unsubscribe_registry_listener = self.hass.bus.async_listen(
-            "entity_registry_updated",
-            self._handle_entity_registry_event,
-        )
-
     # --- Callbacks ---
 
+    @callback
+    def _async_zone_increase(self, increase):
+        self._statistics.add(-increase)
+
     @callback
     def _on_state_change(self, event: Event):
         """Recalculate on any relevant state change."""
+        if self._statistics is not None and event.data.get("entity_id") == self._smart_meter_device:
+            self._statistics.add(
+                self._meter_increases.update(self._smart_meter_device, state_to_float(event.data.get("new_state")))
+            )
         self._state = self._calculate_state()
         self.async_write_ha_state()
 
     @callback
-    def _handle_entity_registry_event(self, event: Event):
-        """Handle smart meter entity removal or rename."""
-        action = event.data.get("action")
-        entity_id = event.data.get("entity_id")
+    def _async_membership_updated(self, changed):
+        """Follow a renamed (or newly paired) smart meter.
 
-        if action == "remove" and entity_id == self._smart_meter_device:
+        A removed smart meter stays selected; the sensor is unknown until it
+        reports again.
+        """
+        if CONF_SMART_METER_DEVICE not in changed:
+            return
+        meter = type_membership(self.hass, self._entry_id, self._entity_type)[CONF_SMART_METER_DEVICE]
+        if meter == self._smart_meter_device and er.async_get(self.hass).async_get(meter) is None:
             _LOGGER.warning(
-                "Smart meter '%s' was removed; zone '%s' untracked sensor will show unavailable.",
-                entity_id,
+                "Smart meter '%s' was removed; zone '%s' untracked sensor is unknown until the meter reports again.",
+                meter,
                 self._zone_name,
             )
             self._state = None
             self.async_write_ha_state()
-
-        elif action == "update":
-            changes = event.data.get("changes", {})
-            if "entity_id" not in changes:
-                return
-            old_entity_id = changes["entity_id"]
-            if old_entity_id != self._smart_meter_device:
-                return
-            _LOGGER.info(
-                "Smart meter renamed '%s' → '%s' for zone '%s'; updating reference.",
-                old_entity_id,
-                entity_id,
-                self._zone_name,
-            )
-            self._smart_meter_device = entity_id
-            # Persist the new entity ID to the config entry
-            entry = self.hass.config_entries.async_get_entry(self._entry_id)
-            if entry:
-                new_data = dict(entry.data)
-                new_data[CONF_SMART_METER_DEVICE] = entity_id
-                self.hass.config_entries.async_update_entry(entry, data=new_data)
-            self._setup_state_listeners()
-            self._state = self._calculate_state()
-            self.async_write_ha_state()
+            return
+        if not is_smart_meter_selected(meter) or meter == self._smart_meter_device:
+            return
+        _LOGGER.info(
+            "Smart meter renamed '%s' → '%s' for zone '%s'; updating reference.",
+            self._smart_meter_device,
+            meter,
+            self._zone_name,
+        )
+        self._meter_increases.discard(self._smart_meter_device)
+        self._meter_increases.update(meter, state_to_float(self.hass.states.get(meter)))
+        self._smart_meter_device = meter
+        self._setup_state_listeners()
+        self._state = self._calculate_state()
+        self.async_write_ha_state()
 
     # --- HA lifecycle ---
 
@@ -583,28 +1240,901 @@ class SmartMeterSensor(SensorEntity):
         if self._unsubscribe_state_changes:
             self._unsubscribe_state_changes()
             self._unsubscribe_state_changes = None
-        if self._unsubscribe_registry_listener:
-            self._unsubscribe_registry_listener()
-            self._unsubscribe_registry_listener = None
 
     async def async_added_to_hass(self):
         """Called when entity is added to Home Assistant."""
         entry = self.hass.config_entries.async_get_entry(self._entry_id)
-        if entry:
-            self.async_on_remove(entry.add_update_listener(self._update_listener))
-
         self._setup_state_listeners()
-        self._setup_registry_listener()
+        membership = get_runtime_data(self.hass).membership
+        if membership is not None:
+            self.async_on_remove(membership.async_listen(self._entry_id, self._async_membership_updated))
         self.async_on_remove(self._teardown_listeners)
+        self._register_output(entry)
+        self._setup_statistics(entry)
+        self._setup_steps(entry)
+        if self._statistics is not None:
+            # Untracked consumption: smart meter increases minus zone increases
+            self._meter_increases.update(
+                self._smart_meter_device, state_to_float(self.hass.states.get(self._smart_meter_device))
+            )
+            self.async_on_remove(
+                self._runtime.async_listen_increase(self.zone_entity_id, self._async_zone_increase)
+            )
 
         self._state = self._calculate_state()
         await super().async_added_to_hass()
 
-    async def _update_listener(self, hass, entry):
-        """Called when the config entry is updated."""
-        self._state = self._calculate_state()
-        self.async_write_ha_state()
-
     async def async_will_remove_from_hass(self):
         """Clean up when entity is removed."""
-        self._teardown_listeners()
\ No newline at end of file
+        self._teardown_listeners()
+
+# ---------------------------------------------------------------------------
+# Share / coverage sensors
+# ---------------------------------------------------------------------------
+
+SHARE_NAMES = {
+    SHARE_PARENT: "share of parent",
+    SHARE_METER: "share of smart meter",
+    SHARE_COVERAGE: "coverage",
+}
+
+
+class ZoneShareSensor(SensorEntity):
+    """Percentage derived from the in-memory values of a zone.
+
+    - share_parent: the zone as a share of the zone that includes it
+    - share_meter: the zone as a share of its smart meter (tracked vs. metered)
+    - coverage: the share of the zone's members that report a value
+
+    Updated right after the zone (or untracked / parent zone) sensor wrote its
+    state, without reading the state machine; the state is only written when
+    the rounded percentage changes.
+    """
+
+    _attr_should_poll = False
+
+    def __init__(self, hass: HomeAssistant, zone_name, entry_id, entity_type, zone, kind, untracked=None):
+        """Initialize the share sensor."""
+        self.hass = hass
+        self._zone_name = zone_name
+        self._entry_id = entry_id
+        self._entity_type = entity_type
+        self._zone = zone
+        self._kind = kind
+        self._untracked = untracked
+        self._runtime = None
+        self._parent = None
+        self._unsubscribe_parent = None
+        self._state = None
+        self._unique_id = f"{DOMAIN}_{sanitize_zone_name(zone_name)}_{entity_type}_{kind}"
+        self.entity_id = generate_entity_id(ENTITY_ID_FORMAT, self._unique_id, hass=self.hass)
+
+    # --- HA entity properties ---
+
+    @property
+    def name(self):
+        return f"{self._zone_name} {SHARE_NAMES[self._kind]} - {self._entity_type.capitalize()}"
+
+    @property
+    def unique_id(self):
+        return self._unique_id
+
+    @property
+    def state(self):
+        return self._state
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        return DeviceInfo(
+            identifiers={(self._entry_id,)},
+            name=self._zone_name,
+            manufacturer="Custom",
+            model="Energy and Power Monitor",
+        )
+
+    @property
+    def extra_state_attributes(self):
+        attributes = {"source": self._zone.entity_id}
+        if self._kind == SHARE_PARENT:
+            attributes["parent"] = self._parent.entity_id if self._parent else None
+        elif self._kind == SHARE_METER:
+            attributes["smart_meter"] = self._untracked.smart_meter_device
+        return attributes
+
+    @property
+    def icon(self):
+        return "mdi:percent-circle-outline" if self._kind == SHARE_COVERAGE else "mdi:chart-pie"
+
+    @property
+    def state_class(self):
+        return SensorStateClass.MEASUREMENT
+
+    @property
+    def unit_of_measurement(self):
+        return PERCENTAGE
+
+    # --- Internal helpers ---
+
+    def _update_parent(self):
+        """Keep following the zone that includes this one (the first, if several do)."""
+        parent = self._runtime.parent_of(self._zone.entity_id)
+        if parent is self._parent:
+            return
+        if self._unsubscribe_parent:
+            self._unsubscribe_parent()
+            self._unsubscribe_parent = None
+        self._parent = parent
+        if parent is not None:
+            self._unsubscribe_parent = self._runtime.async_listen_value(parent.entity_id, self._async_update)
+
+    def _calculate_state(self):
+        zone = self._zone
+        if self._kind == SHARE_COVERAGE:
+            members = len(zone.tracked_entities)
+            if not members:
+                return None
+            return round(min(zone.valid_members, members) / members * 100, 1)
+        if self._kind == SHARE_METER:
+            total = self._untracked.smart_meter_value
+        else:
+            self._update_parent()
+            total = self._parent.state if self._parent is not None else None
+        if zone.state is None or not total:
+            return None
+        return round(float(zone.state) / float(total) * 100, 1)
+
+    # --- Callbacks ---
+
+    @callback
+    def _async_update(self):
+        value = self._calculate_state()
+        if value != self._state:
+            self._state = value
+            self.async_write_ha_state()
+
+    @callback
+    def _teardown_parent(self):
+        if self._unsubscribe_parent:
+            self._unsubscribe_parent()
+            self._unsubscribe_parent = None
+
+    # --- HA lifecycle ---
+
+    async def async_added_to_hass(self):
+        """Follow the zone (and its untracked sensor) and calculate the first value."""
+        self._runtime = runtime = get_runtime_data(self.hass)
+        self.async_on_remove(runtime.async_listen_value(self._zone.entity_id, self._async_update))
+        if self._kind == SHARE_METER:
+            self.async_on_remove(runtime.async_listen_value(self._untracked.entity_id, self._async_update))
+        self.async_on_remove(self._teardown_parent)
+        self._state = self._calculate_state()
+        await super().async_added_to_hass()
+
+
+# ---------------------------------------------------------------------------
+# Unaccounted (per tree level) sensor
+# ---------------------------------------------------------------------------
+
+class UnaccountedSensor(SensorEntity):
+    """Unaccounted value of one level of the zone tree: zone minus its included zones.
+
+    Every zone counts with its reference value: its smart meter when it has
+    one, its total otherwise.  The sum of the included zones is kept up to
+    date from their last reference values, so an update of one included zone
+    costs O(1) and nothing is read from the state machine.  The sensor is only
+    written when its rounded value changes.
+    """
+
+    _attr_should_poll = False
+
+    def __init__(self, hass: HomeAssistant, zone_name, entry_id, entity_type, zone):
+        """Initialize the unaccounted sensor."""
+        self.hass = hass
+        self._zone_name = zone_name
+        self._entry_id = entry_id
+        self._entity_type = entity_type
+        self._zone = zone
+        self._runtime = None
+        # Included zone -> its last reference value (None until known)
+        self._children = {}
+        self._children_sum = 0.0
+        self._child_unsubs = []
+        self._state = None
+        self._unique_id = f"{DOMAIN}_{sanitize_zone_name(zone_name)}_{entity_type}_unaccounted"
+        self.entity_id = generate_entity_id(ENTITY_ID_FORMAT, self._unique_id, hass=self.hass)
+
+    # --- HA entity properties ---
+
+    @property
+    def name(self):
+        return f"{self._zone_name} unaccounted - {self._entity_type.capitalize()}"
+
+    @property
+    def unique_id(self):
+        return self._unique_id
+
+    @property
+    def state(self):
+        return self._state
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        return DeviceInfo(
+            identifiers={(self._entry_id,)},
+            name=self._zone_name,
+            manufacturer="Custom",
+            model="Energy and Power Monitor",
+        )
+
+    @property
+    def extra_state_attributes(self):
+        return {"source": self._zone.entity_id, "sub_zones": sorted(self._children)}
+
+    @property
+    def icon(self):
+        return "mdi:help-circle-outline"
+
+    @property
+    def state_class(self):
+        return SensorStateClass.MEASUREMENT
+
+    @property
+    def unit_of_measurement(self):
+        if self._entity_type == ENTITY_TYPE_POWER:
+            return UnitOfPower.WATT
+        return UnitOfEnergy.KILO_WATT_HOUR
+
+    @property
+    def device_class(self):
+        if self._entity_type == ENTITY_TYPE_POWER:
+            return SensorDeviceClass.POWER
+        return SensorDeviceClass.ENERGY
+
+    # --- Internal helpers ---
+
+    def _reference(self, zone_entity_id):
+        """Return the smart meter value of a zone, or its total without a smart meter."""
+        untracked = self._runtime.untracked.get(untracked_entity_id(zone_entity_id, self._entity_type))
+        if untracked is not None and untracked.smart_meter_value is not None:
+            return untracked.smart_meter_value
+        zone = self._runtime.zones.get(zone_entity_id)
+        if zone is None or zone.state is None:
+            return None
+        return float(zone.state)
+
+    def _calculate_state(self):
+        if any(value is None for value in self._children.values()):
+            return None
+        return untracked_value(self._reference(self._zone.entity_id), self._children_sum)
+
+    @callback
+    def _teardown_children(self):
+        for unsub in self._child_unsubs:
+            unsub()
+        self._child_unsubs = []
+
+    @callback
+    def _follow_children(self):
+        """(Re)subscribe to the included zones of the zone and their untracked sensors."""
+        self._teardown_children()
+        children = type_membership(self.hass, self._entry_id, self._entity_type)[CONF_INTEGRATION_ROOMS]
+        self._children = {child: self._reference(child) for child in children}
+        self._children_sum = sum(value for value in self._children.values() if value is not None)
+        for child in children:
+            for entity_id in (child, untracked_entity_id(child, self._entity_type)):
+                self._child_unsubs.append(
+                    self._runtime.async_listen_value(entity_id, partial(self._async_child_changed, child))
+                )
+
+    @callback
+    def _async_write_if_changed(self):
+        value = self._calculate_state()
+        if value != self._state:
+            self._state = value
+            self.async_write_ha_state()
+
+    # --- Callbacks ---
+
+    @callback
+    def _async_child_changed(self, child):
+        value = self._reference(child)
+        previous = self._children.get(child)
+        if value == previous:
+            return
+        self._children_sum += (value or 0.0) - (previous or 0.0)
+        self._children[child] = value
+        self._async_write_if_changed()
+
+    @callback
+    def _async_membership_updated(self, changed):
+        if CONF_INTEGRATION_ROOMS in changed:
+            self._follow_children()
+            self._async_write_if_changed()
+
+    # --- HA lifecycle ---
+
+    async def async_added_to_hass(self):
+        """Follow the zone, its untracked sensor and its included zones."""
+        self._runtime = runtime = get_runtime_data(self.hass)
+        zone_id = self._zone.entity_id
+        for entity_id in (zone_id, untracked_entity_id(zone_id, self._entity_type)):
+            self.async_on_remove(runtime.async_listen_value(entity_id, self._async_write_if_changed))
+        self.async_on_remove(runtime.membership.async_listen(self._entry_id, self._async_membership_updated))
+        self.async_on_remove(self._teardown_children)
+        self._follow_children()
+        self._state = self._calculate_state()
+        await super().async_added_to_hass()
+
+
+# ---------------------------------------------------------------------------
+# Cost sensor
+# ---------------------------------------------------------------------------
+
+class ZoneCostSensor(RestoreEntity, SensorEntity):
+    """Running cost of a zone, priced by a tariff entity.
+
+    Energy zones price every consumption increase at the current tariff.  Power
+    zones integrate their value (left Riemann sum) each time the zone writes
+    its state, and close the running interval at the old price just before the
+    tariff changes.  Each update is O(1); the price comes from the
+    integration-wide TariffTracker, which has one subscription per tariff.
+    """
+
+    _attr_should_poll = False
+
+    def __init__(self, hass: HomeAssistant, zone_name, entry_id, entity_type, zone, price_entity):
+        """Initialize the cost sensor."""
+        self.hass = hass
+        self._zone_name = zone_name
+        self._entry_id = entry_id
+        self._entity_type = entity_type
+        self._zone = zone
+        self._price_entity = price_entity
+        self._tariff = None
+        self._cost = 0.0
+        self._state = None
+        # Power zones: the value being integrated and when it was set
+        self._power = None
+        self._power_since = None
+        self._unique_id = f"{DOMAIN}_{sanitize_zone_name(zone_name)}_{entity_type}_cost"
+        self.entity_id = generate_entity_id(ENTITY_ID_FORMAT, self._unique_id, hass=self.hass)
+
+    # --- HA entity properties ---
+
+    @property
+    def name(self):
+        return f"{self._zone_name} cost - {self._entity_type.capitalize()}"
+
+    @property
+    def unique_id(self):
+        return self._unique_id
+
+    @property
+    def state(self):
+        return self._state
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        return DeviceInfo(
+            identifiers={(self._entry_id,)},
+            name=self._zone_name,
+            manufacturer="Custom",
+            model="Energy and Power Monitor",
+        )
+
+    @property
+    def extra_state_attributes(self):
+        return {
+            "source": self._zone.entity_id,
+            "price_entity": self._price_entity,
+            "price": self._tariff.price if self._tariff else None,
+        }
+
+    @property
+    def icon(self):
+        return "mdi:cash"
+
+    @property
+    def state_class(self):
+        # Negative prices (feed-in) can lower the cost
+        return SensorStateClass.TOTAL
+
+    @property
+    def device_class(self):
+        return SensorDeviceClass.MONETARY
+
+    @property
+    def unit_of_measurement(self):
+        if self._tariff is not None and self._tariff.currency:
+            return self._tariff.currency
+        return self.hass.config.currency
+
+    @property
+    def extra_restore_state_data(self):
+        return RestoredExtraData({"cost": self._cost})
+
+    # --- Internal helpers ---
+
+    def _integrate(self, now):
+        """Add the cost of the power value since the last update (power zones)."""
+        if self._power is not None and self._tariff.price is not None:
+            self._cost += self._power * (now - self._power_since) / 3_600_000 * self._tariff.price
+        self._power_since = now
+
+    @callback
+    def _async_write_cost(self):
+        value = round(self._cost, 2)
+        if value != self._state:
+            self._state = value
+            self.async_write_ha_state()
+
+    # --- Callbacks ---
+
+    @callback
+    def _async_increase(self, increase):
+        """Price a consumption increase of an energy zone."""
+        if self._tariff.price is not None:
+            self._cost += increase * self._tariff.price
+            self._async_write_cost()
+
+    @callback
+    def _async_power_changed(self):
+        """Close the interval at the previous power value and start the next."""
+        self._integrate(time.monotonic())
+        self._power = float(self._zone.state) if self._zone.state is not None else None
+        self._async_write_cost()
+
+    @callback
+    def _async_price_changing(self):
+        if self._entity_type == ENTITY_TYPE_POWER:
+            self._integrate(time.monotonic())
+            self._async_write_cost()
+
+    # --- HA lifecycle ---
+
+    async def async_added_to_hass(self):
+        """Restore the cost and follow the zone and its tariff."""
+        await super().async_added_to_hass()
+        extra = await self.async_get_last_extra_data()
+        restored = extra.as_dict() if extra else {}
+        if isinstance(restored.get("cost"), (int, float)):
+            self._cost = float(restored["cost"])
+        self._state = round(self._cost, 2)
+
+        runtime = get_runtime_data(self.hass)
+        self._tariff, unsubscribe = runtime.get_tariffs().async_track(self._price_entity, self._async_price_changing)
+        self.async_on_remove(unsubscribe)
+        if self._entity_type == ENTITY_TYPE_ENERGY:
+            self.async_on_remove(
+                runtime.async_listen_increase(self._zone.entity_id, self._async_increase, replay=True)
+            )
+        else:
+            self.async_on_remove(runtime.async_listen_value(self._zone.entity_id, self._async_power_changed))
+            self._async_power_changed()
+
+
+# ---------------------------------------------------------------------------
+# Baseline (standby) sensor
+# ---------------------------------------------------------------------------
+
+class BaselineSensor(RestoreEntity, SensorEntity):
+    """Low-quantile estimate (e.g. p5 of the last 24h) of a zone or untracked sensor.
+
+    The source value is sampled once per BASELINE_SAMPLE_INTERVAL so quiet periods
+    weigh as much as busy ones, and fed into a constant-memory windowed P²
+    estimator: no history queries and no sample buffers.
+    """
+
+    _attr_should_poll = False
+
+    def __init__(self, hass: HomeAssistant, zone_name, entry_id, entity_type, source, quantile, window_hours):
+        """Initialize the baseline sensor."""
+        self.hass = hass
+        self._zone_name = zone_name
+        self._entry_id = entry_id
+        self._entity_type = entity_type
+        self._source = source
+        self._untracked = isinstance(source, SmartMeterSensor)
+        self._quantile = float(quantile)
+        self._window_hours = float(window_hours)
+        self._estimator = None
+        self._state = None
+        kind = "untracked_baseline" if self._untracked else "baseline"
+        self._unique_id = f"{DOMAIN}_{sanitize_zone_name(zone_name)}_{entity_type}_{kind}"
+        self.entity_id = generate_entity_id(ENTITY_ID_FORMAT, self._unique_id, hass=self.hass)
+
+    # --- HA entity properties ---
+
+    @property
+    def name(self):
+        kind = "untracked baseline" if self._untracked else "baseline"
+        return f"{self._zone_name} {kind} - {self._entity_type.capitalize()}"
+
+    @property
+    def unique_id(self):
+        return self._unique_id
+
+    @property
+    def state(self):
+        return self._state
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        return DeviceInfo(
+            identifiers={(self._entry_id,)},
+            name=self._zone_name,
+            manufacturer="Custom",
+            model="Energy and Power Monitor",
+        )
+
+    @property
+    def extra_state_attributes(self):
+        return {
+            "source": self._source.entity_id,
+            "quantile": self._quantile,
+            "window_hours": self._window_hours,
+        }
+
+    @property
+    def icon(self):
+        return "mdi:sleep"
+
+    @property
+    def state_class(self):
+        return SensorStateClass.MEASUREMENT
+
+    @property
+    def unit_of_measurement(self):
+        if self._entity_type == ENTITY_TYPE_POWER:
+            return UnitOfPower.WATT
+        return UnitOfEnergy.KILO_WATT_HOUR
+
+    @property
+    def device_class(self):
+        if self._entity_type == ENTITY_TYPE_POWER:
+            return SensorDeviceClass.POWER
+        return SensorDeviceClass.ENERGY
+
+    # --- Callbacks ---
+
+    @callback
+    def _sample(self, now=None):
+        """Feed the current source value into the estimator."""
+        value = self._source.state
+        if value is None:
+            return
+        self._estimator.add(float(value), time.monotonic())
+        estimate = self._estimator.value()
+        if estimate is None:
+            return
+        estimate = round(estimate, 1)
+        if estimate != self._state:
+            self._state = estimate
+            self.async_write_ha_state()
+
+    # --- HA lifecycle ---
+
+    async def async_added_to_hass(self):
+        """Restore the last estimate and start sampling."""
+        await super().async_added_to_hass()
+        last_state = await self.async_get_last_state()
+        if is_valid_value(last_state):
+            self._state = float(last_state.state)
+        self._estimator = WindowedQuantile(
+            self._quantile / 100, self._window_hours * 3600, time.monotonic()
+        )
+        self.async_on_remove(
+            async_track_time_interval(self.hass, self._sample, BASELINE_SAMPLE_INTERVAL)
+        )
+
+
+# ---------------------------------------------------------------------------
+# Period consumption sensor
+# ---------------------------------------------------------------------------
+
+class PeriodConsumptionSensor(RestoreEntity, SensorEntity):
+    """Consumption of an energy zone since the start of the current period.
+
+    Replaces a utility_meter helper per zone: the zone publishes the per-member
+    increases of its counters in memory (no state_changed tracking), so a
+    member reset, a briefly unavailable member or a removed member never shows
+    up as negative or doubled consumption.  Period resets are fired by the
+    integration-wide PeriodScheduler.
+    """
+
+    _attr_should_poll = False
+
+    def __init__(self, hass: HomeAssistant, zone_name, entry_id, entity_type, source, period, cron=None):
+        """Initialize the period consumption sensor."""
+        self.hass = hass
+        self._zone_name = zone_name
+        self._entry_id = entry_id
+        self._entity_type = entity_type
+        self._source = source
+        self._period = period
+        self._cron = cron
+        self._consumption = 0.0
+        # Last state written (the rounded consumption)
+        self._written = None
+        self._last_reset = None
+        self._next_reset = None
+        self._unique_id = f"{DOMAIN}_{sanitize_zone_name(zone_name)}_{entity_type}_{period}"
+        self.entity_id = generate_entity_id(ENTITY_ID_FORMAT, self._unique_id, hass=self.hass)
+
+    # --- HA entity properties ---
+
+    @property
+    def name(self):
+        return f"{self._zone_name} {self._period} - {self._entity_type.capitalize()}"
+
+    @property
+    def unique_id(self):
+        return self._unique_id
+
+    @property
+    def state(self):
+        return round(self._consumption, 3)
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        return DeviceInfo(
+            identifiers={(self._entry_id,)},
+            name=self._zone_name,
+            manufacturer="Custom",
+            model="Energy and Power Monitor",
+        )
+
+    @property
+    def extra_state_attributes(self):
+        attributes = {
+            "source": self._source.entity_id,
+            "period": self._period,
+            "next_reset": self._next_reset.isoformat() if self._next_reset else None,
+        }
+        if self._cron:
+            attributes["cron"] = self._cron
+        return attributes
+
+    @property
+    def icon(self):
+        return "mdi:calendar-clock"
+
+    @property
+    def state_class(self):
+        return SensorStateClass.TOTAL
+
+    @property
+    def last_reset(self):
+        return self._last_reset
+
+    @property
+    def unit_of_measurement(self):
+        return UnitOfEnergy.KILO_WATT_HOUR
+
+    @property
+    def device_class(self):
+        return SensorDeviceClass.ENERGY
+
+    @property
+    def extra_restore_state_data(self):
+        return RestoredExtraData({
+            "consumption": self._consumption,
+            "last_reset": self._last_reset.isoformat() if self._last_reset else None,
+            "next_reset": self._next_reset.isoformat() if self._next_reset else None,
+        })
+
+    # --- Internal helpers ---
+
+    @callback
+    def _async_write_consumption(self):
+        """Write the state only when the rounded consumption changed.
+
+        Energy zones publish an increase for every raw member update.
+        """
+        if self.state != self._written:
+            self._written = self.state
+            self.async_write_ha_state()
+
+    # --- Callbacks ---
+
+    @callback
+    def _async_increase(self, increase):
+        """Add a consumption increase of the zone."""
+        self._consumption += increase
+        self._async_write_consumption()
+
+    @callback
+    def _async_reset(self, boundary, next_reset):
+        """Start a new period (called by the scheduler in one batch for all zones)."""
+        self._consumption = 0.0
+        self._last_reset = boundary
+        self._next_reset = next_reset
+        self._written = self.state
+        self.async_write_ha_state()
+
+    # --- HA lifecycle ---
+
+    async def async_added_to_hass(self):
+        """Restore the running period and register with the shared scheduler."""
+        await super().async_added_to_hass()
+        extra = await self.async_get_last_extra_data()
+        restored = extra.as_dict() if extra else {}
+        restored_next_reset = dt_util.parse_datetime(restored.get("next_reset") or "")
+
+        runtime = get_runtime_data(self.hass)
+        try:
+            self._next_reset, unsubscribe = runtime.get_scheduler().async_register(
+                self._period, self._async_reset, self._cron
+            )
+        except (ImportError, ValueError) as exc:
+            _LOGGER.error("Zone '%s': cannot schedule %s period: %s", self._zone_name, self._period, exc)
+            return
+        self.async_on_remove(unsubscribe)
+
+        if restored_next_reset is not None and restored_next_reset > dt_util.utcnow():
+            # Still in the period that was running before the restart
+            self._consumption = float(restored.get("consumption") or 0.0)
+            self._last_reset = dt_util.parse_datetime(restored.get("last_reset") or "")
+        elif restored_next_reset is not None:
+            # The restored period ended while stopped; the current one started at its boundary
+            self._last_reset = runtime.get_scheduler().last_boundary(self._period, self._cron)
+        else:
+            self._last_reset = dt_util.utcnow()
+        self.async_on_remove(
+            runtime.async_listen_increase(self._source.entity_id, self._async_increase, replay=True)
+        )
+        # Written by the entity platform once the sensor is added
+        self._written = self.state
+
+
+# ---------------------------------------------------------------------------
+# End-of-period forecast sensor
+# ---------------------------------------------------------------------------
+
+class ZoneForecastSensor(RestoreEntity, SensorEntity):
+    """Projected consumption of an energy zone at the end of the current period.
+
+    The consumption so far plus the expected consumption of the remaining
+    hours, from a ConsumptionProfile fed with the zone's increases (O(1) per
+    increase, no history queries).  Hours of the day without a learned
+    profile use the recent rate.  The state is only written once per
+    FORECAST_INTERVAL and at period resets.
+    """
+
+    _attr_should_poll = False
+
+    def __init__(self, hass: HomeAssistant, zone_name, entry_id, entity_type, source, period):
+        """Initialize the forecast sensor."""
+        self.hass = hass
+        self._zone_name = zone_name
+        self._entry_id = entry_id
+        self._entity_type = entity_type
+        self._source = source
+        self._period = period
+        self._consumption = 0.0
+        self._next_reset = None
+        self._profile = ConsumptionProfile(FORECAST_RATE_TAU, FORECAST_PROFILE_ALPHA)
+        self._state = None
+        self._unique_id = f"{DOMAIN}_{sanitize_zone_name(zone_name)}_{entity_type}_{period}_forecast"
+        self.entity_id = generate_entity_id(ENTITY_ID_FORMAT, self._unique_id, hass=self.hass)
+
+    # --- HA entity properties ---
+
+    @property
+    def name(self):
+        return f"{self._zone_name} {self._period} forecast - {self._entity_type.capitalize()}"
+
+    @property
+    def unique_id(self):
+        return self._unique_id
+
+    @property
+    def state(self):
+        return self._state
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        return DeviceInfo(
+            identifiers={(self._entry_id,)},
+            name=self._zone_name,
+            manufacturer="Custom",
+            model="Energy and Power Monitor",
+        )
+
+    @property
+    def extra_state_attributes(self):
+        return {
+            "source": self._source.entity_id,
+            "period": self._period,
+            "consumption": round(self._consumption, 3),
+            "rate": round(self._profile.rate(dt_util.utcnow().timestamp()), 3),
+            "learned_hours": self._profile.learned,
+            "next_reset": self._next_reset.isoformat() if self._next_reset else None,
+        }
+
+    @property
+    def icon(self):
+        return "mdi:chart-timeline-variant-shimmer"
+
+    @property
+    def unit_of_measurement(self):
+        return UnitOfEnergy.KILO_WATT_HOUR
+
+    @property
+    def device_class(self):
+        return SensorDeviceClass.ENERGY
+
+    @property
+    def extra_restore_state_data(self):
+        return RestoredExtraData({
+            "consumption": self._consumption,
+            "next_reset": self._next_reset.isoformat() if self._next_reset else None,
+            "profile": self._profile.as_dict(),
+        })
+
+    # --- Internal helpers ---
+
+    def _forecast(self):
+        """Return the consumption so far plus the expected rest of the period."""
+        if self._next_reset is None:
+            return None
+        now = dt_util.utcnow()
+        local = dt_util.as_local(now)
+        timestamp = now.timestamp()
+        profile = self._profile
+        profile.advance(local.hour)
+        # Periods start at local midnight: the rest of this hour, the rest of
+        # today and the whole days until the next reset
+        remaining = profile.expected(local.hour, timestamp) * (1 - (local.minute * 60 + local.second) / 3600)
+        remaining += sum(profile.expected(hour, timestamp) for hour in range(local.hour + 1, 24))
+        days = (dt_util.as_local(self._next_reset).date() - local.date()).days - 1
+        if days > 0:
+            remaining += days * sum(profile.expected(hour, timestamp) for hour in range(24))
+        return round(self._consumption + remaining, 3)
+
+    # --- Callbacks ---
+
+    @callback
+    def _async_increase(self, increase):
+        """Count a consumption increase of the zone (published at the next tick)."""
+        now = dt_util.utcnow()
+        self._consumption += increase
+        self._profile.add(increase, now.timestamp(), dt_util.as_local(now).hour)
+
+    @callback
+    def _async_publish(self, _now=None):
+        self._state = self._forecast()
+        self.async_write_ha_state()
+
+    @callback
+    def _async_reset(self, boundary, next_reset):
+        """Start a new period (called by the scheduler in one batch for all zones)."""
+        self._consumption = 0.0
+        self._next_reset = next_reset
+        self._async_publish()
+
+    # --- HA lifecycle ---
+
+    async def async_added_to_hass(self):
+        """Restore the period and the profile, then publish at a fixed cadence."""
+        await super().async_added_to_hass()
+        extra = await self.async_get_last_extra_data()
+        restored = extra.as_dict() if extra else {}
+        restored_next_reset = dt_util.parse_datetime(restored.get("next_reset") or "")
+        if isinstance(restored.get("profile"), dict):
+            self._profile.restore(restored["profile"])
+
+        runtime = get_runtime_data(self.hass)
+        self._next_reset, unsubscribe = runtime.get_scheduler().async_register(self._period, self._async_reset)
+        self.async_on_remove(unsubscribe)
+        if restored_next_reset is not None and restored_next_reset > dt_util.utcnow():
+            # Still in the period that was running before the restart
+            self._consumption = float(restored.get("consumption") or 0.0)
+
+        self.async_on_remove(
+            runtime.async_listen_increase(self._source.entity_id, self._async_increase, replay=True)
+        )
+        self.async_on_remove(
+            async_track_time_interval(self.hass, self._async_publish, FORECAST_INTERVAL)
+        )
+        self._state = self._forecast()
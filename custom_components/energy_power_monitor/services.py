@@ -0,0 +1,107 @@
+import logging
+import voluptuous as vol
+from homeassistant.core import HomeAssistant, ServiceCall, SupportsResponse
+from homeassistant.exceptions import HomeAssistantError
+import homeassistant.helpers.config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .models import get_runtime_data
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_START_RECORDING = "start_recording"
+SERVICE_STOP_RECORDING = "stop_recording"
+SERVICE_EXPORT_RECORDING = "export_recording"
+SERVICE_REPLAY_RECORDING = "replay_recording"
+
+ATTR_FILENAME = "filename"
+ATTR_START_TIME = "start_time"
+ATTR_END_TIME = "end_time"
+ATTR_SPEED = "speed"
+
+SPEED_MAX = "max"
+
+START_RECORDING_SCHEMA = vol.Schema({vol.Optional(ATTR_FILENAME): cv.string})
+EXPORT_RECORDING_SCHEMA = vol.Schema({
+    vol.Optional(ATTR_FILENAME): cv.string,
+    vol.Required(ATTR_START_TIME): cv.datetime,
+    vol.Optional(ATTR_END_TIME): cv.datetime,
+})
+REPLAY_RECORDING_SCHEMA = vol.Schema({
+    vol.Required(ATTR_FILENAME): cv.string,
+    vol.Optional(ATTR_SPEED, default="1"): vol.Any(
+        SPEED_MAX, vol.All(vol.Coerce(float), vol.Range(min=0, min_included=False))
+    ),
+})
+
+
+def _default_filename():
+    return dt_util.now().strftime("recording_%Y%m%d_%H%M%S")
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the record/replay harness services.
+
+    The harness module is only imported once one of the services is called.
+    """
+
+    async def start_recording(call: ServiceCall):
+        from .harness import EventRecorder, recording_path
+
+        runtime = get_runtime_data(hass)
+        if runtime.recorder is not None:
+            raise HomeAssistantError(f"A recording is already running: {runtime.recorder.path}")
+        path = recording_path(hass, call.data.get(ATTR_FILENAME) or _default_filename())
+        runtime.recorder = EventRecorder(hass, path)
+        runtime.recorder.async_start()
+        return {"path": path}
+
+    async def stop_recording(call: ServiceCall):
+        runtime = get_runtime_data(hass)
+        if runtime.recorder is None:
+            raise HomeAssistantError("No recording is running")
+        recorder, runtime.recorder = runtime.recorder, None
+        return await recorder.async_stop()
+
+    async def export_recording(call: ServiceCall):
+        from .harness import async_export_from_recorder, recording_path
+
+        path = recording_path(hass, call.data.get(ATTR_FILENAME) or _default_filename())
+        start_time = dt_util.as_utc(call.data[ATTR_START_TIME])
+        end_time = dt_util.as_utc(call.data.get(ATTR_END_TIME) or dt_util.utcnow())
+        return await async_export_from_recorder(hass, path, start_time, end_time)
+
+    async def replay_recording(call: ServiceCall):
+        from .harness import async_replay, recording_path
+
+        if "recorder" in hass.config.components:
+            # Replay overwrites the states of real entities; never on an
+            # instance that records them
+            raise HomeAssistantError(
+                "Replay overwrites the states of the zone members and only runs on a test instance "
+                "without the recorder integration"
+            )
+        path = recording_path(hass, call.data[ATTR_FILENAME])
+        speed = call.data[ATTR_SPEED]
+        try:
+            return await async_replay(hass, path, None if speed == SPEED_MAX else float(speed))
+        except (OSError, ValueError) as exc:
+            raise HomeAssistantError(f"Cannot replay '{path}': {exc}") from exc
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_START_RECORDING, start_recording,
+        schema=START_RECORDING_SCHEMA, supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_STOP_RECORDING, stop_recording,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_EXPORT_RECORDING, export_recording,
+        schema=EXPORT_RECORDING_SCHEMA, supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_REPLAY_RECORDING, replay_recording,
+        schema=REPLAY_RECORDING_SCHEMA, supports_response=SupportsResponse.ONLY,
+    )
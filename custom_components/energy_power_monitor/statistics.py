@@ -0,0 +1,205 @@
+"""Hourly long-term statistics of energy zones, imported into the recorder in batches.
+
+Without this option the recorder compiles the statistics of energy zones from
+their state rows.  With statistics enabled, a zone and its untracked sensor
+instead add their consumption increases to an in-memory hourly sum.  At every
+UTC hour the rows of all zones are handed to the recorder as external
+statistics (energy_power_monitor:<zone>_energy), which the Energy dashboard
+can use as consumption source.
+"""
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable
+from datetime import datetime, timedelta
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMeanType, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_add_external_statistics, get_last_statistics
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP, UnitOfEnergy
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.util import dt as dt_util, slugify
+from homeassistant.util.unit_conversion import EnergyConverter
+
+from .const import DOMAIN, PERIOD_HOURLY
+from .models import get_runtime_data
+
+_LOGGER = logging.getLogger(__name__)
+
+HOUR = timedelta(hours=1)
+
+
+def _hour_start(now: datetime) -> datetime:
+    return dt_util.as_utc(now).replace(minute=0, second=0, microsecond=0)
+
+
+class StatisticStream:
+    """The hourly sum/state rows of one zone output."""
+
+    __slots__ = ("statistic_id", "name", "get_state", "base", "total", "emitted", "rows")
+
+    def __init__(self, statistic_id: str, name: str, get_state: Callable[[], float | None], base: float | None):
+        self.statistic_id = statistic_id
+        self.name = name
+        self.get_state = get_state
+        # Sum of the last stored row; None until it was read from the recorder
+        self.base = base
+        # Consumption since registration, and the part of it already in a row
+        self.total = 0.0
+        self.emitted = 0.0
+        self.rows: list[tuple[datetime, float | None, float]] = []
+
+    @callback
+    def add(self, increase: float) -> None:
+        """Add a consumption increase (negative values are allowed, see close)."""
+        self.total += increase
+
+    def close(self, start: datetime) -> None:
+        """Record the row of the hour starting at start.
+
+        The sum never decreases: a negative hour (an untracked sensor whose
+        zone briefly consumed more than the meter) is carried into the next.
+        """
+        self.emitted = max(self.emitted, self.total)
+        state = self.get_state()
+        row = (start, None if state is None else float(state), self.emitted)
+        if self.rows and self.rows[-1][0] == start:
+            self.rows[-1] = row
+        else:
+            self.rows.append(row)
+
+    @property
+    def sum(self) -> float | None:
+        """The sum of the latest row."""
+        return None if self.base is None else self.base + self.emitted
+
+    def diagnostics(self) -> dict:
+        """Return the state of the stream."""
+        return {
+            "statistic_id": self.statistic_id,
+            "sum": self.sum,
+            "running_hour": self.total - self.emitted,
+            "pending_rows": len(self.rows),
+        }
+
+
+class ZoneStatistics:
+    """Collect the hourly statistics of every zone and import them together."""
+
+    def __init__(self, hass: HomeAssistant):
+        self.hass = hass
+        self.batches = 0
+        self.rows_imported = 0
+        self._streams: dict[str, StatisticStream] = {}
+        # Sums of streams that were unregistered (entry reloads), so the next
+        # stream with the same ID continues without reading the database
+        self._known_sums: dict[str, float] = {}
+        self._unsubscribe_hourly = None
+        self._unsubscribe_stop = None
+
+    @callback
+    def async_register(
+        self, unique_id: str, name: str, get_state: Callable[[], float | None]
+    ) -> tuple[StatisticStream, CALLBACK_TYPE]:
+        """Start the statistics of a zone output; return its stream and an unregister callback."""
+        statistic_id = f"{DOMAIN}:{slugify(unique_id.removeprefix(f'{DOMAIN}_'))}"
+        stream = StatisticStream(statistic_id, name, get_state, self._known_sums.pop(statistic_id, None))
+        self._streams[statistic_id] = stream
+        if stream.base is None:
+            self.hass.async_create_background_task(
+                self._async_load_base(stream), f"{DOMAIN} statistics {statistic_id}"
+            )
+        if self._unsubscribe_hourly is None:
+            _, self._unsubscribe_hourly = get_runtime_data(self.hass).get_scheduler().async_register(
+                PERIOD_HOURLY, self._async_hour
+            )
+            self._unsubscribe_stop = self.hass.bus.async_listen_once(
+                EVENT_HOMEASSISTANT_STOP, self._async_on_stop
+            )
+
+        @callback
+        def unregister() -> None:
+            # Keep the consumption of the running hour
+            stream.close(_hour_start(dt_util.utcnow()))
+            self._async_import([stream])
+            if stream.sum is not None:
+                self._known_sums[statistic_id] = stream.sum
+            if self._streams.get(statistic_id) is stream:
+                del self._streams[statistic_id]
+            if not self._streams:
+                self._async_stop()
+
+        return stream, unregister
+
+    async def _async_load_base(self, stream: StatisticStream) -> None:
+        """Continue from the sum of the last row in the recorder."""
+        if "recorder" not in self.hass.config.components:
+            _LOGGER.warning(
+                "The recorder is not running; long-term statistics of '%s' are not stored", stream.name
+            )
+            return
+        instance = get_instance(self.hass)
+        if not await instance.async_db_ready:
+            return
+        last = await instance.async_add_executor_job(
+            get_last_statistics, self.hass, 1, stream.statistic_id, True, {"sum"}
+        )
+        rows = last.get(stream.statistic_id)
+        stream.base = (rows[0].get("sum") or 0.0) if rows else 0.0
+        if stream.rows:
+            self._async_import([stream])
+
+    @callback
+    def _async_hour(self, boundary: datetime, next_boundary: datetime) -> None:
+        """Close the past hour of every zone and import all rows in one batch."""
+        start = boundary - HOUR
+        for stream in self._streams.values():
+            stream.close(start)
+        self._async_import(list(self._streams.values()))
+
+    @callback
+    def _async_on_stop(self, event: Event) -> None:
+        self._unsubscribe_stop = None
+        start = _hour_start(dt_util.utcnow())
+        for stream in self._streams.values():
+            stream.close(start)
+        self._async_import(list(self._streams.values()))
+
+    @callback
+    def _async_import(self, streams: list[StatisticStream]) -> None:
+        """Hand the pending rows to the recorder (one import task per statistic)."""
+        imported = False
+        for stream in streams:
+            # Rows wait until the last stored sum is known
+            if stream.base is None or not stream.rows:
+                continue
+            rows, stream.rows = stream.rows, []
+            metadata = StatisticMetaData(
+                mean_type=StatisticMeanType.NONE,
+                has_sum=True,
+                name=stream.name,
+                source=DOMAIN,
+                statistic_id=stream.statistic_id,
+                unit_class=EnergyConverter.UNIT_CLASS,
+                unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+            )
+            statistics = []
+            for start, state, total in rows:
+                data = StatisticData(start=start, sum=stream.base + total)
+                if state is not None:
+                    data["state"] = state
+                statistics.append(data)
+            async_add_external_statistics(self.hass, metadata, statistics)
+            self.rows_imported += len(statistics)
+            imported = True
+        if imported:
+            self.batches += 1
+
+    @callback
+    def _async_stop(self) -> None:
+        if self._unsubscribe_hourly:
+            self._unsubscribe_hourly()
+            self._unsubscribe_hourly = None
+        if self._unsubscribe_stop:
+            self._unsubscribe_stop()
+            self._unsubscribe_stop = None
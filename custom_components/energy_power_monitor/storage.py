@@ -0,0 +1,371 @@
+"""Integration-owned storage for zone membership.
+
+Membership (selected entities, included zones, smart meter, membership rules)
+changes every time a member entity is renamed or removed.  Keeping it out of
+the config entries means such edits neither rewrite core.config_entries nor
+fire the entry update listeners, and saves are delayed so a burst of renames
+ends in a single write.
+Config entries only keep the zone identity (zone name and entity type).
+
+The store also owns the single entity registry subscription of all zones: an
+index from member entity ID to zones turns a rename or removal into one
+membership update per affected zone, and the listeners of those zones are
+told about it.  Zones of both types are also told when a sensor appears,
+moves or changes on one of their devices, so they can pair again.
+"""
+from __future__ import annotations
+
+import copy
+import logging
+from collections.abc import Callable
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    DOMAIN,
+    CONF_ENTITIES,
+    CONF_ENTITY_TYPE,
+    CONF_INTEGRATION_ROOMS,
+    CONF_SMART_METER_DEVICE,
+    CONF_RULES,
+    CONF_SAMPLING,
+    ENTITY_TYPE_DUAL,
+    entity_types,
+    is_smart_meter_selected,
+)
+from .models import get_runtime_data
+from .pairing import device_sensor
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_KEY = f"{DOMAIN}.membership"
+STORAGE_VERSION = 1
+# 1.2: membership rules
+STORAGE_MINOR_VERSION = 2
+SAVE_DELAY = 10
+
+# Membership keys that older versions (and the config flow) keep in entry.data
+MEMBERSHIP_KEYS = (CONF_ENTITIES, CONF_INTEGRATION_ROOMS, CONF_SMART_METER_DEVICE)
+
+MembershipListener = Callable[[set[str]], None]
+
+# Registry changes that can change the pairing of a device's sensors
+PAIRING_CHANGES = {"entity_id", "device_id", "device_class", "original_device_class", "disabled_by", "capabilities"}
+
+
+def default_membership() -> dict[str, Any]:
+    """Return the membership of a zone without any members."""
+    return {CONF_ENTITIES: [], CONF_INTEGRATION_ROOMS: [], CONF_SMART_METER_DEVICE: "", CONF_RULES: {}}
+
+
+def member_entities(zone: dict[str, Any]):
+    """Yield every entity ID a zone membership refers to."""
+    yield from zone.get(CONF_ENTITIES, ())
+    yield from zone.get(CONF_INTEGRATION_ROOMS, ())
+    meter = zone.get(CONF_SMART_METER_DEVICE)
+    if is_smart_meter_selected(meter):
+        yield meter
+
+
+def legacy_membership(entry: ConfigEntry) -> dict[str, Any]:
+    """Return the membership keys still present in a config entry's data."""
+    return {key: entry.data[key] for key in MEMBERSHIP_KEYS if key in entry.data}
+
+
+class _MembershipStore(Store):
+    """Store with the migrations of the membership file."""
+
+    async def _async_migrate_func(self, old_major_version, old_minor_version, old_data):
+        if old_major_version > STORAGE_VERSION:
+            raise NotImplementedError
+        # Minor versions only add membership keys; give older zones their defaults
+        for zone in old_data.get("zones", {}).values():
+            for key, value in default_membership().items():
+                zone.setdefault(key, value)
+        return old_data
+
+
+class ZoneMembershipStore:
+    """Membership of every zone, keyed by config entry ID."""
+
+    def __init__(self, hass: HomeAssistant):
+        self.hass = hass
+        self._store = _MembershipStore(
+            hass, STORAGE_VERSION, STORAGE_KEY, minor_version=STORAGE_MINOR_VERSION
+        )
+        self._zones: dict[str, dict[str, Any]] = {}
+        self._listeners: dict[str, list[MembershipListener]] = {}
+        # Member entity ID -> entry IDs of the zones referring to it
+        self._index: dict[str, set[str]] = {}
+        # Device of every member of a zone of both types, kept while the
+        # member is registered so a removed member can be replaced by its pair
+        self._devices: dict[str, str] = {}
+        self._unsubscribe_registry: CALLBACK_TYPE | None = None
+        self.renames = 0
+        self.removals = 0
+
+    async def async_load(self) -> None:
+        """Load the stored membership."""
+        data = await self._store.async_load()
+        if data:
+            self._zones = data.get("zones", {})
+        self._index = {}
+        for entry_id, zone in self._zones.items():
+            self._index_zone(entry_id, zone)
+
+    def has(self, entry_id: str) -> bool:
+        """Return True when membership of the zone is in the store."""
+        return entry_id in self._zones
+
+    def get(self, entry_id: str) -> dict[str, Any]:
+        """Return a copy of the membership of a zone."""
+        zone = self._zones.get(entry_id)
+        if zone is None:
+            return default_membership()
+        return copy.deepcopy(zone)
+
+    def peek(self, entry_id: str) -> dict[str, Any]:
+        """Return the membership of a zone without copying it; callers must not modify it."""
+        return self._zones.get(entry_id) or default_membership()
+
+    async def async_import_entry(self, entry: ConfigEntry) -> None:
+        """Move membership still kept in entry.data into the store.
+
+        Entries created by the config flow (and entries from older versions)
+        hand their membership over on setup.  The store is written before the
+        entry is stripped so a crash in between cannot lose the membership.
+        """
+        legacy = legacy_membership(entry)
+        if not legacy:
+            return
+        if entry.entry_id not in self._zones:
+            self._zones[entry.entry_id] = {**default_membership(), **legacy}
+            self._index_zone(entry.entry_id, self._zones[entry.entry_id])
+            await self._store.async_save(self._data_to_save())
+            _LOGGER.debug("Moved membership of '%s' into the membership store", entry.title)
+        self.hass.config_entries.async_update_entry(
+            entry, data={key: value for key, value in entry.data.items() if key not in MEMBERSHIP_KEYS}
+        )
+
+    @callback
+    def async_update(
+        self, entry_id: str, changes: dict[str, Any], source: MembershipListener | None = None
+    ) -> None:
+        """Change membership of a zone and schedule a delayed save.
+
+        Listeners of the zone are told which keys changed; source (the listener
+        that made the change itself) is skipped.
+        """
+        old = self._zones.get(entry_id) or default_membership()
+        zone = {**old, **changes}
+        changed = {key for key in zone if zone[key] != old.get(key)}
+        if not changed and entry_id in self._zones:
+            return
+        self._unindex_zone(entry_id, old)
+        self._zones[entry_id] = zone
+        self._index_zone(entry_id, zone)
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+        self._async_notify(entry_id, changed, source)
+
+    @callback
+    def async_remove(self, entry_id: str) -> None:
+        """Forget the membership of a removed zone."""
+        zone = self._zones.pop(entry_id, None)
+        if zone is not None:
+            self._unindex_zone(entry_id, zone)
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def async_listen(self, entry_id: str, listener: MembershipListener) -> CALLBACK_TYPE:
+        """Call listener with the changed keys whenever membership of the zone changes."""
+        listeners = self._listeners.setdefault(entry_id, [])
+        listeners.append(listener)
+        if self._unsubscribe_registry is None:
+            self._unsubscribe_registry = self.hass.bus.async_listen(
+                er.EVENT_ENTITY_REGISTRY_UPDATED, self._async_entity_registry_updated
+            )
+
+        @callback
+        def unsubscribe() -> None:
+            listeners.remove(listener)
+            if not listeners:
+                self._listeners.pop(entry_id, None)
+            if not self._listeners and self._unsubscribe_registry is not None:
+                self._unsubscribe_registry()
+                self._unsubscribe_registry = None
+
+        return unsubscribe
+
+    def listener_count(self) -> int:
+        """Return the number of registered membership listeners."""
+        return sum(len(listeners) for listeners in self._listeners.values())
+
+    def zones_of(self, entity_id: str) -> set[str]:
+        """Return the entry IDs of the zones whose membership refers to entity_id."""
+        return set(self._index.get(entity_id, ()))
+
+    @callback
+    def _async_notify(self, entry_id: str, changed: set[str], source: MembershipListener | None = None) -> None:
+        for listener in list(self._listeners.get(entry_id, ())):
+            if listener != source:
+                listener(changed)
+
+    # --- Member index ---
+
+    def _is_dual(self, entry_id: str) -> bool:
+        entry = self.hass.config_entries.async_get_entry(entry_id)
+        return entry is not None and entry.data.get(CONF_ENTITY_TYPE) == ENTITY_TYPE_DUAL
+
+    def _index_zone(self, entry_id: str, zone: dict[str, Any]) -> None:
+        dual = self._is_dual(entry_id)
+        entity_registry = er.async_get(self.hass)
+        for entity_id in member_entities(zone):
+            self._index.setdefault(entity_id, set()).add(entry_id)
+            if dual and entity_id not in self._devices:
+                entity = entity_registry.async_get(entity_id)
+                if entity is not None and entity.device_id:
+                    self._devices[entity_id] = entity.device_id
+
+    def _unindex_zone(self, entry_id: str, zone: dict[str, Any]) -> None:
+        for entity_id in member_entities(zone):
+            entries = self._index.get(entity_id)
+            if entries is not None:
+                entries.discard(entry_id)
+                if not entries:
+                    del self._index[entity_id]
+                    self._devices.pop(entity_id, None)
+
+    def _zones_of_devices(self, device_ids) -> set[str]:
+        """Return the zones of both types with a stored member on one of the devices."""
+        entry_ids = set()
+        for entity_id, device_id in self._devices.items():
+            if device_id in device_ids:
+                entry_ids.update(entry_id for entry_id in self._index[entity_id] if self._is_dual(entry_id))
+        return entry_ids
+
+    # --- Entity registry ---
+
+    @callback
+    def _async_entity_registry_updated(self, event: Event) -> None:
+        """Follow renames and removals of members in every zone referring to them."""
+        action = event.data["action"]
+        entity_id = event.data["entity_id"]
+        changes = event.data.get("changes", {})
+        updated = set()
+        if action == "remove":
+            updated = self._async_member_removed(entity_id)
+        elif action == "update" and "entity_id" in changes:
+            updated = self._async_member_renamed(changes["entity_id"], entity_id)
+        if action == "remove" or not entity_id.startswith("sensor."):
+            return
+        if action == "update" and not PAIRING_CHANGES.intersection(changes):
+            return
+        entity = er.async_get(self.hass).async_get(entity_id)
+        devices = {entity.device_id if entity else None, changes.get("device_id")} - {None}
+        if not devices:
+            return
+        if entity_id in self._devices and entity.device_id:
+            self._devices[entity_id] = entity.device_id
+        for entry_id in self._zones_of_devices(devices) - updated:
+            self._async_notify(entry_id, {CONF_ENTITIES, CONF_INTEGRATION_ROOMS, CONF_SMART_METER_DEVICE})
+
+    @callback
+    def _async_member_removed(self, entity_id: str) -> set[str]:
+        """Drop a removed entity from the selected entities.
+
+        Included zones and smart meters stay selected: a zone sensor is also
+        removed while its zone is renamed, and the zone re-expands without it
+        until it is back.
+        """
+        entry_ids = self.zones_of(entity_id)
+        device_id = self._devices.get(entity_id)
+        for entry_id in entry_ids:
+            entities = self._zones[entry_id][CONF_ENTITIES]
+            if entity_id not in entities:
+                meter = self._zones[entry_id][CONF_SMART_METER_DEVICE] == entity_id
+                self._async_notify(entry_id, {CONF_SMART_METER_DEVICE if meter else CONF_INTEGRATION_ROOMS})
+                continue
+            # Zones of both types keep the device while it has a sensor of the other type
+            replacement = device_id and self._is_dual(entry_id) and device_sensor(
+                er.async_get(self.hass), device_id, *entity_types(ENTITY_TYPE_DUAL)
+            )
+            if replacement:
+                _LOGGER.info(
+                    "Tracked entity '%s' was removed; zone '%s' continues with '%s'.",
+                    entity_id,
+                    self._zone_title(entry_id),
+                    replacement,
+                )
+            else:
+                _LOGGER.warning(
+                    "Tracked entity '%s' was removed; removing from zone '%s' automatically.",
+                    entity_id,
+                    self._zone_title(entry_id),
+                )
+            members = [replacement if member == entity_id else member for member in entities]
+            self.async_update(entry_id, {CONF_ENTITIES: list(dict.fromkeys(m for m in members if m))})
+            self.removals += 1
+        return entry_ids
+
+    @callback
+    def _async_member_renamed(self, old_entity_id: str, new_entity_id: str) -> set[str]:
+        """Replace a renamed entity in every zone, including its sampling settings."""
+        entry_ids = self.zones_of(old_entity_id)
+        for entry_id in entry_ids:
+            zone = self._zones[entry_id]
+            _LOGGER.info(
+                "Tracked entity renamed '%s' → '%s' in zone '%s'; updating reference.",
+                old_entity_id,
+                new_entity_id,
+                self._zone_title(entry_id),
+            )
+            changes = {
+                key: [new_entity_id if member == old_entity_id else member for member in zone[key]]
+                for key in (CONF_ENTITIES, CONF_INTEGRATION_ROOMS)
+            }
+            if zone[CONF_SMART_METER_DEVICE] == old_entity_id:
+                changes[CONF_SMART_METER_DEVICE] = new_entity_id
+            entry = self.hass.config_entries.async_get_entry(entry_id)
+            if entry and old_entity_id in entry.options.get(CONF_SAMPLING, {}):
+                # Before the membership update, so the zone finds the renamed
+                # sampling settings when it follows the rename
+                sampling = dict(entry.options[CONF_SAMPLING])
+                sampling[new_entity_id] = sampling.pop(old_entity_id)
+                self.hass.config_entries.async_update_entry(
+                    entry, options={**entry.options, CONF_SAMPLING: sampling}
+                )
+            self.async_update(entry_id, changes)
+            self.renames += 1
+        return entry_ids
+
+    def _zone_title(self, entry_id: str) -> str:
+        entry = self.hass.config_entries.async_get_entry(entry_id)
+        return entry.title if entry else entry_id
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        return {"zones": self._zones}
+
+
+async def async_get_membership_store(hass: HomeAssistant) -> ZoneMembershipStore:
+    """Return the loaded membership store, loading it on first use."""
+    runtime = get_runtime_data(hass)
+    if runtime.membership is None:
+        store = ZoneMembershipStore(hass)
+        await store.async_load()
+        # Another caller may have finished loading while we were waiting
+        if runtime.membership is None:
+            runtime.membership = store
+    return runtime.membership
+
+
+def entry_membership(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """Return the membership of a zone, also for entries that were not set up yet."""
+    store = get_runtime_data(hass).membership
+    if store is not None and store.has(entry.entry_id):
+        return store.get(entry.entry_id)
+    return {**default_membership(), **legacy_membership(entry)}
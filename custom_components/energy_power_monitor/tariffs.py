@@ -0,0 +1,94 @@
+"""Shared price (tariff) entities for the zone cost sensors.
+
+Every price entity is tracked once, however many zones use it: a single
+state-change subscription keeps its current price in memory and tells the
+cost sensors just before the price changes, so they can close the running
+interval at the old price.
+"""
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable
+
+from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, State, callback
+from homeassistant.helpers.event import async_track_state_change_event
+
+_LOGGER = logging.getLogger(__name__)
+
+# Price units are <currency>/<energy unit>; prices are kept per kWh
+ENERGY_UNIT_FACTORS = {"Wh": 1000.0, "kWh": 1.0, "MWh": 0.001}
+
+
+class Tariff:
+    """The current price of one price entity."""
+
+    __slots__ = ("entity_id", "price", "currency", "listeners", "unsubscribe")
+
+    def __init__(self, entity_id: str):
+        self.entity_id = entity_id
+        # Last valid price per kWh; kept while the entity is unavailable
+        self.price: float | None = None
+        self.currency: str | None = None
+        self.listeners: list[Callable[[], None]] = []
+        self.unsubscribe: CALLBACK_TYPE | None = None
+
+    def update(self, state: State | None) -> None:
+        """Read the price and currency from the state of the price entity."""
+        if state is None or state.state in (STATE_UNKNOWN, STATE_UNAVAILABLE):
+            return
+        try:
+            price = float(state.state)
+        except ValueError:
+            _LOGGER.warning("Price entity '%s' has a non-numeric state: %s", self.entity_id, state.state)
+            return
+        currency, _, energy_unit = (state.attributes.get("unit_of_measurement") or "").partition("/")
+        self.price = price * ENERGY_UNIT_FACTORS.get(energy_unit.strip(), 1.0)
+        self.currency = currency.strip() or None
+
+
+class TariffTracker:
+    """Keep the prices of every price entity used by a cost sensor current."""
+
+    def __init__(self, hass: HomeAssistant):
+        self.hass = hass
+        self._tariffs: dict[str, Tariff] = {}
+
+    @callback
+    def async_track(self, entity_id: str, before_change: Callable[[], None]) -> tuple[Tariff, CALLBACK_TYPE]:
+        """Follow a price entity; return its tariff and an unsubscribe callback.
+
+        before_change is called whenever a new state arrives, while the tariff
+        still holds the previous price.
+        """
+        tariff = self._tariffs.get(entity_id)
+        if tariff is None:
+            tariff = self._tariffs[entity_id] = Tariff(entity_id)
+            tariff.update(self.hass.states.get(entity_id))
+            tariff.unsubscribe = async_track_state_change_event(
+                self.hass, entity_id, self._async_price_changed
+            )
+        tariff.listeners.append(before_change)
+
+        @callback
+        def unsubscribe() -> None:
+            tariff.listeners.remove(before_change)
+            if not tariff.listeners:
+                tariff.unsubscribe()
+                del self._tariffs[entity_id]
+
+        return tariff, unsubscribe
+
+    @property
+    def listener_count(self) -> int:
+        """Number of cost sensors following a price entity."""
+        return sum(len(tariff.listeners) for tariff in self._tariffs.values())
+
+    @callback
+    def _async_price_changed(self, event: Event) -> None:
+        tariff = self._tariffs.get(event.data["entity_id"])
+        if tariff is None:
+            return
+        for listener in list(tariff.listeners):
+            listener()
+        tariff.update(event.data.get("new_state"))
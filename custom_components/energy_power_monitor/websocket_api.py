@@ -0,0 +1,35 @@
+import voluptuous as vol
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN
+from .models import get_runtime_data
+
+
+@callback
+def async_setup_websocket_api(hass: HomeAssistant) -> None:
+    """Register the zone tree websocket commands."""
+    websocket_api.async_register_command(hass, ws_get_zones)
+    websocket_api.async_register_command(hass, ws_subscribe_zones)
+
+
+@websocket_api.websocket_command({vol.Required("type"): f"{DOMAIN}/zones"})
+@callback
+def ws_get_zones(hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict) -> None:
+    """Return the complete zone tree (zones, members, sub-zones, untracked sensors, values)."""
+    connection.send_result(msg["id"], get_runtime_data(hass).zone_tree())
+
+
+@websocket_api.websocket_command({vol.Required("type"): f"{DOMAIN}/subscribe_zones"})
+@callback
+def ws_subscribe_zones(hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict) -> None:
+    """Send the zone tree once, then batched {entity_id: value} deltas of changed zones."""
+    runtime = get_runtime_data(hass)
+
+    @callback
+    def forward_deltas(deltas: dict) -> None:
+        connection.send_message(websocket_api.event_message(msg["id"], {"zones": deltas}))
+
+    connection.subscriptions[msg["id"]] = runtime.async_subscribe_deltas(forward_deltas)
+    connection.send_result(msg["id"])
+    connection.send_message(websocket_api.event_message(msg["id"], {"snapshot": runtime.zone_tree()}))
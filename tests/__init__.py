@@ -0,0 +1 @@
+"""Tests for the Energy and Power Monitor integration."""
@@ -0,0 +1,61 @@
+"""Helpers shared by the Energy and Power Monitor tests."""
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.energy_power_monitor.const import (
+    DOMAIN,
+    CONF_ENTITIES,
+    CONF_ENTITY_TYPE,
+    CONF_INTEGRATION_ROOMS,
+    CONF_ROOM,
+    CONF_SMART_METER_DEVICE,
+    ENTITY_TYPE_POWER,
+)
+
+
+def zone_entry(
+    name: str,
+    entities: list[str],
+    entity_type: str = ENTITY_TYPE_POWER,
+    integration_zones: list[str] | None = None,
+    smart_meter: str = "",
+    options: dict | None = None,
+) -> MockConfigEntry:
+    """Return the config entry of a zone, as created by the config flow."""
+    return MockConfigEntry(
+        domain=DOMAIN,
+        title=f"{entity_type.capitalize()} - {name}",
+        data={
+            CONF_ROOM: name,
+            CONF_SMART_METER_DEVICE: smart_meter,
+            CONF_ENTITY_TYPE: entity_type,
+            CONF_ENTITIES: entities,
+            CONF_INTEGRATION_ROOMS: integration_zones or [],
+        },
+        options=options or {},
+    )
+
+
+def add_member(hass: HomeAssistant, entity_id: str, state, **attributes) -> str:
+    """Register a member sensor of another integration and set its state."""
+    domain, object_id = entity_id.split(".")
+    entry = er.async_get(hass).async_get_or_create(domain, "test", object_id, suggested_object_id=object_id)
+    hass.states.async_set(entry.entity_id, str(state), attributes)
+    return entry.entity_id
+
+
+async def async_settle(hass: HomeAssistant, levels: int = 3) -> None:
+    """Wait until an update reached the top of a zone tree.
+
+    State change callbacks are scheduled with call_soon, so every zone level
+    takes one more loop iteration than async_block_till_done waits for.
+    """
+    for _ in range(levels):
+        await hass.async_block_till_done()
+
+
+async def async_setup_zone(hass: HomeAssistant, entry: MockConfigEntry) -> None:
+    """Add a zone entry and set it up."""
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
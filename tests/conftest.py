@@ -0,0 +1,10 @@
+"""Shared fixtures for the Energy and Power Monitor tests."""
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(request):
+    """Load the integration from custom_components in every test that runs Home Assistant."""
+    if "hass" in request.fixturenames:
+        request.getfixturevalue("enable_custom_integrations")
+    yield
@@ -0,0 +1,29 @@
+"""Overload alerts of zones."""
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.energy_power_monitor.const import AGGREGATION_EVENT, CONF_AGGREGATION, CONF_ALERT_THRESHOLD
+
+from .common import add_member, async_settle, async_setup_zone, zone_entry
+
+ALERT = "binary_sensor.energy_power_monitor_kitchen_power_alert"
+OPTIONS = {CONF_ALERT_THRESHOLD: 1000, CONF_AGGREGATION: AGGREGATION_EVENT}
+
+
+async def test_alert_follows_renamed_zone(hass: HomeAssistant) -> None:
+    """The alert keeps following its zone after the zone sensor got another entity ID."""
+    oven = add_member(hass, "sensor.oven_power", 200)
+    await async_setup_zone(hass, zone_entry("Kitchen", [oven], options=OPTIONS))
+    await async_settle(hass)
+    assert hass.states.get(ALERT).state == "off"
+
+    er.async_get(hass).async_update_entity(
+        "sensor.energy_power_monitor_kitchen_power", new_entity_id="sensor.kitchen_total_power"
+    )
+    await async_settle(hass)
+    assert hass.states.get(ALERT).attributes["source"] == "sensor.kitchen_total_power"
+
+    hass.states.async_set(oven, "1500")
+    await async_settle(hass)
+    assert hass.states.get("sensor.kitchen_total_power").state == "1500.0"
+    assert hass.states.get(ALERT).state == "on"
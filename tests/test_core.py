@@ -0,0 +1,183 @@
+"""Zone arithmetic of core.py, without Home Assistant.
+
+core.py, accumulator.py and const.py are loaded as a bare package, without
+the integration's __init__ (which imports Home Assistant).
+"""
+import importlib
+import math
+import random
+import subprocess
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+PACKAGE_DIR = Path(__file__).parents[1] / "custom_components" / "energy_power_monitor"
+OFFLINE_PACKAGE = "zone_core"
+
+
+def _load_offline(package: str = OFFLINE_PACKAGE):
+    """Import the HA-free modules of the integration under another package name."""
+    if package not in sys.modules:
+        module = types.ModuleType(package)
+        module.__path__ = [str(PACKAGE_DIR)]
+        sys.modules[package] = module
+    return importlib.import_module(f"{package}.core"), importlib.import_module(f"{package}.const")
+
+
+core, const = _load_offline()
+ZoneModel, ZoneSum = core.ZoneModel, core.ZoneSum
+expand_members, parse_value, untracked_value = core.expand_members, core.parse_value, core.untracked_value
+ENTITY_TYPE_ENERGY, ENTITY_TYPE_POWER = const.ENTITY_TYPE_ENERGY, const.ENTITY_TYPE_POWER
+
+KITCHEN = "sensor.energy_power_monitor_kitchen_power"
+KITCHEN_UNTRACKED = "sensor.energy_power_monitor_kitchen_untracked_power"
+GARAGE = "sensor.energy_power_monitor_garage_power"
+
+
+def test_zone_sum_updates() -> None:
+    """Only valid values count; a member replaces its previous value."""
+    zone = ZoneSum()
+    zone.update("sensor.a", 10.0)
+    zone.update("sensor.b", 2.5)
+    assert (zone.total, zone.valid, len(zone)) == (12.5, 2, 2)
+
+    zone.update("sensor.a", 4.0)
+    assert (zone.total, zone.valid) == (6.5, 2)
+
+    # Missing and negative values are skipped but the member stays known
+    zone.update("sensor.a", None)
+    zone.update("sensor.b", -1.0)
+    assert (zone.total, zone.valid, len(zone)) == (0.0, 0, 2)
+    assert "sensor.a" in zone
+    assert zone.get("sensor.b") is None
+
+    zone.update("sensor.b", 3.0)
+    assert (zone.total, zone.get("sensor.b")) == (3.0, 3.0)
+
+
+def test_zone_sum_discard() -> None:
+    zone = ZoneSum()
+    zone.update("sensor.a", 1.0)
+    zone.update("sensor.b", None)
+    zone.discard("sensor.a")
+    zone.discard("sensor.b")
+    zone.discard("sensor.unknown")
+    assert (zone.total, zone.valid, len(zone)) == (0.0, 0, 0)
+
+
+def test_zone_sum_resum(monkeypatch: pytest.MonkeyPatch) -> None:
+    """The running total is recomputed exactly every RESUM_INTERVAL updates."""
+    monkeypatch.setattr(core, "RESUM_INTERVAL", 10)
+    zone = ZoneSum()
+    zone.update("sensor.a", 0.1)
+    # A huge value coming and going swallows the small one in the running total
+    for _ in range(4):
+        zone.update("sensor.b", 1e16)
+        zone.update("sensor.b", None)
+    assert zone.total == 0.0
+    zone.update("sensor.a", 0.2)
+    assert zone.total == 0.2
+
+
+def test_expand_members() -> None:
+    """Included zones add their zone and untracked sensors, if they exist."""
+    registered = {KITCHEN, KITCHEN_UNTRACKED}
+    members = expand_members(["sensor.plug_power"], [KITCHEN, GARAGE], ENTITY_TYPE_POWER, registered.__contains__)
+    assert members == [KITCHEN, KITCHEN_UNTRACKED, "sensor.plug_power"]
+
+    assert expand_members(["sensor.b", "sensor.a"], [], ENTITY_TYPE_POWER, registered.__contains__) == [
+        "sensor.b",
+        "sensor.a",
+    ]
+    assert expand_members(None, None, ENTITY_TYPE_POWER, registered.__contains__) == []
+
+
+def test_expand_members_cumulative() -> None:
+    """Energy zones include other zones without their untracked sensor."""
+    kitchen = "sensor.energy_power_monitor_kitchen_energy"
+    registered = {kitchen, "sensor.energy_power_monitor_kitchen_untracked_energy"}
+    members = expand_members([], [kitchen], ENTITY_TYPE_ENERGY, registered.__contains__, cumulative=True)
+    assert members == [kitchen]
+
+
+@pytest.mark.parametrize(
+    ("meter", "zone_value", "expected"),
+    [
+        (500.0, 120.0, 380.0),
+        (100.0, 33.33, 66.7),
+        (100.0, 150.0, 0),
+        (None, 10.0, None),
+        (10.0, None, None),
+    ],
+)
+def test_untracked_value(meter, zone_value, expected) -> None:
+    assert untracked_value(meter, zone_value) == expected
+
+
+def test_importable_without_home_assistant() -> None:
+    """The zone arithmetic loads in an interpreter where Home Assistant cannot be imported."""
+    script = (
+        "import sys; sys.modules['homeassistant'] = None; "
+        f"sys.path.insert(0, {str(Path(__file__).parent)!r}); "
+        "import test_core; print(test_core.untracked_value(5.0, 2.0))"
+    )
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=False)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "3.0"
+
+
+def test_zone_sum_fuzz() -> None:
+    """Random updates, gaps and removals keep the running sum equal to an exact sum."""
+    rng = random.Random(2024)
+    members = [f"sensor.plug_{n}_power" for n in range(8)]
+    states = [None, "", "unknown", "unavailable", "nan", "inf", "-5", "abc"]
+    zone, expected = ZoneSum(), {}
+    for _ in range(20000):
+        entity_id = rng.choice(members)
+        if rng.random() < 0.05:
+            zone.discard(entity_id)
+            expected.pop(entity_id, None)
+            continue
+        if rng.random() < 0.1:
+            state = rng.choice(states)
+        else:
+            state = str(rng.uniform(0, 10 ** rng.randint(0, 6)))
+        value = parse_value(state)
+        zone.update(entity_id, value)
+        expected[entity_id] = value if value is not None and value >= 0 else None
+        valid = [value for value in expected.values() if value is not None]
+        assert zone.valid == len(valid)
+        assert math.isclose(zone.total, math.fsum(valid), rel_tol=1e-9, abs_tol=1e-6)
+
+
+def test_energy_zone_fuzz() -> None:
+    """An energy zone never drops and counts exactly the increases it returned."""
+    rng = random.Random(2025)
+    members = [f"sensor.plug_{n}_energy" for n in range(5)]
+    counters = dict.fromkeys(members, 100.0)
+    model = ZoneModel(cumulative=True)
+    for entity_id in members:
+        model.add(entity_id, counters[entity_id])
+    model.start()
+    started, counted = model.total, 0.0
+    for _ in range(5000):
+        entity_id = rng.choice(members)
+        roll = rng.random()
+        if roll < 0.02:
+            counters[entity_id] = rng.uniform(0, 1)  # Meter reset
+        elif roll < 0.05:
+            counters[entity_id] *= 0.99  # Jitter
+        elif roll < 0.1:
+            counted += model.update(entity_id, None)  # Briefly unavailable
+            continue
+        else:
+            counters[entity_id] += rng.uniform(0, 2)
+        previous = model.total
+        increase = model.update(entity_id, counters[entity_id])
+        counted += increase
+        assert increase >= 0
+        assert model.total >= previous
+    assert math.isclose(model.total, started + counted)
+    assert model.increases.resets > 0 and model.increases.jitter > 0
@@ -0,0 +1,113 @@
+"""Increase accumulation of nested energy zones."""
+from unittest.mock import patch
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.energy_power_monitor.const import CONF_PERIODS, ENTITY_TYPE_ENERGY, PERIOD_DAILY
+from custom_components.energy_power_monitor.models import get_runtime_data
+from custom_components.energy_power_monitor.sensor import PeriodConsumptionSensor
+
+from .common import add_member, async_settle, async_setup_zone, zone_entry
+
+KITCHEN = "sensor.energy_power_monitor_kitchen_energy"
+KITCHEN_UNTRACKED = "sensor.energy_power_monitor_kitchen_untracked_energy"
+HOUSE = "sensor.energy_power_monitor_house_energy"
+
+
+def _value(hass: HomeAssistant, entity_id: str) -> float:
+    return float(hass.states.get(entity_id).state)
+
+
+async def _async_set(hass: HomeAssistant, entity_id: str, value: float) -> None:
+    hass.states.async_set(entity_id, str(value))
+    await async_settle(hass)
+
+
+async def _async_setup_nested(hass: HomeAssistant) -> tuple[str, str, str]:
+    """Kitchen (two plugs and a meter) included in House (one more plug)."""
+    fridge = add_member(hass, "sensor.fridge_energy", 10.0)
+    oven = add_member(hass, "sensor.oven_energy", 50.0)
+    meter = add_member(hass, "sensor.kitchen_meter_energy", 100.0)
+    lamp = add_member(hass, "sensor.lamp_energy", 5.0)
+    await async_setup_zone(hass, zone_entry("Kitchen", [fridge, oven], ENTITY_TYPE_ENERGY, smart_meter=meter))
+    await async_settle(hass)
+    await async_setup_zone(hass, zone_entry("House", [lamp], ENTITY_TYPE_ENERGY, integration_zones=[KITCHEN]))
+    await async_settle(hass)
+    return fridge, oven, meter
+
+
+async def test_untracked_energy_not_accumulated(hass: HomeAssistant) -> None:
+    """An energy zone adds included zones without their untracked sensor."""
+    fridge, _, meter = await _async_setup_nested(hass)
+    house = get_runtime_data(hass).zones[HOUSE]
+    assert KITCHEN in house.tracked_entities
+    assert KITCHEN_UNTRACKED not in house.tracked_entities
+
+    kitchen, total = _value(hass, KITCHEN), _value(hass, HOUSE)
+    # The zone counts before the meter: the untracked energy drops by more
+    # than 10%, which must not count as a reset anywhere up the tree
+    await _async_set(hass, fridge, 30.0)
+    assert _value(hass, KITCHEN_UNTRACKED) == 20.0
+    assert _value(hass, KITCHEN) == kitchen + 20
+    assert _value(hass, HOUSE) == total + 20
+    await _async_set(hass, meter, 120.0)
+    assert _value(hass, KITCHEN_UNTRACKED) == 40.0
+    assert _value(hass, HOUSE) == total + 20
+
+
+async def test_member_jitter_and_reset(hass: HomeAssistant) -> None:
+    """Jitter is ignored and a meter reset counts from 0, in the zone and its parent."""
+    fridge, oven, _ = await _async_setup_nested(hass)
+    kitchen, total = _value(hass, KITCHEN), _value(hass, HOUSE)
+
+    # Jitter: a small drop is ignored until the member climbs above its last value
+    await _async_set(hass, fridge, 9.5)
+    assert (_value(hass, KITCHEN), _value(hass, HOUSE)) == (kitchen, total)
+    await _async_set(hass, fridge, 10.0)
+    assert (_value(hass, KITCHEN), _value(hass, HOUSE)) == (kitchen, total)
+    await _async_set(hass, fridge, 11.0)
+    assert (_value(hass, KITCHEN), _value(hass, HOUSE)) == (kitchen + 1, total + 1)
+
+    # Reset: the oven's counter restarts; its new value is consumption
+    await _async_set(hass, oven, 2.0)
+    assert (_value(hass, KITCHEN), _value(hass, HOUSE)) == (kitchen + 3, total + 3)
+    await _async_set(hass, oven, 4.0)
+    assert (_value(hass, KITCHEN), _value(hass, HOUSE)) == (kitchen + 5, total + 5)
+
+    increases = get_runtime_data(hass).zones[KITCHEN]._model.increases
+    assert (increases.resets, increases.jitter) == (1, 1)
+
+
+async def test_late_increase_subscribers_get_the_startup_increases(hass: HomeAssistant) -> None:
+    """Sensors subscribing after a zone started are sent what it published so far."""
+    runtime = get_runtime_data(hass)
+    runtime.async_increase(KITCHEN, 1.5)
+    runtime.async_increase(KITCHEN, 0.5)
+
+    replayed, live = [], []
+    runtime.async_listen_increase(KITCHEN, replayed.append, replay=True)
+    runtime.async_listen_increase(KITCHEN, live.append)
+    runtime.async_increase(KITCHEN, 1.0)
+    assert replayed == [2.0, 1.0]
+    assert live == [1.0]
+
+    # A restarted zone starts over
+    runtime.async_reset_increases(KITCHEN)
+    late = []
+    runtime.async_listen_increase(KITCHEN, late.append, replay=True)
+    assert late == []
+
+
+async def test_period_sensor_writes_rounded_changes(hass: HomeAssistant) -> None:
+    """Increases below the displayed precision do not write the period sensor."""
+    plug = add_member(hass, "sensor.plug_energy", 1.0)
+    await async_setup_zone(hass, zone_entry("Desk", [plug], ENTITY_TYPE_ENERGY, options={CONF_PERIODS: [PERIOD_DAILY]}))
+    await async_settle(hass)
+
+    with patch.object(PeriodConsumptionSensor, "async_write_ha_state", autospec=True) as write:
+        for step in range(1, 5):
+            await _async_set(hass, plug, 1.0 + step * 0.0001)
+        assert write.call_count == 0
+        await _async_set(hass, plug, 1.0011)
+        assert write.call_count == 1
+        assert write.call_args.args[0].state == 0.001
@@ -0,0 +1,31 @@
+"""The untracked sensor of a zone follows its smart meter."""
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.energy_power_monitor.models import get_runtime_data
+
+from .common import add_member, async_settle, async_setup_zone, zone_entry
+
+UNTRACKED = "sensor.energy_power_monitor_kitchen_untracked_power"
+
+
+async def test_removed_smart_meter(hass: HomeAssistant) -> None:
+    """A removed smart meter stays selected; the untracked sensor is unknown."""
+    plug = add_member(hass, "sensor.plug_power", 20)
+    meter = add_member(hass, "sensor.meter_power", 500)
+    entry = zone_entry("Kitchen", [plug], smart_meter=meter)
+    await async_setup_zone(hass, entry)
+    await async_settle(hass)
+    assert hass.states.get(UNTRACKED).state == "480.0"
+
+    er.async_get(hass).async_remove(meter)
+    await async_settle(hass)
+    assert hass.states.get(UNTRACKED).state == "unknown"
+    hass.states.async_remove(meter)
+    await async_settle(hass)
+    assert get_runtime_data(hass).membership.get(entry.entry_id)["smart_meter_device"] == meter
+
+    # The meter comes back under the same entity ID
+    assert add_member(hass, meter, 600) == meter
+    await async_settle(hass)
+    assert hass.states.get(UNTRACKED).state == "580.0"
@@ -0,0 +1,89 @@
+"""Repeated member renames and zone reloads must not leak listeners or change membership."""
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.energy_power_monitor.const import (
+    DOMAIN,
+    AGGREGATION_EVENT,
+    CONF_AGGREGATION,
+    ENTITY_TYPE_ENERGY,
+)
+from custom_components.energy_power_monitor.models import get_runtime_data
+
+from .common import add_member, async_setup_zone, zone_entry
+
+CYCLES = 25
+UPDATES_PER_CYCLE = 20
+# Bursts of updates would switch the zones to the interval timer, which
+# counts as a subscription; keep the counts comparable
+OPTIONS = {CONF_AGGREGATION: AGGREGATION_EVENT}
+
+
+def _registry_snapshot(hass: HomeAssistant) -> dict[str, tuple]:
+    return {
+        entity.entity_id: (entity.platform, entity.unique_id, entity.config_entry_id)
+        for entity in er.async_get(hass).entities.values()
+    }
+
+
+def _membership_snapshot(hass: HomeAssistant) -> dict[str, dict]:
+    membership = get_runtime_data(hass).membership
+    return {entry.entry_id: membership.get(entry.entry_id) for entry in hass.config_entries.async_entries(DOMAIN)}
+
+
+async def _async_rename(hass: HomeAssistant, old_entity_id: str, new_entity_id: str) -> None:
+    """Rename a member the way its integration would: registry first, then its state."""
+    state = hass.states.get(old_entity_id)
+    er.async_get(hass).async_update_entity(old_entity_id, new_entity_id=new_entity_id)
+    await hass.async_block_till_done()
+    hass.states.async_remove(old_entity_id)
+    hass.states.async_set(new_entity_id, state.state, state.attributes)
+    await hass.async_block_till_done()
+
+
+async def test_rename_reload_cycles(hass: HomeAssistant) -> None:
+    """After many rename and reload cycles everything is back where it started."""
+    plugs = [add_member(hass, f"sensor.plug_{n}_power", 10 * (n + 1)) for n in range(3)]
+    meter = add_member(hass, "sensor.meter_power", 500)
+    energy = [add_member(hass, f"sensor.plug_{n}_energy", 100.0) for n in range(2)]
+    entries = [
+        zone_entry("Kitchen", plugs[:2], smart_meter=meter, options=OPTIONS),
+        zone_entry(
+            "House", plugs[2:], integration_zones=["sensor.energy_power_monitor_kitchen_power"], options=OPTIONS
+        ),
+        zone_entry("Plugs", energy, entity_type=ENTITY_TYPE_ENERGY, options=OPTIONS),
+    ]
+    for entry in entries:
+        await async_setup_zone(hass, entry)
+    await hass.async_block_till_done()
+
+    runtime = get_runtime_data(hass)
+    listeners = runtime.listener_counts()
+    membership = _membership_snapshot(hass)
+    registry = _registry_snapshot(hass)
+    renamed = [*plugs, *energy]
+
+    for cycle in range(CYCLES):
+        for update in range(UPDATES_PER_CYCLE):
+            entity_id = energy[update % len(energy)]
+            hass.states.async_set(entity_id, str(float(hass.states.get(entity_id).state) + 0.5))
+            hass.states.async_set(plugs[update % len(plugs)], str(update))
+        await hass.async_block_till_done()
+
+        assert await hass.config_entries.async_reload(entries[cycle % len(entries)].entry_id)
+        entity_id = renamed[cycle % len(renamed)]
+        await _async_rename(hass, entity_id, f"{entity_id}_renamed")
+        await _async_rename(hass, f"{entity_id}_renamed", entity_id)
+
+    assert runtime.listener_counts() == listeners
+    assert _membership_snapshot(hass) == membership
+    assert _registry_snapshot(hass) == registry
+    assert runtime.membership.renames == 2 * CYCLES
+    # The zones still follow their members
+    hass.states.async_set(plugs[0], "1")
+    hass.states.async_set(plugs[1], "2")
+    hass.states.async_set(plugs[2], "3")
+    await hass.async_block_till_done()
+    assert hass.states.get("sensor.energy_power_monitor_kitchen_power").state == "3.0"
+    # plug 2, the kitchen zone and the kitchen's untracked power (meter - kitchen)
+    assert hass.states.get("sensor.energy_power_monitor_house_power").state == "503.0"
@@ -0,0 +1,43 @@
+"""Cold-start budget of the integration with many zones."""
+import time
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.energy_power_monitor.models import LISTENED_EVENTS, get_runtime_data
+
+from .common import add_member, async_setup_zone, zone_entry
+
+ZONES = 200
+# Generous enough for slow CI runners; a per-zone registry scan or listener
+# makes setup grow quadratically and blows through it
+STARTUP_BUDGET = 20.0
+
+
+async def test_startup_200_zones(hass: HomeAssistant) -> None:
+    """200 zones set up within the budget, with a constant number of bus listeners."""
+    entries = []
+    for index in range(ZONES):
+        members = [add_member(hass, f"sensor.plug_{index}_{n}_power", n + 1) for n in range(2)]
+        entries.append(zone_entry(f"Zone {index}", members))
+
+    listeners_before = hass.bus.async_listeners()
+    started = time.monotonic()
+    for entry in entries:
+        await async_setup_zone(hass, entry)
+    await hass.async_block_till_done()
+    elapsed = time.monotonic() - started
+
+    runtime = get_runtime_data(hass)
+    assert len(runtime.zones) == ZONES
+    assert all(hass.states.get(entity_id).state == "3.0" for entity_id in runtime.zones)
+    assert elapsed < STARTUP_BUDGET, f"setting up {ZONES} zones took {elapsed:.1f} s"
+
+    # Bus listeners are shared by all zones; only member subscriptions grow per zone
+    listeners_after = hass.bus.async_listeners()
+    for event_type in LISTENED_EVENTS:
+        added = listeners_after.get(event_type, 0) - listeners_before.get(event_type, 0)
+        assert added <= 3, f"{added} {event_type} listeners for {ZONES} zones"
+    counts = runtime.listener_counts()
+    assert counts["sensor_subscriptions"] == 2 * ZONES
+    assert counts["membership_listeners"] == ZONES
+    assert len(runtime.startup.first_state) == ZONES